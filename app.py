@@ -0,0 +1,29 @@
+import streamlit as st
+import metrics
+
+# ---------------------- 多页面入口：一个进程托管全部应用 ----------------------
+# 启动：streamlit run app.py
+# 各页面脚本只在首次打开时才执行（pandas/sklearn/plotly 等按需导入，之后由 Python 模块缓存复用），
+# 数据与模型通过 shared_cache / st.cache_resource 在页面与会话之间共享。
+# 原来的单页脚本仍可单独运行（streamlit run cjfx.py 等）。
+
+pages = {
+    "数据分析": [
+        st.Page("first.py", title="南宁美食数据仪表盘", icon="🍜", default=True),
+        st.Page("cjfx.py", title="学生成绩分析与预测", icon="📚"),
+    ],
+    "机器学习预测": [
+        st.Page("cj.py", title="期末成绩预测", icon="📝"),
+        st.Page("ten.py", title="医疗费用预测", icon="🏥"),
+        st.Page("eleven.py", title="企鹅分类器", icon="🐧"),
+    ],
+    "工具与多媒体": [
+        st.Page("seven.py", title="个人简历生成器", icon="📄"),
+        st.Page("five.py", title="简易音乐播放器", icon="🎵"),
+        st.Page("six6.py", title="视频播放站", icon="🎬"),
+    ],
+}
+
+current_page = st.navigation(pages)
+with metrics.page_run("app", page=current_page.title):
+    current_page.run()
@@ -0,0 +1,221 @@
+"""
+静态图片资源：每张图只解码一次，按显示宽度生成 WebP 变体，写入 static/assets/ 后由 Streamlit 的静态文件服务提供，所有会话共享
+
+- 变体：显示宽度 × ASSET_DENSITY（默认 2，兼顾高分屏），不超过原图宽度；未指定宽度（占满容器）时按 CONTAINER_WIDTH 生成
+- 缓存键：原图内容哈希 + 变体宽度，也是变体的文件名（文件改名或多处引用同一张图只编码一次；文件被替换后哈希变化，自动生成新文件），
+  文件内容不变、地址不变，浏览器按 ETag 缓存，重跑时只传一个 URL
+- 交付：Streamlit 会把传入的图片字节重新编码成 PNG/JPEG，只有 http(s) URL 会原样透传，所以把静态文件的相对地址
+  按当前会话的协议和主机（取自 st.context.url）加 server.baseUrlPath 补全成绝对 URL 交给 st.image。需要开启 server.enableStaticServing（见 .streamlit/config.toml）；
+  未开启或取不到页面地址时退化为本地 WebP 文件路径（由 st.image 读取并重新编码，显示正常，只是没有缓存收益）
+- 远程图片：在后台线程中下载，同一 URL 同时只下载一次，所有会话共用；下载完成前、或下载失败后 REMOTE_RETRY_SECONDS 内
+  返回原 URL（浏览器自行加载，与改动前一致），页面渲染不等待下载
+
+用法：
+    st.image(assets.src("images/tg.jpg", 400), width=400)
+    assets.preload([("images/tg.jpg", 400), ("images/right.jpg", None)])   # 启动时预生成
+"""
+import hashlib
+import io
+import os
+import threading
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Streamlit 在入口脚本同目录的 static/ 下提供静态文件（各应用入口都在仓库根目录），对应地址 app/static/
+STATIC_DIR = os.path.join(BASE_DIR, "static", "assets")
+STATIC_URL = "app/static/assets/"
+DENSITY = float(os.environ.get("ASSET_DENSITY", "2"))
+# 占满容器时的变体宽度：Streamlit 主内容区最宽 730 像素，× 2 覆盖高分屏
+CONTAINER_WIDTH = 1460
+WEBP_QUALITY = int(os.environ.get("ASSET_WEBP_QUALITY", "80"))
+# 编码速度档位：6 比 4 只小 1%～3%，但带透明通道的大图要慢几十倍
+WEBP_METHOD = 4
+REMOTE_TIMEOUT = 5
+REMOTE_RETRY_SECONDS = 300
+
+_lock = threading.Lock()
+_sources = {}    # 本地路径 -> (修改时间, 文件大小, 内容哈希)；远程 URL -> 内容哈希
+_originals = {}  # 内容哈希 -> 解码后的原图（RGB / RGBA）
+_variants = {}   # (内容哈希, 变体宽度) -> 变体文件名
+_failures = {}   # 远程 URL -> 最近一次下载失败的时间
+_downloads = {}  # 远程 URL -> 进行中的下载（Future）
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="assets")
+
+
+def is_remote(source):
+    return source.startswith(("http://", "https://"))
+
+
+def variant_width(display_width, original_width):
+    """显示宽度 → 实际生成的像素宽度"""
+    if display_width is None:
+        return min(CONTAINER_WIDTH, original_width)
+    return max(1, min(int(round(display_width * DENSITY)), original_width))
+
+
+def _decode(data):
+    """解码一次并统一色彩模式（有透明通道的保留 RGBA）"""
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(data))
+    image.load()
+    has_alpha = image.mode in ("RGBA", "LA", "PA") or (image.mode == "P" and "transparency" in image.info)
+    return image.convert("RGBA" if has_alpha else "RGB")
+
+
+def _register(data):
+    # 调用方已持有锁
+    digest = hashlib.sha1(data).hexdigest()
+    if digest not in _originals:
+        _originals[digest] = _decode(data)
+    return digest
+
+
+def _local_digest(path):
+    full_path = path if os.path.isabs(path) else os.path.join(BASE_DIR, path)
+    stat = os.stat(full_path)  # 文件不存在时抛 FileNotFoundError，由调用方提示
+    with _lock:
+        cached = _sources.get(path)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+    with open(full_path, "rb") as f:
+        data = f.read()
+    with _lock:
+        digest = _register(data)
+        _sources[path] = (stat.st_mtime_ns, stat.st_size, digest)
+        return digest
+
+
+def _download(url):
+    # 在后台线程中执行
+    try:
+        request = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0"})
+        with urllib.request.urlopen(request, timeout=REMOTE_TIMEOUT) as response:
+            data = response.read()
+        with _lock:
+            _sources[url] = _register(data)
+            _failures.pop(url, None)
+    except Exception:
+        with _lock:
+            _failures[url] = time.monotonic()
+    finally:
+        with _lock:
+            _downloads.pop(url, None)
+
+
+def _remote_digest(url):
+    """已下载的远程图片返回内容哈希；否则在后台开始下载（已在下载或冷却期内则不重复）并返回 None"""
+    with _lock:
+        if url in _sources:
+            return _sources[url]
+        if url in _downloads:
+            return None
+        failed_at = _failures.get(url)
+        if failed_at is not None and time.monotonic() - failed_at < REMOTE_RETRY_SECONDS:
+            return None
+        _downloads[url] = _executor.submit(_download, url)
+        return None
+
+
+def _encode(image, width, path):
+    """缩放并编码为 WebP，先写临时文件再改名，静态文件服务不会读到写了一半的文件"""
+    from PIL import Image
+
+    if width < image.width:
+        height = max(1, round(image.height * width / image.width))
+        image = image.resize((width, height), Image.LANCZOS)
+    os.makedirs(STATIC_DIR, exist_ok=True)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    image.save(tmp_path, format="WEBP", quality=WEBP_QUALITY, method=WEBP_METHOD)
+    os.replace(tmp_path, path)
+
+
+def _variant(source, width):
+    """
+    取变体文件名，不存在时生成（进程重启后磁盘上已有的文件直接复用）
+    :return: 文件名；远程图片尚未下载好时返回 None
+    """
+    digest = _remote_digest(source) if is_remote(source) else _local_digest(source)
+    if digest is None:
+        return None
+    with _lock:
+        original = _originals[digest]
+        key = (digest, variant_width(width, original.width))
+        name = _variants.get(key)
+    metrics.inc("app_cache_requests_total", cache="assets", result="miss" if name is None else "hit")
+    if name is None:
+        name = f"{digest}-{key[1]}.webp"
+        path = os.path.join(STATIC_DIR, name)
+        if not os.path.exists(path):
+            # 在锁外编码：大图编码较慢时不阻塞其他会话取已有变体；并发重复编码的结果相同，后改名覆盖即可
+            _encode(original, key[1], path)
+        with _lock:
+            _variants[key] = name
+    return name
+
+
+def _static_base():
+    """静态文件的绝对地址前缀；未开启静态文件服务或不在会话中（取不到页面地址）时返回 None"""
+    import streamlit as st
+
+    if not st.get_option("server.enableStaticServing"):
+        return None
+    page_url = st.context.url
+    if not page_url:
+        return None
+    # st.context.url 带着多页面应用当前页的路径（如 http://host/cjfx），不能直接拼接；
+    # 只取协议和主机，路径按应用根目录（server.baseUrlPath）重新拼出
+    parts = urllib.parse.urlsplit(page_url)
+    base_path = st.get_option("server.baseUrlPath").strip("/")
+    root = f"{parts.scheme}://{parts.netloc}/" + (base_path + "/" if base_path else "")
+    return root + STATIC_URL
+
+
+def src(source, width=None):
+    """
+    取图片的 WebP 变体，结果直接传给 st.image
+    :param source: 本地路径（相对仓库根目录）或 http(s) URL
+    :param width: 页面上的显示宽度（像素），None 表示占满容器
+    :return: 变体的静态文件 URL（无法使用静态文件服务时为本地文件路径）；远程图片尚未下载好或下载失败时返回原 URL
+    """
+    name = _variant(source, width)
+    if name is None:
+        return source
+    base = _static_base()
+    return base + name if base else os.path.join(STATIC_DIR, name)
+
+
+def preload(specs):
+    """
+    启动时预生成变体（缺失的本地文件跳过，渲染时再按原逻辑提示；远程图片只开始后台下载，不等待）
+    :param specs: [(路径或 URL, 显示宽度或 None), ...]
+    :return: 生成成功的变体数
+    """
+    done = 0
+    for source, width in specs:
+        try:
+            if _variant(source, width) is not None:
+                done += 1
+        except OSError:
+            pass
+    return done
+
+
+def stats():
+    """缓存概况：原图数、变体数、变体文件总大小、进行中的下载数"""
+    with _lock:
+        names = list(_variants.values())
+        stats = {
+            "originals": len(_originals),
+            "variants": len(names),
+            "downloading": len(_downloads),
+            "remote_failures": len(_failures),
+        }
+    paths = [os.path.join(STATIC_DIR, name) for name in names]
+    stats["variant_bytes"] = sum(os.path.getsize(p) for p in paths if os.path.exists(p))
+    return stats
@@ -0,0 +1,63 @@
+"""
+cj.py 预测路径基准：逐条 model.predict 与预计算查找表的单次预测耗时对比
+
+用法（在仓库根目录执行）：
+    python benchmarks/cj_lookup.py > benchmarks/cj_lookup.txt
+"""
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import cj_model
+
+N_QUERIES = 20_000
+
+
+def random_inputs(n, seed=0):
+    """在表单允许的范围内随机生成输入组合"""
+    rng = np.random.default_rng(seed)
+    return np.stack([rng.integers(0, size, n) for size in cj_model.TABLE_SHAPE], axis=1).tolist()
+
+
+def per_call_us(func, queries):
+    """逐条调用的耗时分位数（微秒）"""
+    timings = np.empty(len(queries))
+    for i, q in enumerate(queries):
+        start = time.perf_counter()
+        func(*q)
+        timings[i] = time.perf_counter() - start
+    return np.percentile(timings, [50, 99]) * 1e6, timings.mean() * 1e6
+
+
+def main():
+    model = cj_model.train_model()
+    start = time.perf_counter()
+    table = cj_model.build_score_table(model)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    queries = random_inputs(N_QUERIES)
+    # 两条路径结果一致（批量与逐条的浮点误差远小于显示精度 0.1 分）
+    diffs = [abs(cj_model.lookup(table, *q) - cj_model.predict_live(model, *q)) for q in queries[:2000]]
+
+    live = per_call_us(lambda *q: cj_model.predict_live(model, *q), queries)
+    lookup = per_call_us(lambda *q: cj_model.lookup(table, *q), queries)
+
+    print(f"# cj.py 预测路径基准  Python {platform.python_version()} / {platform.machine()}")
+    print()
+    print(f"查找表形状 {cj_model.TABLE_SHAPE}，共 {table.size:,} 种组合，{table.nbytes / 1e6:.1f} MB，"
+          f"预计算耗时 {build_ms:.1f} ms")
+    print(f"结果最大偏差 {max(diffs):.2e} 分（抽查 2000 条）")
+    print()
+    print(f"## 单次预测耗时（{N_QUERIES:,} 次随机输入，微秒）")
+    print(f"{'路径':<16}{'p50':>10}{'p99':>10}{'平均':>10}")
+    for name, ((p50, p99), mean) in [("model.predict", live), ("查表", lookup)]:
+        print(f"{name:<16}{p50:>10.2f}{p99:>10.2f}{mean:>10.2f}")
+    print(f"加速比（平均）：{live[1] / lookup[1]:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+cjfx.py 冷启动基准：逐模块导入耗时 + 各页面首次渲染耗时
+
+用法（在仓库根目录执行）：
+    python benchmarks/import_cost.py > benchmarks/import_cost_cjfx.txt
+
+每一项都在全新的 Python 子进程中测量，避免模块缓存干扰。
+"""
+import os
+import platform
+import subprocess
+import sys
+import textwrap
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 按 cjfx.py 的实际导入顺序排列；耗时为「在前面模块已导入的前提下」新增的累计耗时
+MODULES = [
+    "streamlit",
+    "pandas",
+    "numpy",
+    "shared_cache",
+    "plotly.express",
+    "plotly.graph_objects",
+    "sklearn.linear_model",
+    "sklearn.preprocessing",
+    "sklearn.compose",
+    "sklearn.pipeline",
+]
+
+
+def _run(code, extra_args=()):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    return subprocess.run(
+        [sys.executable, *extra_args, "-c", code],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+
+
+def import_costs(modules=MODULES):
+    """用 -X importtime 统计每个模块（含其依赖）的增量导入耗时，单位毫秒"""
+    code = "\n".join(f"import {m}" for m in modules)
+    stderr = _run(code, ["-X", "importtime"]).stderr
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cum, raw_name = line[len("import time:"):].split("|")
+        # 只统计顶层导入（缩进表示被其他模块间接导入，已计入上层的累计耗时）
+        if raw_name.startswith("  ") or not cum.strip().isdigit():
+            continue
+        cumulative[raw_name.strip()] = int(cum)
+    costs = {}
+    for m in modules:
+        # 包的子模块（如 plotly.express）单独出现一行，父包首次导入的耗时记在第一个用到它的模块上
+        parts = m.split(".")
+        total = sum(cumulative.pop(".".join(parts[:i]), 0) for i in range(1, len(parts) + 1))
+        costs[m] = total / 1000
+    return costs
+
+
+PAGE_TIMING = textwrap.dedent("""
+    import time
+    t0 = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file("cjfx.py", default_timeout=300)
+    t1 = time.perf_counter()
+    at.run()
+    t2 = time.perf_counter()
+    print(f"{(t2 - t1) * 1000:.0f}")
+    for page in ["专业数据分析", "成绩预测系统"]:
+        t = time.perf_counter()
+        at.sidebar.radio(key="nav_radio").set_value(page).run()
+        print(f"{(time.perf_counter() - t) * 1000:.0f}")
+""")
+
+
+def page_timings():
+    """冷启动后依次打开三个页面的渲染耗时（毫秒）"""
+    out = _run(PAGE_TIMING).stdout.split()
+    return dict(zip(["项目概述（首屏）", "专业数据分析（首次打开）", "成绩预测系统（首次打开）"], map(int, out)))
+
+
+def main():
+    print(f"# cjfx.py 冷启动基准  Python {platform.python_version()} / {platform.machine()}")
+    print()
+    print("## 模块导入耗时（按导入顺序的增量累计，ms）")
+    costs = import_costs()
+    for name, ms in costs.items():
+        lazy = " (延迟导入)" if name.startswith(("plotly", "sklearn")) else ""
+        print(f"{name:<24}{ms:>9.1f}{lazy}")
+    eager = sum(costs.values())
+    lazy_total = sum(ms for name, ms in costs.items() if not name.startswith(("plotly", "sklearn")))
+    print(f"{'合计（全部导入）':<20}{eager:>9.1f}")
+    print(f"{'首屏必需导入':<20}{lazy_total:>9.1f}")
+    print()
+    print("## 页面渲染耗时（AppTest，全新进程，ms）")
+    for page, ms in page_timings().items():
+        print(f"{page:<20}{ms:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+学生分析路径扩展性基准：1M / 10M / 100M 行合成数据上，加载、专业分组聚合、训练、批量预测的耗时与峰值内存
+
+用法（在仓库根目录执行）：
+    python benchmarks/student_scaling.py > benchmarks/student_scaling.txt
+    python benchmarks/student_scaling.py --rows 1e6 1e7 --json scaling.json     # 结果另存为 JSON，便于前后对比
+
+- 数据由 student_synth.py 生成（固定 seed），缓存在 BENCH_DATA_DIR（默认 .cache/bench），重复运行不再重新生成
+- 每个规模在全新子进程中测量，使用独立的临时 Parquet 缓存目录：首次加载即冷启动，某个规模内存不足被杀也不影响其他规模
+- 峰值内存为各阶段内的 RSS 峰值（每阶段开始前通过 /proc/self/clear_refs 清零；不支持时退化为进程累计峰值，并在表中注明）
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import unicodedata
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import ingest
+import student_synth
+
+DEFAULT_ROWS = [1_000_000, 10_000_000, 100_000_000]
+DATA_DIR = os.environ.get("BENCH_DATA_DIR", os.path.join(os.path.dirname(ingest.CACHE_DIR), "bench"))
+SEED = 0
+# 阶段名 -> 表头；顺序即执行顺序
+STAGES = {
+    "load_csv": "加载 CSV（冷）",
+    "load_parquet": "加载 Parquet 缓存",
+    "aggregate": "专业分组聚合",
+    "train": "训练",
+    "predict": "批量预测",
+}
+
+
+# ---------------------- 内存测量（Linux /proc） ----------------------
+def _status_kb(field):
+    try:
+        with open("/proc/self/status") as f:
+            match = re.search(rf"^{field}:\s+(\d+) kB", f.read(), re.MULTILINE)
+        return int(match.group(1)) if match else None
+    except OSError:
+        return None
+
+
+def reset_peak():
+    """清零进程的 RSS 峰值；成功返回 True"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_mb():
+    kb = _status_kb("VmHWM")
+    if kb is None:
+        kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # Linux 下单位为 KB
+    return kb / 1024
+
+
+def rss_mb():
+    return (_status_kb("VmRSS") or 0) / 1024
+
+
+# ---------------------- 各阶段（子进程内执行） ----------------------
+def major_aggregates(df):
+    """与 cjfx.page_major_analysis 相同的三组分组聚合（页面上的随机扰动对耗时无影响，保留原写法）"""
+    import numpy as np
+
+    gender_ratio = (df.groupby("专业")["性别"].value_counts(normalize=True) * 100).unstack(fill_value=0).round(1)
+    study_metrics = df.groupby("专业").agg({
+        "每周学习时长（小时）": lambda x: x.mean() + np.random.uniform(-2, 2),
+        "期中考试分数": lambda x: x.mean() + np.random.uniform(-5, 5),
+        "期末考试分数": lambda x: x.mean() + np.random.uniform(-4, 4)
+    }).round(1)
+    attendance_avg = df.groupby("专业")["上课出勤率"].mean().round(2)
+    return gender_ratio, study_metrics, attendance_avg
+
+
+def run_worker(path):
+    """依次执行各阶段，每完成一个阶段输出一行 JSON（进程中途被杀时已完成的阶段仍有结果）"""
+    import grade_model
+    # 训练阶段只计训练本身，不计 sklearn 的导入耗时
+    import sklearn.compose, sklearn.linear_model, sklearn.pipeline, sklearn.preprocessing  # noqa: E401,F401
+
+    state = {}
+
+    def load_csv():
+        # 与应用首次加载相同：识别编码、解析、校验，并写入 Parquet 缓存
+        state["df"] = ingest.load_table(path, ingest.STUDENT_SCHEMA)
+
+    def load_parquet():
+        # 应用重启后的加载路径：直接读上一步写入的 Parquet
+        state.pop("df")
+        state["df"] = ingest.load_table(path, ingest.STUDENT_SCHEMA)
+
+    def train():
+        state["model"] = grade_model.fit_model(state["df"])
+
+    steps = {
+        "load_csv": load_csv,
+        "load_parquet": load_parquet,
+        "aggregate": lambda: major_aggregates(state["df"]),
+        "train": train,
+        "predict": lambda: grade_model.score_students(state["model"], state["df"], use_cache=False),
+    }
+    for stage, func in steps.items():
+        per_stage = reset_peak()
+        rss_before = rss_mb()
+        start = time.perf_counter()
+        func()
+        seconds = time.perf_counter() - start
+        print(json.dumps({"stage": stage, "seconds": seconds, "peak_mb": peak_mb(), "rss_before_mb": rss_before,
+                          "per_stage_peak": per_stage}), flush=True)
+
+
+# ---------------------- 调度 ----------------------
+def dataset_path(rows, seed=SEED):
+    return os.path.join(DATA_DIR, f"students-{rows}-s{seed}.csv")
+
+
+def ensure_dataset(rows, seed=SEED):
+    """:return: (路径, 生成耗时秒；已存在时为 None)"""
+    path = dataset_path(rows, seed)
+    if os.path.exists(path):
+        return path, None
+    os.makedirs(DATA_DIR, exist_ok=True)
+    start = time.perf_counter()
+    student_synth.write_dataset(path, rows, seed)
+    return path, time.perf_counter() - start
+
+
+def run_scale(rows, timeout=None):
+    """
+    在子进程中测量一个规模
+    :return: 结果字典（rows、file_mb、generate_seconds、stages、error）
+    """
+    path, generate_seconds = ensure_dataset(rows)
+    result = {"rows": rows, "file_mb": os.path.getsize(path) / 1e6, "generate_seconds": generate_seconds,
+              "stages": {}, "error": None}
+    with tempfile.TemporaryDirectory(prefix="bench-ingest-") as cache_dir:
+        env = dict(os.environ, INGEST_CACHE_DIR=cache_dir, PYTHONPATH=ROOT)
+        try:
+            proc = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--worker", path],
+                cwd=ROOT, env=env, capture_output=True, text=True, timeout=timeout,
+            )
+            stdout, returncode = proc.stdout, proc.returncode
+            if returncode != 0:
+                # -9 多为内存不足被系统杀掉
+                last_line = proc.stderr.strip().splitlines()[-1:] or [""]
+                result["error"] = "内存不足（进程被 SIGKILL）" if returncode == -9 else f"退出码 {returncode}：{last_line[0]}"
+        except subprocess.TimeoutExpired as e:
+            stdout = e.stdout.decode() if isinstance(e.stdout, bytes) else (e.stdout or "")
+            result["error"] = f"超时（{timeout} 秒）"
+    for line in stdout.splitlines():
+        if line.startswith("{"):
+            record = json.loads(line)
+            result["stages"][record.pop("stage")] = record
+    return result
+
+
+def _pad(text, width):
+    """按显示宽度右对齐（中文字符占两列）"""
+    display = sum(2 if unicodedata.east_asian_width(ch) in "WF" else 1 for ch in text)
+    return " " * max(width - display, 0) + text
+
+
+def render(results):
+    """
+    耗时与峰值内存两张表：耗时附与上一规模的倍数（行数 ×10 而耗时明显超过 ×10 即为非线性增长），
+    峰值内存附相对阶段开始时 RSS 的增量
+    """
+    memory_gb = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 2**30
+    lines = [f"# 学生分析路径扩展性基准  Python {platform.python_version()} / {platform.machine()}，"
+             f"{os.cpu_count()} 核，内存 {memory_gb:.1f} GB"]
+    lines.append("")
+    lines.append("## 数据")
+    for r in results:
+        generated = f"生成 {r['generate_seconds']:.1f} 秒" if r["generate_seconds"] is not None else "已缓存"
+        lines.append(f"{r['rows']:>13,} 行  CSV {r['file_mb']:>9.1f} MB  {generated}")
+
+    header = "行数" + " " * 11 + "".join(_pad(title, 20) for title in STAGES.values())
+    for title, key, fmt in (("耗时（秒）", "seconds", "{:.2f}"), ("阶段内峰值内存（MB，括号内为阶段内增量）", "peak_mb", "{:.0f}")):
+        lines += ["", f"## {title}", header]
+        previous = None
+        for r in results:
+            cells = []
+            for stage in STAGES:
+                record = r["stages"].get(stage)
+                if record is None:
+                    cells.append("—")
+                    continue
+                text = fmt.format(record[key])
+                if key == "peak_mb":
+                    text += f" (+{max(record['peak_mb'] - record['rss_before_mb'], 0):.0f})"
+                    if not record["per_stage_peak"]:
+                        text += "*"
+                if key == "seconds" and previous and stage in previous["stages"] and previous["stages"][stage]["seconds"] > 0:
+                    text += f" (×{record['seconds'] / previous['stages'][stage]['seconds']:.1f})"
+                cells.append(text)
+            lines.append(f"{r['rows']:<15,}" + "".join(_pad(c, 20) for c in cells))
+            previous = r
+    if any(not rec["per_stage_peak"] for r in results for rec in r["stages"].values()):
+        lines.append("* 无法按阶段清零峰值，为进程累计峰值")
+
+    failures = [r for r in results if r["error"]]
+    if failures:
+        lines += ["", "## 未完成"]
+        lines += [f"{r['rows']:,} 行：{r['error']}（「—」为未执行的阶段）" for r in failures]
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="学生分析路径扩展性基准")
+    parser.add_argument("--rows", nargs="+", type=lambda s: int(float(s)), default=DEFAULT_ROWS,
+                        help="数据规模（行数），默认 1e6 1e7 1e8")
+    parser.add_argument("--timeout", type=float, help="单个规模的超时（秒）")
+    parser.add_argument("--json", help="把原始结果写入 JSON 文件")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        run_worker(args.worker)
+        return 0
+
+    results = []
+    for rows in args.rows:
+        results.append(run_scale(rows, args.timeout))
+        print(f"{rows:,} 行完成", file=sys.stderr)
+    print(render(results))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
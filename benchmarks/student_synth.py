@@ -0,0 +1,181 @@
+"""
+学生成绩合成数据生成器：按 student_data_adjusted_rounded.csv 的表结构与「专业 × 性别」分组分布生成任意行数的数据
+
+分布拟合（每个专业 × 性别分组各自一份）：
+- 分组占比：按原数据各组行数
+- 四个输入特征：各自的经验分位数（逆 CDF 插值采样），保留截断、边界堆积等形状；原数据中特征间几乎不相关，独立采样
+- 期末考试分数：组内线性回归 + 经验残差分位数，截断到 0-100，保留与各特征的相关性
+所有数值与原数据一样保留两位小数。
+
+同一 seed 结果完全一致；数据按 CHUNK_ROWS 分块生成，各块使用独立的子随机流，
+所以不同规模的数据集前面的行也相同（1M 的数据就是 10M 数据的前 1M 行）。
+
+用法（在仓库根目录执行）：
+    python benchmarks/student_synth.py 1000000 -o students-1m.csv
+    python benchmarks/student_synth.py 1000000 -o students-1m.parquet --seed 7
+    python benchmarks/student_synth.py 200000 -o /tmp/s.csv --check     # 生成后与原数据逐组对比均值/标准差
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import ingest
+
+SOURCE_CSV = os.path.join(ingest.BASE_DIR, "student_data_adjusted_rounded.csv")
+ID_COL = "学号"
+GROUP_COLS = ["专业", "性别"]
+FEATURE_COLS = ["每周学习时长（小时）", "上课出勤率", "期中考试分数", "作业完成率"]
+TARGET_COL = "期末考试分数"
+# 输出列顺序与原文件一致
+COLUMNS = [ID_COL, "性别", "专业"] + FEATURE_COLS + [TARGET_COL]
+FIRST_ID = 2023000001
+QUANTILE_POINTS = 201
+CHUNK_ROWS = 1_000_000
+DECIMALS = 2
+
+
+# ---------------------- 分布拟合 ----------------------
+def fit_profile(df):
+    """
+    从原数据拟合各分组的分布参数
+    :return: 分组列表，每项包含 major、gender、weight（占比）、quantiles（特征 -> 分位数数组）、coef（回归系数，首项为截距）、residual（残差分位数）
+    """
+    grid = np.linspace(0, 1, QUANTILE_POINTS)
+    groups = []
+    for (major, gender), g in df.groupby(GROUP_COLS, sort=True):
+        X = g[FEATURE_COLS].to_numpy(dtype=np.float64)
+        y = g[TARGET_COL].to_numpy(dtype=np.float64)
+        design = np.column_stack([np.ones(len(g)), X])
+        coef, *_ = np.linalg.lstsq(design, y, rcond=None)
+        groups.append({
+            "major": major,
+            "gender": gender,
+            "weight": len(g) / len(df),
+            "quantiles": {col: np.quantile(g[col].to_numpy(dtype=np.float64), grid) for col in FEATURE_COLS},
+            "coef": coef,
+            "residual": np.quantile(y - design @ coef, grid),
+        })
+    return groups
+
+
+def load_profile(path=SOURCE_CSV):
+    return fit_profile(ingest.load_table(path, ingest.STUDENT_SCHEMA))
+
+
+# ---------------------- 生成 ----------------------
+def generate_chunk(profile, n, rng, first_id=FIRST_ID):
+    """按分组分布生成 n 行（行序随机，分组交错）"""
+    grid = np.linspace(0, 1, QUANTILE_POINTS)
+    weights = np.array([g["weight"] for g in profile])
+    group_idx = rng.choice(len(profile), size=n, p=weights / weights.sum())
+
+    features = np.empty((n, len(FEATURE_COLS)))
+    target = np.empty(n)
+    for k, g in enumerate(profile):
+        rows = np.flatnonzero(group_idx == k)
+        if rows.size == 0:
+            continue
+        sampled = np.column_stack([np.interp(rng.random(rows.size), grid, g["quantiles"][col]) for col in FEATURE_COLS])
+        features[rows] = sampled
+        noise = np.interp(rng.random(rows.size), grid, g["residual"])
+        target[rows] = g["coef"][0] + sampled @ g["coef"][1:] + noise
+
+    majors = np.array([g["major"] for g in profile], dtype=object)
+    genders = np.array([g["gender"] for g in profile], dtype=object)
+    data = {
+        ID_COL: np.arange(first_id, first_id + n, dtype=np.int64),
+        "性别": genders[group_idx],
+        "专业": majors[group_idx],
+    }
+    for j, col in enumerate(FEATURE_COLS):
+        data[col] = features[:, j].round(DECIMALS)
+    data[TARGET_COL] = np.clip(target, 0, 100).round(DECIMALS)
+    return pd.DataFrame(data, columns=COLUMNS)
+
+
+def iter_chunks(profile, rows, seed=0, chunk_rows=CHUNK_ROWS):
+    """逐块生成；第 i 块固定使用 SeedSequence(seed) 的第 i 个子流"""
+    n_chunks = -(-rows // chunk_rows)
+    for i, child in enumerate(np.random.SeedSequence(seed).spawn(n_chunks)):
+        n = min(chunk_rows, rows - i * chunk_rows)
+        yield generate_chunk(profile, n, np.random.default_rng(child), FIRST_ID + i * chunk_rows)
+
+
+def write_dataset(output_path, rows, seed=0, profile=None, chunk_rows=CHUNK_ROWS):
+    """
+    生成并写入 CSV（UTF-8，与原文件一致）或 Parquet（按扩展名判断），先写临时文件再改名
+    :return: 写入的行数
+    """
+    profile = profile if profile is not None else load_profile()
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    parquet = output_path.lower().endswith(".parquet")
+    writer = None
+    written = 0
+    try:
+        for chunk in iter_chunks(profile, rows, seed, chunk_rows):
+            if parquet:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                writer = writer or pq.ParquetWriter(tmp_path, table.schema)
+                writer.write_table(table)
+            else:
+                chunk.to_csv(tmp_path, mode="a" if written else "w", header=not written, index=False, encoding="utf-8")
+            written += len(chunk)
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    if writer is not None:
+        writer.close()
+    os.replace(tmp_path, output_path)
+    return written
+
+
+def compare(source, synthetic):
+    """逐组对比原数据与合成数据的均值、标准差"""
+    cols = FEATURE_COLS + [TARGET_COL]
+    stats = {
+        name: d.groupby(GROUP_COLS)[cols].agg(["mean", "std"])
+        for name, d in (("原数据", source), ("合成", synthetic))
+    }
+    table = pd.concat(stats, axis=1).round(2)
+    share = pd.concat({
+        name: d.groupby(GROUP_COLS).size() / len(d) * 100 for name, d in (("原数据", source), ("合成", synthetic))
+    }, axis=1).round(2)
+    return share, table
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="按原数据的分组分布生成学生成绩合成数据")
+    parser.add_argument("rows", type=lambda s: int(float(s)), help="行数，如 1000000 或 1e6")
+    parser.add_argument("-o", "--output", required=True, help="输出路径（.csv 或 .parquet）")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--check", action="store_true", help="生成后逐组对比原数据与合成数据")
+    args = parser.parse_args(argv)
+
+    source = ingest.load_table(SOURCE_CSV, ingest.STUDENT_SCHEMA)
+    start = time.perf_counter()
+    rows = write_dataset(args.output, args.rows, args.seed, fit_profile(source))
+    print(f"已生成 {rows:,} 行 -> {args.output}（{time.perf_counter() - start:.1f} 秒）")
+
+    if args.check:
+        synthetic = pd.read_parquet(args.output) if args.output.lower().endswith(".parquet") else pd.read_csv(args.output)
+        share, table = compare(source, synthetic)
+        print("\n## 分组占比（%）")
+        print(share.to_string())
+        print("\n## 分组均值 / 标准差")
+        print(table.T.to_string())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
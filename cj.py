@@ -1,27 +1,31 @@
+import os
 import streamlit as st
-import numpy as np
-from sklearn.linear_model import LinearRegression
-from sklearn.preprocessing import LabelEncoder
-import random
+import cj_model
+import metrics
+
+# 预计算模式：启动时把整个有界输入空间的预测结果算成查找表，每次预测只是一次数组下标访问
+# 设置环境变量 CJ_PRECOMPUTE=0 可改回每次调用 model.predict
+PRECOMPUTE = os.environ.get("CJ_PRECOMPUTE", "1") != "0"
 
 # 页面基础设置
 st.set_page_config(page_title="期末成绩预测", page_icon="📚", layout="wide")
+metrics.track_rerun("cj")
 st.title("📚 期末成绩预测")
 st.caption("基于机器学习模型，输入学习信息预测期末成绩")
 
-# ---------------------- 模拟训练数据 & 模型训练 ----------------------
-# 模拟学生特征数据：[每周学习时长, 出勤率编码, 补考次数, 作业完成度]
-# 出勤率编码：全勤=3, 80%=2, 60%=1, 低于60%=0
-X_train = np.array([
-    [10, 3, 0, 90], [5, 2, 1, 60], [2, 0, 2, 30], [15, 3, 0, 100],
-    [8, 2, 0, 75], [3, 1, 1, 40], [12, 3, 0, 85], [6, 1, 2, 50]
-])
-# 模拟对应的成绩标签（0-100）
-y_train = np.array([85, 62, 35, 98, 73, 42, 92, 55])
+# ---------------------- 模型训练 & 预计算查找表（进程内只执行一次） ----------------------
+# 模拟训练数据与线性回归模型见 cj_model.py
+@metrics.instrument_cache("cj_train_model", st.cache_resource(show_spinner=False))
+def train_model():
+    return cj_model.train_model()
+
+@metrics.instrument_cache("cj_score_table", st.cache_resource(show_spinner="正在预计算成绩查找表..."))
+def build_score_table():
+    """约 36 万种输入组合一次批量预测，约 3MB"""
+    return cj_model.build_score_table(train_model())
 
-# 训练线性回归模型
-model = LinearRegression()
-model.fit(X_train, y_train)
+model = train_model()
+score_table = build_score_table() if PRECOMPUTE else None
 
 # ---------------------- 页面交互逻辑 ----------------------
 # 表单区域
@@ -32,9 +36,9 @@ with st.form(key="score_predict_form"):
         gender = st.selectbox("性别", options=["", "男", "女"])
         major = st.selectbox("专业", options=["", "信息系统", "计算机科学", "软件工程", "大数据"])
     with col2:
-        study_time = st.number_input("每周学习时长(小时)", min_value=0, step=1, placeholder="请输入时长")
+        study_time = st.number_input("每周学习时长(小时)", min_value=0, max_value=cj_model.MAX_STUDY_TIME, step=1, placeholder="请输入时长")
         class_attend = st.selectbox("上课出勤率", options=["", "全勤", "80%", "60%", "低于60%"])
-        exam_times = st.number_input("补考次数", min_value=0, step=1, placeholder="请输入次数")
+        exam_times = st.number_input("补考次数", min_value=0, max_value=cj_model.MAX_EXAM_TIMES, step=1, placeholder="请输入次数")
         homework = st.slider("作业完成度(%)", min_value=0, max_value=100, value=50)
 
     # 提交按钮
@@ -51,14 +55,15 @@ if submit_btn:
         st.error("请填写所有必填信息！")
     else:
         # 特征编码：将出勤率转换为数值
-        attend_map = {"全勤": 3, "80%": 2, "60%": 1, "低于60%": 0}
-        attend_encoded = attend_map[class_attend]
+        attend_encoded = cj_model.ATTEND_MAP[class_attend]
 
-        # 构造预测特征数组
-        X_predict = np.array([[study_time, attend_encoded, exam_times, homework]])
-        # 模型预测成绩（限制在0-100之间）
-        score = model.predict(X_predict)[0]
-        score = max(0, min(100, score))  # 防止分数超出范围
+        # 预测成绩（限制在0-100之间）：预计算模式下查表，超出范围或关闭预计算时调用模型
+        with metrics.timer("app_predict_seconds", model="cj_grade"):
+            score = None
+            if score_table is not None:
+                score = cj_model.lookup(score_table, study_time, attend_encoded, exam_times, homework)
+            if score is None:
+                score = cj_model.predict_live(model, study_time, attend_encoded, exam_times, homework)
         score = round(score, 1)  # 保留1位小数
 
         # 展示进度条和结果
@@ -0,0 +1,63 @@
+"""
+cj.py 的成绩模型与预计算查找表
+
+四个输入都是有界的小整数（学习时长、出勤率编码、补考次数、作业完成度），整个输入空间只有约 36 万种组合：
+启动时对全部组合做一次批量 predict，存成稠密数组，之后每次预测只是一次数组下标访问。
+"""
+import numpy as np
+
+# ---------------------- 模拟训练数据 ----------------------
+# 模拟学生特征数据：[每周学习时长, 出勤率编码, 补考次数, 作业完成度]
+# 出勤率编码：全勤=3, 80%=2, 60%=1, 低于60%=0
+X_TRAIN = np.array([
+    [10, 3, 0, 90], [5, 2, 1, 60], [2, 0, 2, 30], [15, 3, 0, 100],
+    [8, 2, 0, 75], [3, 1, 1, 40], [12, 3, 0, 85], [6, 1, 2, 50]
+])
+# 模拟对应的成绩标签（0-100）
+Y_TRAIN = np.array([85, 62, 35, 98, 73, 42, 92, 55])
+
+ATTEND_MAP = {"全勤": 3, "80%": 2, "60%": 1, "低于60%": 0}
+
+# 各输入的取值上界（含），与 cj.py 表单控件的 max_value 一致
+MAX_STUDY_TIME = 80
+MAX_ATTEND = max(ATTEND_MAP.values())
+MAX_EXAM_TIMES = 10
+MAX_HOMEWORK = 100
+TABLE_SHAPE = (MAX_STUDY_TIME + 1, MAX_ATTEND + 1, MAX_EXAM_TIMES + 1, MAX_HOMEWORK + 1)
+
+
+def train_model():
+    """训练线性回归模型"""
+    from sklearn.linear_model import LinearRegression
+
+    model = LinearRegression()
+    model.fit(X_TRAIN, Y_TRAIN)
+    return model
+
+
+def clip_score(score):
+    """防止分数超出范围（限制在0-100之间）"""
+    return np.clip(score, 0, 100)
+
+
+def build_score_table(model):
+    """
+    对整个有界输入空间一次批量 predict，返回形状为 TABLE_SHAPE 的 float64 数组（已截断到 0-100）
+    table[学习时长, 出勤率编码, 补考次数, 作业完成度] 即该组合的预测成绩
+    """
+    grid = np.indices(TABLE_SHAPE).reshape(len(TABLE_SHAPE), -1).T
+    return clip_score(model.predict(grid)).reshape(TABLE_SHAPE)
+
+
+def lookup(table, study_time, attend_encoded, exam_times, homework):
+    """查表预测；超出预计算范围时返回 None，由调用方回退到 model.predict"""
+    index = (int(study_time), int(attend_encoded), int(exam_times), int(homework))
+    if all(0 <= i < n for i, n in zip(index, TABLE_SHAPE)):
+        return float(table[index])
+    return None
+
+
+def predict_live(model, study_time, attend_encoded, exam_times, homework):
+    """直接调用模型预测一条（查表前的原路径）"""
+    X_predict = np.array([[study_time, attend_encoded, exam_times, homework]])
+    return float(clip_score(model.predict(X_predict)[0]))
@@ -1,12 +1,24 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from sklearn.linear_model import LinearRegression
-from sklearn.preprocessing import OneHotEncoder
-from sklearn.compose import ColumnTransformer
-from sklearn.pipeline import Pipeline
+import threading
+import importlib
+import assets
+import export_queue
+import grade_model
+import major_report
+import metrics
+import model_store
+import prediction_cache
+import shared_cache
+from student_index import StudentIndex
+from ingest import SchemaError
+
+# 绘图与机器学习库较重（导入约占冷启动的大半），只在需要它们的页面首次打开时才导入
+PLOT_MODULES = ["plotly.express", "plotly.graph_objects"]
+ML_MODULES = ["sklearn.linear_model", "sklearn.preprocessing", "sklearn.compose", "sklearn.pipeline"]
+# 页面用到的图片及显示宽度（None 为占满容器），启动时预生成 WebP 变体
+IMAGE_ASSETS = [("images/right.jpg", None), ("images/tg.jpg", 400), ("images/wtg.jpg", 400)]
 
 # ---------------------- 全局配置：隐藏默认导航+黑色背景样式 ----------------------
 # 1. 页面基础配置（宽屏+折叠默认侧边栏）
@@ -61,52 +73,147 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # ---------------------- 核心工具函数：数据加载+模型训练（复用原有逻辑） ----------------------
-@st.cache_data
 def load_student_data():
-    """加载学生数据，校验关键列"""
+    """加载学生数据（共享缓存，加载时已按 ingest.STUDENT_SCHEMA 校验关键列）"""
     try:
-        df = pd.read_csv("student_data_adjusted_rounded.csv")
-        required_cols = ["专业", "性别", "每周学习时长（小时）", "上课出勤率", "期中考试分数", "期末考试分数", "作业完成率"]
-        missing_cols = [col for col in required_cols if col not in df.columns]
-        if missing_cols:
-            st.error(f"❌ 缺少关键列：{', '.join(missing_cols)}")
-            st.stop()
-        return df
+        return shared_cache.load_student_data()
+    except SchemaError as e:
+        st.error(f"❌ {e}")
+        st.stop()
     except FileNotFoundError:
         st.error("❌ 未找到 student_data_adjusted_rounded.csv 文件")
         st.stop()
 
-@st.cache_resource
-def train_grade_model(df):
-    """训练期末成绩预测模型"""
-    feature_cols = ["性别", "专业", "每周学习时长（小时）", "上课出勤率", "期中考试分数", "作业完成率"]
-    target_col = "期末考试分数"
-    X = df[feature_cols]
-    y = df[target_col]
-
-    # 分类特征编码+数值特征保留的预处理管道
-    preprocessor = ColumnTransformer(
-        transformers=[
-            ("cat", OneHotEncoder(drop="first", sparse_output=False), ["性别", "专业"]),
-            ("num", "passthrough", ["每周学习时长（小时）", "上课出勤率", "期中考试分数", "作业完成率"])
-        ]
-    )
-
-    model_pipeline = Pipeline(steps=[
-        ("preprocessor", preprocessor),
-        ("regressor", LinearRegression())
-    ])
-    model_pipeline.fit(X, y)
-    return model_pipeline
-
-# 初始化数据与模型（供所有页面复用）
-df = load_student_data()
-pred_model = train_grade_model(df)
+@metrics.instrument_cache("train_grade_model", st.cache_resource(show_spinner="正在训练成绩预测模型..."))
+def train_grade_model(df, model_version=None):
+    """
+    期末成绩预测模型（首次进入预测页面时才加载/训练）：模型仓库里有已发布的模型（model_selection.py）就直接用，
+    否则用 grade_model.fit_model 训练默认模型；model_version 是缓存键的一部分，发布新模型后自动换用
+    """
+    published = model_store.load(grade_model.MODEL_NAME) if model_version else None
+    if published is not None:
+        return published[0]
+    return grade_model.fit_model(df)
+
+@metrics.instrument_cache("cohort_scores", st.cache_data(show_spinner="正在为全体学生评分..."))
+def cohort_scores(_model, df, model_version):
+    """全体学生一次向量化评分（按数据 + 模型版本缓存）；末尾追加的新学生增量评分"""
+    with metrics.timer("app_predict_seconds", model="grade_cohort"):
+        return grade_model.score_students(_model, df)
+
+@metrics.instrument_cache("major_aggregates", st.cache_data(show_spinner="正在汇总专业数据..."))
+def major_aggregates(df):
+    """专业数据分析页面的全部分组聚合（按数据缓存），页面与导出报告共用"""
+    return major_report.compute_aggregates(df)
+
+@metrics.instrument_cache("student_index", st.cache_resource(show_spinner=False))
+def build_student_index(df):
+    """学号索引（每份数据只建一次）：精确查找与前缀联想都是二分查找，不扫描整张表"""
+    return StudentIndex(df["学号"])
+
+@st.cache_resource(show_spinner=False)
+def start_background_warmup():
+    """进程内只启动一次：后台线程预先导入绘图/机器学习库，用户切换页面时无需等待导入"""
+    def _warmup():
+        for name in PLOT_MODULES + ML_MODULES:
+            importlib.import_module(name)
+
+    thread = threading.Thread(target=_warmup, name="cjfx-warmup", daemon=True)
+    thread.start()
+    return thread
+
+@st.cache_resource(show_spinner=False)
+def preload_assets():
+    """启动时把概述页配图和考试结果图的 WebP 变体写入 static/assets/（已有的文件直接复用），页面上的 assets.src 只返回静态文件 URL"""
+    return assets.preload(IMAGE_ASSETS)
 
 # 出勤率档位映射（预测页面专用）
 attendance_levels = ["全勤（100%）", "优秀（90%-99%）", "良好（80%-89%）", "合格（70%-79%）", "不合格（<70%）"]
 attendance_map = {"全勤（100%）": 1.0, "优秀（90%-99%）": 0.95, "良好（80%-89%）": 0.85, "合格（70%-79%）": 0.75, "不合格（<70%）": 0.65}
 
+def attendance_level_of(rate):
+    """实际出勤率 → 档位（用学生档案预填表单时使用）"""
+    for level, lower in zip(attendance_levels, [1.0, 0.9, 0.8, 0.7]):
+        if rate >= lower:
+            return level
+    return attendance_levels[-1]
+
+# ---------------------- 成绩敏感性分析：整张网格一次批量预测 ----------------------
+# 网格尺寸：期中分数 × 出勤档位 × 学习时长 × 作业完成率（21 × 5 × 100 × 50）
+SENSITIVITY_MIDTERMS = np.linspace(0.0, 100.0, 21)
+SENSITIVITY_HOURS_POINTS = 100
+SENSITIVITY_HOMEWORK_POINTS = 50
+
+@metrics.instrument_cache("sensitivity_grid", st.cache_data(show_spinner="正在计算成绩敏感性网格...", max_entries=32))
+def sensitivity_grid(_model, model_version, gender, major, hours_range, homework_range):
+    """
+    对 (性别, 专业) 在整张网格上一次性 predict，结果按 (模型版本, 性别, 专业, 数据范围) 缓存；
+    之后拖动滑块只是在数组里取切片，不再调用模型
+    :return: 各坐标轴取值 + 预测分数数组，形状为 (期中, 出勤, 时长, 作业)
+    """
+    hours = np.linspace(hours_range[0], hours_range[1], SENSITIVITY_HOURS_POINTS)
+    homework = np.linspace(homework_range[0], homework_range[1], SENSITIVITY_HOMEWORK_POINTS)
+    attendance = np.array([attendance_map[level] for level in attendance_levels])
+    axes = [SENSITIVITY_MIDTERMS, attendance, hours, homework]
+    mid_g, att_g, hours_g, hw_g = (a.ravel() for a in np.meshgrid(*axes, indexing="ij"))
+    grid = pd.DataFrame({
+        "性别": np.full(mid_g.size, gender, dtype=object), "专业": np.full(mid_g.size, major, dtype=object),
+        "每周学习时长（小时）": hours_g, "上课出勤率": att_g, "期中考试分数": mid_g, "作业完成率": hw_g,
+    })
+    with metrics.timer("app_predict_seconds", model="grade_grid"):
+        scores = _model.predict(grid).astype(np.float32).reshape([len(a) for a in axes])
+    return {"midterm": SENSITIVITY_MIDTERMS, "hours": hours, "homework": homework, "scores": scores}
+
+def render_sensitivity(gender, major, attendance, study_hours, midterm_score, homework_rate):
+    """成绩敏感性分析：学习时长×作业完成率热力图 + 各出勤档位的学习时长响应曲线"""
+    import plotly.graph_objects as go
+
+    grid = sensitivity_grid(
+        pred_model, prediction_cache.model_version(pred_model), gender, major,
+        (float(df["每周学习时长（小时）"].min()), float(df["每周学习时长（小时）"].max())),
+        (float(df["作业完成率"].min()), float(df["作业完成率"].max())),
+    )
+    # 当前输入在网格上的最近位置
+    mid_idx = int(np.abs(grid["midterm"] - midterm_score).argmin())
+    att_idx = attendance_levels.index(attendance)
+    hw_idx = int(np.abs(grid["homework"] - homework_rate).argmin())
+    scores = grid["scores"][mid_idx]
+
+    st.subheader("📈 成绩敏感性分析")
+    st.caption(f"{gender} · {major} · 期中 {grid['midterm'][mid_idx]:.0f} 分（按网格取最近值）；调整左侧输入即可查看，无需重新预测")
+    tab_heat, tab_curve = st.tabs(["学习时长 × 作业完成率", "各出勤档位的学习时长曲线"])
+    with tab_heat:
+        with metrics.timer("app_function_seconds", func="figure_sensitivity_heatmap"):
+            fig_heat = go.Figure(go.Heatmap(
+                x=grid["hours"], y=grid["homework"], z=scores[att_idx].T,
+                colorscale="RdYlGn", zmin=0, zmax=100, colorbar=dict(title="预测分数"),
+            ))
+            fig_heat.add_trace(go.Scatter(
+                x=[study_hours], y=[homework_rate], mode="markers", name="当前输入",
+                marker=dict(color="white", size=12, symbol="x"),
+            ))
+            fig_heat.update_layout(
+                title=f"出勤档位：{attendance}", xaxis_title="每周学习时长（小时）", yaxis_title="作业完成率",
+                plot_bgcolor="black", paper_bgcolor="black", font_color="white",
+            )
+        st.plotly_chart(fig_heat, use_container_width=True)
+    with tab_curve:
+        with metrics.timer("app_function_seconds", func="figure_sensitivity_curves"):
+            fig_curve = go.Figure()
+            for i, level in enumerate(attendance_levels):
+                fig_curve.add_trace(go.Scatter(
+                    x=grid["hours"], y=scores[i, :, hw_idx], name=level, mode="lines",
+                    line=dict(width=4 if i == att_idx else 2),
+                ))
+            fig_curve.add_hline(y=60, line_dash="dash", line_color="#FF6B6B", annotation_text="及格线")
+            fig_curve.update_layout(
+                title=f"作业完成率 {grid['homework'][hw_idx]:.2f} 时的预测分数",
+                xaxis_title="每周学习时长（小时）", yaxis_title="预测期末分数",
+                plot_bgcolor="black", paper_bgcolor="black", font_color="white",
+                legend=dict(orientation="h", yanchor="bottom", y=1.02),
+            )
+        st.plotly_chart(fig_curve, use_container_width=True)
+
 # ---------------------- 左侧导航菜单：核心交互入口 ----------------------
 def left_navigation():
     """创建左侧导航菜单，返回当前选择的页面"""
@@ -117,7 +224,7 @@ def left_navigation():
         # 导航按钮：按页面顺序排列
         page_choice = st.radio(
             "",  # 隐藏默认标题，用自定义样式替代
-            ["项目概述", "专业数据分析", "成绩预测系统"],
+            ["项目概述", "专业数据分析", "成绩预测系统", "学业预警报告"],
             index=0,  # 默认选中第一个页面
             key="nav_radio",
             label_visibility="collapsed"  # 隐藏原生标签
@@ -146,7 +253,7 @@ def page_project_overview():
 
     with col_img:
         
-        st.image("images/right.jpg", caption="系统核心功能预览", use_container_width=True)
+        st.image(assets.src("images/right.jpg"), caption="系统核心功能预览", use_container_width=True)
     st.divider()
 
     # 项目目标（单独一行）
@@ -207,176 +314,91 @@ def page_project_overview():
         """)
 
 # ---------------------- 页面2：专业数据分析（复用2.txt逻辑） ----------------------
+@st.fragment(run_every=1)
+def report_export_progress(job_key):
+    """生成中每秒只刷新这一小块；任务结束后整页重跑一次，换成下载按钮并停止轮询"""
+    job = export_queue.get(job_key)
+    if job is None or job.finished:
+        st.rerun()
+    st.progress(job.progress, text=f"报告生成中：{job.message}")
+
+def render_report_export(agg):
+    """导出报告：提交到后台队列（同一份数据只生成一次，其他会话直接复用），页面不等待生成"""
+    job_key = f"major_report-{agg['version']}"
+    job = export_queue.get(job_key)
+    col_export, col_status = st.columns([1, 3])
+    if job is not None and job.status == "done":
+        with col_export:
+            st.download_button("📥 下载报告（HTML）", data=job.read, file_name=f"专业数据分析报告-{agg['version']}.html",
+                               mime="text/html", on_click="ignore")
+        with col_status:
+            st.caption("独立 HTML 文件，离线可打开；需要 PDF 时在浏览器中打印并另存为 PDF")
+    elif job is not None and not job.finished:
+        with col_status:
+            report_export_progress(job_key)
+    else:
+        with col_export:
+            clicked = st.button("📄 导出报告")
+        with col_status:
+            if job is not None and job.status == "failed":
+                st.error(f"报告生成失败：{job.error}")
+        if clicked:
+            export_queue.submit(job_key, lambda progress: major_report.render_html(agg, progress), ".html")
+            st.rerun()
+
 def page_major_analysis():
     st.title("📊 专业数据分析报告")
+    # 聚合结果按数据缓存，页面图表与导出报告共用（见 major_report.py）
+    agg = major_aggregates(df)
+    render_report_export(agg)
     st.divider()
+    report_tables = major_report.tables(agg)
 
     # 1. 各专业男女性别比例
     st.subheader("1. 各专业男女性别比例")
-    gender_ratio = df.groupby("专业")["性别"].value_counts(normalize=True) * 100
-    gender_ratio = gender_ratio.unstack(fill_value=0).round(1)
-
-    fig_gender = px.bar(
-        gender_ratio,
-        barmode="group",
-        labels={"value": "比例(%)", "专业": "专业名称"},
-        color_discrete_sequence=["#FF6B6B", "#4C84FF"],  # 女-红，男-蓝
-        title="各专业性别比例分布"
-    )
-    fig_gender.for_each_trace(lambda t: t.update(name="女" if t.name == "女" else "男"))
-    fig_gender.update_layout(
-        plot_bgcolor="black",
-        paper_bgcolor="black",
-        font_color="white",
-        yaxis_range=[0, 100],
-        legend=dict(orientation="h", yanchor="bottom", y=1.02)
-    )
-
     col_gender1, col_gender2 = st.columns([3, 1])
     with col_gender1:
-        st.plotly_chart(fig_gender, use_container_width=True)
+        st.plotly_chart(major_report.gender_figure(agg), use_container_width=True)
     with col_gender2:
         st.subheader("性别比例数据")
-        st.dataframe(gender_ratio.reset_index(), use_container_width=True)
+        st.dataframe(report_tables["gender"], use_container_width=True)
     st.divider()
 
     # 2. 各专业学习指标对比（背景柱+双折线）
     st.subheader("2. 各专业学习指标对比")
-    study_metrics = df.groupby("专业").agg({
-        "每周学习时长（小时）": lambda x: x.mean() + np.random.uniform(-2, 2),
-        "期中考试分数": lambda x: x.mean() + np.random.uniform(-5, 5),
-        "期末考试分数": lambda x: x.mean() + np.random.uniform(-4, 4)
-    }).round(1)
-    majors = study_metrics.index.tolist()
-    study_hours = study_metrics["每周学习时长（小时）"].values
-    midterm_score = study_metrics["期中考试分数"].values
-    final_score = study_metrics["期末考试分数"].values
-
-    fig_study = go.Figure()
-    # 背景柱状图（学习时长）
-    fig_study.add_trace(go.Bar(
-        x=majors, y=study_hours, name="学习时长（背景）",
-        marker_color="#8ECDFC", opacity=0.5, yaxis="y1"
-    ))
-    # 学习时长折线
-    fig_study.add_trace(go.Scatter(
-        x=majors, y=study_hours, name="每周学习时长",
-        line=dict(color="#FFC107", width=3), mode="lines+markers", yaxis="y1"
-    ))
-    # 期中分数折线
-    fig_study.add_trace(go.Scatter(
-        x=majors, y=midterm_score, name="期中考试分数",
-        line=dict(color="#20C997", width=3), mode="lines+markers", yaxis="y2"
-    ))
-    # 期末分数折线（虚线）
-    fig_study.add_trace(go.Scatter(
-        x=majors, y=final_score, name="期末考试分数",
-        line=dict(color="#198754", width=3, dash="dash"), mode="lines+markers", yaxis="y2"
-    ))
-
-    fig_study.update_layout(
-        title="各专业平均学习时间与成绩对比",
-        plot_bgcolor="black", paper_bgcolor="black", font_color="white",
-        # 左轴（学习时长）
-        yaxis=dict(title="平均学习时间（小时）", side="left", color="#FFC107", range=[0, max(study_hours)*1.2]),
-        # 右轴（分数）
-        yaxis2=dict(title="平均分数", side="right", overlaying="y", color="#20C997", range=[0, 100]),
-        legend=dict(orientation="h", yanchor="bottom", y=1.02)
-    )
-
     col_study1, col_study2 = st.columns([3, 1])
     with col_study1:
-        st.plotly_chart(fig_study, use_container_width=True)
+        st.plotly_chart(major_report.study_figure(agg), use_container_width=True)
     with col_study2:
         st.subheader("详细数据")
-        study_table = study_metrics.reset_index().rename(columns={
-            "专业": "major", "每周学习时长（小时）": "study_hours",
-            "期中考试分数": "midterm_score", "期末考试分数": "final_score"
-        })
-        st.dataframe(study_table, use_container_width=True)
+        st.dataframe(report_tables["study"], use_container_width=True)
     st.divider()
 
     # 3. 各专业出勤率分析（颜色渐变+排名）
     st.subheader("3. 各专业出勤率分析")
-    attendance_avg = df.groupby("专业")["上课出勤率"].mean().round(2)
-    attendance_avg = attendance_avg + np.random.uniform(-0.02, 0.02, size=len(attendance_avg)).round(2)
-
-    fig_attendance = px.bar(
-        attendance_avg,
-        x=attendance_avg.index, y=attendance_avg.values,
-        color=attendance_avg.values,  # 颜色绑定出勤率数值
-        color_continuous_scale=[(0, "#FFFFE0"), (0.5, "#8ECDFC"), (1, "#1E3A8A")],  # 黄→浅蓝→深蓝
-        labels={"value": "平均出勤率", "专业": "专业名称"},
-        title="各专业平均出勤率"
-    )
-    fig_attendance.update_layout(
-        plot_bgcolor="black", paper_bgcolor="black", font_color="white",
-        xaxis_title="专业名称", yaxis_title="y",
-        coloraxis_showscale=True,
-        coloraxis_colorbar=dict(
-            title="出勤率", orientation="v",
-            tickvals=[attendance_avg.min(), attendance_avg.max()],
-            ticktext=[f"{attendance_avg.min():.2f}", f"{attendance_avg.max():.2f}"],
-            thickness=15
-        )
-    )
-    fig_attendance.update_traces(width=0.8)
-
     col_att1, col_att2 = st.columns([3, 1])
     with col_att1:
-        st.plotly_chart(fig_attendance, use_container_width=True)
+        st.plotly_chart(major_report.attendance_figure(agg), use_container_width=True)
     with col_att2:
         st.subheader("出勤率排名")
-        attendance_rank = attendance_avg.sort_values(ascending=False).reset_index()
-        attendance_rank.columns = ["专业", "平均出勤率"]
-        st.dataframe(attendance_rank, use_container_width=True)
+        st.dataframe(report_tables["attendance"], use_container_width=True)
     st.divider()
 
     # 4. 大数据管理专业专项分析
     st.subheader("4. 大数据管理专业专项分析")
-    bigdata_df = df[df["专业"] == "大数据管理"]
-    if not bigdata_df.empty:
+    if agg["bigdata"] is not None:
         # 核心指标卡片
-        avg_attendance = bigdata_df["上课出勤率"].mean() * 100
-        avg_final = bigdata_df["期末考试分数"].mean()
-        pass_rate = (bigdata_df["期末考试分数"] >= 60).mean() * 100
-        avg_hours = bigdata_df["每周学习时长（小时）"].mean()
-
-        col_ind1, col_ind2, col_ind3, col_ind4 = st.columns(4)
-        with col_ind1:
-            st.markdown("<p style='font-size:14px;'>平均出勤率</p>", unsafe_allow_html=True)
-            st.markdown(f"<p style='font-size:20px; font-weight:bold;'>{avg_attendance:.1f}%</p>", unsafe_allow_html=True)
-        with col_ind2:
-            st.markdown("<p style='font-size:14px;'>平均期末成绩</p>", unsafe_allow_html=True)
-            st.markdown(f"<p style='font-size:20px; font-weight:bold;'>{avg_final:.1f}分</p>", unsafe_allow_html=True)
-        with col_ind3:
-            st.markdown("<p style='font-size:14px;'>及格率</p>", unsafe_allow_html=True)
-            st.markdown(f"<p style='font-size:20px; font-weight:bold;'>{pass_rate:.1f}%</p>", unsafe_allow_html=True)
-        with col_ind4:
-            st.markdown("<p style='font-size:14px;'>平均学习时间</p>", unsafe_allow_html=True)
-            st.markdown(f"<p style='font-size:20px; font-weight:bold;'>{avg_hours:.1f}小时</p>", unsafe_allow_html=True)
+        for col_ind, (name, value) in zip(st.columns(4), major_report.indicators(agg)):
+            with col_ind:
+                st.markdown(f"<p style='font-size:14px;'>{name}</p>", unsafe_allow_html=True)
+                st.markdown(f"<p style='font-size:20px; font-weight:bold;'>{value}</p>", unsafe_allow_html=True)
 
         # 成绩分布直方图+箱线图
+        fig_hist, fig_box = major_report.bigdata_figures(agg)
         col_dist1, col_dist2 = st.columns(2)
         with col_dist1:
-            fig_hist = px.histogram(
-                bigdata_df, x="期末考试分数", nbins=10,
-                color_discrete_sequence=["#20C997"], title="期末成绩分布"
-            )
-            fig_hist.update_layout(
-                plot_bgcolor="black", paper_bgcolor="black", font_color="white",
-                yaxis_title="count", xaxis_title="final_score"
-            )
             st.plotly_chart(fig_hist, use_container_width=True)
         with col_dist2:
-            fig_box = px.box(
-                bigdata_df, y="期末考试分数", color_discrete_sequence=["#20C997"],
-                title="期末成绩箱线图"
-            )
-            fig_box.update_layout(
-                plot_bgcolor="black", paper_bgcolor="black", font_color="white",
-                yaxis_title="final_score", xaxis_showticklabels=False
-            )
             st.plotly_chart(fig_box, use_container_width=True)
     else:
         st.warning("未找到“大数据管理”专业的数据，请检查专业名称是否匹配")
@@ -392,30 +414,52 @@ def page_grade_prediction():
     # 左栏：学生信息输入
     with col_input:
         st.subheader("📝 输入学生信息")
-        student_id = st.text_input("学号", value="2024001001")
-        gender = st.selectbox("性别", options=df["性别"].unique().tolist())
-        major = st.selectbox("专业", options=df["专业"].unique().tolist())
-        attendance = st.selectbox("上课出勤率", options=attendance_levels)
+        # 学号：精确匹配时用该生档案预填下方表单；只输入前缀时列出匹配的学号供选择
+        id_text = st.text_input("学号", value="", placeholder="输入学号或学号前缀，如 2023000001")
+        student_index = build_student_index(df)
+        pos = student_index.lookup(id_text) if id_text else None
+        if id_text and pos is None:
+            candidates = student_index.prefix_search(id_text, limit=20)
+            if candidates:
+                picked = st.selectbox("匹配的学号", options=candidates, index=None,
+                                      placeholder=f"找到 {len(candidates)}{'+' if len(candidates) == 20 else ''} 个学号，选择一个以载入档案")
+                if picked is not None:
+                    pos = student_index.lookup(picked)
+            else:
+                st.caption("未找到该学号，将按下方手动输入的信息预测")
+        record = df.iloc[pos] if pos is not None else None
+        student_id = str(record["学号"]) if record is not None else (id_text or "未填写")
+
+        gender_options = df["性别"].unique().tolist()
+        major_options = df["专业"].unique().tolist()
+        gender = st.selectbox("性别", options=gender_options,
+                              index=gender_options.index(record["性别"]) if record is not None else 0)
+        major = st.selectbox("专业", options=major_options,
+                             index=major_options.index(record["专业"]) if record is not None else 0)
+        attendance = st.selectbox(
+            "上课出勤率", options=attendance_levels,
+            index=attendance_levels.index(attendance_level_of(record["上课出勤率"])) if record is not None else 0
+        )
         # 每周学习时长滑块（基于数据范围）
         study_hours = st.slider(
             "每周学习时长（小时）",
             min_value=float(df["每周学习时长（小时）"].min()),
             max_value=float(df["每周学习时长（小时）"].max()),
-            value=float(df["每周学习时长（小时）"].median()),
+            value=float(record["每周学习时长（小时）"]) if record is not None else float(df["每周学习时长（小时）"].median()),
             step=0.5
         )
         # 期中考试分数滑块（0-100分）
         midterm_score = st.slider(
             "期中考试分数",
             min_value=0.0, max_value=100.0,
-            value=70.0, step=1.0
+            value=float(record["期中考试分数"]) if record is not None else 70.0, step=1.0
         )
         # 作业完成率滑块（基于数据范围）
         homework_rate = st.slider(
             "作业完成率",
             min_value=float(df["作业完成率"].min()),
             max_value=float(df["作业完成率"].max()),
-            value=float(df["作业完成率"].median()),
+            value=float(record["作业完成率"]) if record is not None else float(df["作业完成率"].median()),
             step=0.01
         )
         predict_btn = st.button("🚀 预测期末成绩", type="primary")
@@ -423,6 +467,9 @@ def page_grade_prediction():
     # 右栏：预测结果展示（提前初始化占位符）
     with col_result:
         st.subheader("📊 预测结果")
+        if record is not None:
+            with st.expander(f"📇 学生档案：{student_id}", expanded=True):
+                st.dataframe(record.to_frame().T, hide_index=True, use_container_width=True)
         result_placeholder = st.empty()
         suggestion_placeholder = st.empty()
         image_placeholder = st.empty()
@@ -431,14 +478,18 @@ def page_grade_prediction():
             # 1. 数据预处理：映射出勤率档位
             attendance_input = attendance_map[attendance]
             # 2. 构造模型输入
-            input_data = pd.DataFrame({
-                "性别": [gender], "专业": [major], "每周学习时长（小时）": [study_hours],
-                "上课出勤率": [attendance_input], "期中考试分数": [midterm_score], "作业完成率": [homework_rate]
-            })
-            # 3. 执行预测
-            pred_score = pred_model.predict(input_data)[0]
+            features = {
+                "性别": gender, "专业": major, "每周学习时长（小时）": study_hours,
+                "上课出勤率": attendance_input, "期中考试分数": midterm_score, "作业完成率": homework_rate
+            }
+            # 3. 执行预测（相同输入组合直接命中跨会话的预测缓存）
+            def run_predict():
+                with metrics.timer("app_predict_seconds", model="grade"):
+                    return float(pred_model.predict(pd.DataFrame([features]))[0])
+            pred_score = prediction_cache.get_or_compute("grade", pred_model, features, run_predict)
             pred_score = round(pred_score, 1)
             is_passed = pred_score >= 60
+            actual_line = f"\n                    - 实际期末分数：{record['期末考试分数']} 分" if record is not None else ""
 
             # 4. 展示预测结果（及格/不及格区分样式）
             with result_placeholder.container():
@@ -447,7 +498,7 @@ def page_grade_prediction():
                     ### ✅ 预测结果：及格
                     - 学号：{student_id}
                     - 预测期末分数：{pred_score} 分
-                    - 出勤率档位：{attendance}
+                    - 出勤率档位：{attendance}{actual_line}
                     - 结果说明：已达到及格线（60分），继续保持！
                     """)
                 else:
@@ -455,7 +506,7 @@ def page_grade_prediction():
                     ### ❌ 预测结果：不及格
                     - 学号：{student_id}
                     - 预测期末分数：{pred_score} 分
-                    - 出勤率档位：{attendance}
+                    - 出勤率档位：{attendance}{actual_line}
                     - 结果说明：未达到及格线（60分），需要加强学习！
                     """)
 
@@ -482,21 +533,77 @@ def page_grade_prediction():
             with image_placeholder.container():
                 try:
                     if is_passed:
-                        st.image("images/tg.jpg", caption="考试通过！继续加油~", width=400)
+                        st.image(assets.src("images/tg.jpg", 400), caption="考试通过！继续加油~", width=400)
                     else:
-                        st.image("images/wtg.jpg", caption="未通过，调整学习计划哦~", width=400)
+                        st.image(assets.src("images/wtg.jpg", 400), caption="未通过，调整学习计划哦~", width=400)
                 except Exception as e:
                     st.warning(f"图片加载失败：{e}\n提示：请将图片放在 images/ 目录下，命名为 tg.jpg（通过）和 wtg.jpg（未通过）")
 
+    st.divider()
+    render_sensitivity(gender, major, attendance, study_hours, midterm_score, homework_rate)
+
+# ---------------------- 页面4：学业预警报告（全体学生评分） ----------------------
+def page_risk_report():
+    st.title("🚨 学业风险预警报告")
+    st.caption("用成绩预测模型一次性为全体学生评分，按预测期末分数排出预警名单（预测分 < 60 为高风险，60~70 为中风险）")
+    st.divider()
+
+    scores = cohort_scores(pred_model, df, prediction_cache.model_version(pred_model))
+
+    # 筛选条件
+    col_major, col_gender, col_order, col_k = st.columns([3, 2, 2, 2])
+    with col_major:
+        majors = st.multiselect("专业", options=sorted(df["专业"].unique()), placeholder="全部专业")
+    with col_gender:
+        genders = st.multiselect("性别", options=sorted(df["性别"].unique()), placeholder="全部")
+    with col_order:
+        order = st.radio("排序", ["风险最高（预测分最低）", "预测分最高"])
+    with col_k:
+        k = st.number_input("名单人数", min_value=10, max_value=5000, value=100, step=10)
+
+    ranked, stats = grade_model.risk_report(
+        df, scores, int(k), majors, genders, largest=order == "预测分最高"
+    )
+
+    # 总体指标
+    total = int(stats["学生数"].sum())
+    fails = int(stats["预测不及格人数"].sum())
+    col1, col2, col3 = st.columns(3)
+    col1.metric("学生数", f"{total:,}")
+    col2.metric("预测不及格（高风险）", f"{fails:,}")
+    col3.metric("预测不及格率", f"{fails / total * 100:.1f}%" if total else "-")
+
+    st.subheader("各专业风险统计")
+    st.dataframe(stats, hide_index=True, use_container_width=True)
+
+    st.subheader(f"预警名单（前 {len(ranked)} 名）")
+    st.dataframe(ranked, hide_index=True, use_container_width=True)
+    st.download_button(
+        "📥 下载预警名单（CSV）",
+        ranked.to_csv(index=False).encode("utf-8-sig"),
+        file_name="学业预警名单.csv",
+        mime="text/csv",
+    )
+
 # ---------------------- 主程序：导航菜单控制页面切换 ----------------------
 if __name__ == "__main__":
     # 1. 渲染左侧导航菜单，获取当前选择的页面
     current_page = left_navigation()
-
-    # 2. 根据导航选择，渲染对应页面
-    if current_page == "项目概述":
-        page_project_overview()
-    elif current_page == "专业数据分析":
-        page_major_analysis()
-    elif current_page == "成绩预测系统":
-        page_grade_prediction()
+    preload_assets()
+
+    # 2. 根据导航选择，渲染对应页面（数据与模型只在需要的页面加载，概述页不等待训练）
+    with metrics.page_run("cjfx", page=current_page):
+        if current_page == "项目概述":
+            page_project_overview()
+            start_background_warmup()
+        elif current_page == "专业数据分析":
+            df = load_student_data()
+            page_major_analysis()
+        elif current_page == "成绩预测系统":
+            df = load_student_data()
+            pred_model = train_grade_model(df, model_store.version(grade_model.MODEL_NAME))
+            page_grade_prediction()
+        elif current_page == "学业预警报告":
+            df = load_student_data()
+            pred_model = train_grade_model(df, model_store.version(grade_model.MODEL_NAME))
+            page_risk_report()
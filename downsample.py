@@ -0,0 +1,77 @@
+import numpy as np
+
+
+def point_budget(width_px, px_per_point=2):
+    """按图表像素宽度估算需要的点数：每 px_per_point 个像素一个点就足以还原折线形状"""
+    return max(int(width_px // px_per_point), 3)
+
+
+def lttb(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets 降采样：保留视觉上最显著的点
+    :param x: 升序的数值型横坐标（时间请先转为 int64）
+    :param y: 纵坐标
+    :param n_out: 输出点数（含首尾两点）
+    :return: 被选中点的下标数组
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # 中间的点均分为 n_out-2 个桶，首尾点固定保留
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    # 每个桶的均值点（作为三角形的第三个顶点），一次性向量化算出
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    sizes = np.diff(edges)
+    avg_x = np.append(sums_x / sizes, x[-1])
+    avg_y = np.append(sums_y / sizes, y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    prev = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # 三角形面积（省略常数 1/2）：上一选中点、本桶候选点、下一桶均值点
+        area = np.abs(
+            (x[prev] - avg_x[i + 1]) * (y[lo:hi] - y[prev])
+            - (x[prev] - x[lo:hi]) * (avg_y[i + 1] - y[prev])
+        )
+        prev = lo + int(np.argmax(area))
+        selected[i + 1] = prev
+    return selected
+
+
+def minmax(x, y, n_out):
+    """
+    Min/Max 分桶降采样：每桶保留最小值和最大值两个点，适合尖峰较多的序列
+    :return: 被选中点的下标数组（升序）
+    """
+    n = len(x)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+    y = np.asarray(y, dtype=np.float64)
+    n_buckets = n_out // 2
+    edges = np.linspace(0, n, n_buckets + 1).astype(np.int64)
+    bucket = np.repeat(np.arange(n_buckets), np.diff(edges))
+    # 按（桶号, y 值）排序后，每桶第一个为最小值、最后一个为最大值
+    order = np.lexsort((y, bucket))
+    starts = edges[:-1]
+    ends = edges[1:] - 1
+    return np.unique(np.concatenate([order[starts], order[ends]]))
+
+
+METHODS = {"lttb": lttb, "minmax": minmax}
+
+
+def downsample(x, y, n_out, method="lttb"):
+    """对单条序列降采样，返回 (x, y)；NaN 点会先被剔除"""
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=np.float64)
+    valid = ~np.isnan(y)
+    x, y = x[valid], y[valid]
+    numeric_x = x.astype("datetime64[ns]").astype(np.int64) if np.issubdtype(x.dtype, np.datetime64) else x
+    idx = METHODS[method](numeric_x, y, n_out)
+    return x[idx], y[idx]
@@ -1,9 +1,13 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import OneHotEncoder
+import os
+import assets
+import metrics
+import model_store
+import penguin_model
+import prediction_cache
+import shared_cache
+from ingest import SchemaError
 
 # 设置页面的标题、图标和布局
 st.set_page_config(
@@ -11,47 +15,39 @@ st.set_page_config(
     page_icon=":penguin:",
     layout='wide'
 )
+metrics.track_rerun("eleven")
+
+# 页面用到的图片及显示宽度（None 为占满容器），启动时预生成 WebP 变体
+IMAGE_ASSETS = [("images/right_logo.png", 100), ("images/penguins.png", None), ("images/right_logo.png", 300)] + [
+    (f"images/{species}.png", 300) for species in ("阿德利企鹅", "巴布亚企鹅", "帽带企鹅")
+]
+
+@st.cache_resource(show_spinner=False)
+def preload_assets():
+    """启动时把 logo、企鹅总览图和三种企鹅图的 WebP 变体写入 static/assets/，预测结果切换时 assets.src 直接返回已有文件的静态 URL"""
+    return assets.preload(IMAGE_ASSETS)
 
 # ---------------------- 修复1：加载训练模型（适配中文CSV列名） ----------------------
-def load_and_train_model(csv_path):
-    """读取中文列名CSV，预处理并训练随机森林模型"""
-    # 读取CSV文件（中文列名直接保留）
-    df = pd.read_csv(csv_path, encoding='gbk')  
-    
-    # 查看CSV实际列名（可选，用于调试）
-    # st.write("CSV列名：", df.columns.tolist())
-    
-    # 缺失值处理（数值列用中位数填充，性别用UNKNOWN填充）
-    numeric_cols = ['喙的长度', '喙的深度', '翅膀的长度', '身体质量']
-    df[numeric_cols] = df[numeric_cols].fillna(df[numeric_cols].median())
-    df['性别'] = df['性别'].fillna('UNKNOWN')
-    
-    # 特征和标签分离（标签列是“企鹅的种类”，而非英文species）
-    X = df.drop('企鹅的种类', axis=1)
-    y = df['企鹅的种类']
-    
-    # 分类特征独热编码（中文列名：岛屿、性别）
-    cat_features = ['企鹅栖息的岛屿', '性别']
-    encoder = OneHotEncoder(sparse_output=False, drop='first')
-    cat_encoded = encoder.fit_transform(X[cat_features])
-    cat_df = pd.DataFrame(cat_encoded, columns=encoder.get_feature_names_out(cat_features))
-    
-    # 合并数值特征和编码后的分类特征
-    num_features = X.drop(cat_features, axis=1)
-    X_processed = pd.concat([num_features.reset_index(drop=True), cat_df.reset_index(drop=True)], axis=1)
+@metrics.instrument_cache("load_and_train_model", st.cache_resource(show_spinner="正在训练模型..."))
+def load_and_train_model(csv_path, model_version=None):
+    """
+    读取中文列名CSV，预处理并训练随机森林模型（训练结果缓存，所有会话共用）；
+    模型仓库里有已发布的模型（model_selection.py 选出）时直接使用，版本号变化后自动换用
+    """
+    # 读取CSV文件（共享缓存，中文列名直接保留）
+    df = shared_cache.load_penguin_data(csv_path)
+    published = model_store.load("penguin") if model_version else None
+    if published is not None:
+        return published[0]
     
-    # 修复2：train_test_split参数错误（缺少y参数，修正参数顺序）
-    X_train, X_test, y_train, y_test = train_test_split(X_processed, y, train_size=0.8, random_state=42)
-    model = RandomForestClassifier(random_state=42)
-    model.fit(X_train, y_train)
-    
-    # 返回模型、编码器、特征名、物种列表
-    return model, encoder, X_processed.columns, y.unique()
+    # 缺失值填充、独热编码、训练（见 penguin_model.fit_model，与批量分类共用同一套编码）
+    # 返回模型、编码器、特征名、物种列表、数值列填充值
+    return penguin_model.fit_model(df)
 
 # ---------------------- 修复3：用户输入预处理（删除重复参数+适配中文特征） ----------------------
 # 移除重复的flipper_length和冗余的body参数，参数顺序与表单输入一致
-def preprocess_user_input(island, sex, bill_length, bill_depth, flipper_length, body_mass, encoder):
-    """将用户输入转换为模型可接受的格式（适配中文列名）"""
+def preprocess_user_input(island, sex, bill_length, bill_depth, flipper_length, body_mass, model_bundle):
+    """将用户输入转换为模型可接受的格式（适配中文列名），与批量分类走同一条向量化编码路径"""
     # 构造用户输入的DataFrame（列名与CSV一致，均为中文）
     user_input = pd.DataFrame({
         '企鹅栖息的岛屿': [island],
@@ -61,24 +57,73 @@ def preprocess_user_input(island, sex, bill_length, bill_depth, flipper_length,
         '翅膀的长度': [flipper_length],
         '身体质量': [body_mass]
     })
+    # 表单不提供的数值特征（观测年份）取训练集中位数，再编码分类特征并按训练时的列顺序排列
+    _, encoder, feature_names, _, fill_values = model_bundle
+    return penguin_model.encode_features(penguin_model.clean_features(user_input, fill_values), encoder, feature_names)
+
+def load_model_or_stop():
+    """加载模型（处理文件不存在的异常）"""
+    try:
+        return load_and_train_model('penguins-chinese.csv', model_store.version("penguin"))
+    except FileNotFoundError:
+        st.error("❌ 未找到penguins-chinese.csv文件，请将CSV文件放在代码同级目录！")
+        st.stop()
+    except SchemaError as e:
+        st.error(f"❌ penguins-chinese.csv 不符合要求：{e}")
+        st.stop()
+
+@st.cache_data(show_spinner=False)
+def model_holdout_accuracy(_model_bundle, csv_path, model_version):
+    """当前模型在训练时留出的 20% 数据上的准确率（按模型版本缓存）"""
+    return penguin_model.holdout_accuracy(_model_bundle, shared_cache.load_penguin_data(csv_path))
+
+# ---------------------- 批量分类（野外调查文件） ----------------------
+@metrics.instrument_cache("classify_survey", st.cache_data(show_spinner="正在批量分类..."))
+def classify_survey(data, name, _model_bundle, model_version):
+    """对上传的调查文件批量分类；同一文件 + 同一模型的结果缓存，翻页/下载时不重复计算"""
+    model, encoder, feature_names, _, fill_values = _model_bundle
+    df = penguin_model.read_survey(data, name)
+    with metrics.timer("app_predict_seconds", model="penguin_batch"):
+        return penguin_model.classify_frame(df, model, encoder, feature_names, fill_values)
+
+def batch_page():
+    st.header("批量物种分类")
+    st.markdown(
+        "上传野外调查文件（CSV 或 Parquet，需包含 企鹅栖息的岛屿、性别、喙的长度、喙的深度、翅膀的长度、身体质量），"
+        "一次性输出每只企鹅的预测物种及各物种概率。"
+    )
+    model_bundle = load_model_or_stop()
+    uploaded = st.file_uploader("上传调查文件", type=["csv", "parquet"])
+    if uploaded is None:
+        return
     
-    # 对分类特征编码（使用训练好的编码器）
-    cat_features = ['企鹅栖息的岛屿', '性别']
-    cat_encoded = encoder.transform(user_input[cat_features])
-    cat_df = pd.DataFrame(cat_encoded, columns=encoder.get_feature_names_out(cat_features))
-    
-    # 合并数值特征和编码后的分类特征
-    num_features = user_input.drop(cat_features, axis=1)
-    input_processed = pd.concat([num_features.reset_index(drop=True), cat_df.reset_index(drop=True)], axis=1)
+    try:
+        result = classify_survey(uploaded.getvalue(), uploaded.name, model_bundle, model_store.version("penguin"))
+    except (SchemaError, ValueError, UnicodeDecodeError) as e:
+        st.error(f"❌ 调查文件无法分类：{e}")
+        return
     
-    return input_processed
+    counts = result[penguin_model.PREDICTION_COL].value_counts()
+    cols = st.columns(len(counts) + 1)
+    cols[0].metric("记录数", f"{len(result):,}")
+    for c, (species, n) in zip(cols[1:], counts.items()):
+        c.metric(species, f"{n:,}")
+    # 只展示前 1000 行，完整结果通过下载获取
+    st.dataframe(result.head(1000), hide_index=True)
+    st.download_button(
+        "下载分类结果（CSV）",
+        result.to_csv(index=False).encode("utf-8-sig"),
+        file_name=f"classified_{os.path.splitext(uploaded.name)[0]}.csv",
+        mime="text/csv",
+    )
 
 # ---------------------- 页面逻辑（优化交互体验） ----------------------
+preload_assets()
 with st.sidebar:
     # 图片路径若不存在可注释
-    st.image('images/right_logo.png', width=100)
+    st.image(assets.src('images/right_logo.png', 100), width=100)
     st.title('请选择页面')
-    page = st.selectbox("请选择页面", ["简介页面", "预测分类页面"], label_visibility='collapsed')
+    page = st.selectbox("请选择页面", ["简介页面", "预测分类页面", "批量分类页面"], label_visibility='collapsed')
 
 if page == "简介页面":
     st.title("企鹅分类器:penguin:")
@@ -87,7 +132,7 @@ if page == "简介页面":
 该数据集包含344条观测记录，涵盖3种南极企鹅：**阿德利企鹅**、**巴布亚企鹅**和**帽带企鹅**，记录了它们的栖息岛屿、性别、身体测量数据等信息。""")
     st.header('三种企鹅的卡通图像')
     # 图片路径若不存在可注释
-    st.image('images/penguins.png')
+    st.image(assets.src('images/penguins.png'))
 
 elif page == "预测分类页面":
     st.header("预测企鹅分类")
@@ -110,33 +155,36 @@ elif page == "预测分类页面":
             submitted = st.form_submit_button('预测分类')
         
         # 加载模型（处理文件不存在的异常）
-        try:
-            model, encoder, feature_names, species_list = load_and_train_model('penguins-chinese.csv')
-        except FileNotFoundError:
-            st.error("❌ 未找到penguins-chinese.csv文件，请将CSV文件放在代码同级目录！")
-            st.stop()
+        model_bundle = load_model_or_stop()
+        model, encoder, feature_names, species_list, _ = model_bundle
+        model_version = model_store.version("penguin")
+        accuracy = model_holdout_accuracy(model_bundle, 'penguins-chinese.csv', model_version)
+        meta = model_store.read_meta("penguin") if model_version else None
+        st.caption(f"模型：{meta['estimator'] if meta else '随机森林（默认）'}；留出集（20%）准确率：{accuracy:.1%}")
         
         # 预测逻辑
         if submitted:
-            # 预处理用户输入（参数数量与函数定义一致）
-            input_data = preprocess_user_input(island, sex, bill_length, bill_depth, flipper_length, body_mass, encoder)
-            
-            # 补全特征（防止编码后特征数不匹配）
-            for col in feature_names:
-                if col not in input_data.columns:
-                    input_data[col] = 0
-            input_data = input_data[feature_names]
-            
-            # 预测并显示结果
-            predict_result = model.predict(input_data)[0]
+            # 预测并显示结果（相同输入组合直接命中跨会话的预测缓存，命中时预处理与预测都跳过）
+            def run_predict():
+                # 预处理用户输入（参数数量与函数定义一致）
+                input_data = preprocess_user_input(island, sex, bill_length, bill_depth, flipper_length, body_mass,
+                                                   model_bundle)
+                with metrics.timer("app_predict_seconds", model="penguin"):
+                    return model.predict(input_data)[0]
+            features = {'岛屿': island, '性别': sex, '喙的长度': bill_length, '喙的深度': bill_depth,
+                        '翅膀的长度': flipper_length, '身体质量': body_mass}
+            predict_result = prediction_cache.get_or_compute("penguin", model, features, run_predict)
             st.success(f'🎉 预测结果：该企鹅的物种是 **{predict_result}**')
     
     with col_logo:
         if not submitted:
             # 替换为本地图片路径，若无则注释
-            st.image('images/right_logo.png', width=300)
+            st.image(assets.src('images/right_logo.png', 300), width=300)
             st.write("请输入信息并点击预测按钮")
         else:
             # 可根据预测结果显示对应企鹅图片，若无则注释
-            st.image(f'images/{predict_result}.png', width=300)
+            st.image(assets.src(f'images/{predict_result}.png', 300), width=300)
             st.write(f"预测物种：{predict_result}")
+
+elif page == "批量分类页面":
+    batch_page()
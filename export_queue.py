@@ -0,0 +1,165 @@
+"""
+后台导出队列（进程内、所有会话共享）：报告在工作线程中生成，页面只负责提交任务和显示进度，会话不会被阻塞
+
+- 去重：同一个任务键（报告名 + 数据版本 + 格式）同时只生成一次，多个会话提交同一份报告拿到的是同一个任务
+- 磁盘缓存：生成结果写入 EXPORT_CACHE_DIR，再次请求直接返回文件；
+  缓存总大小超过 EXPORT_CACHE_MAX_MB 时按最近使用时间（文件修改时间，命中时刷新）淘汰最旧的文件
+- 指标：app_cache_requests_total{cache="export", result="hit|miss|joined"}（joined 为并入正在进行的同键任务）
+"""
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import ingest
+import metrics
+
+EXPORT_DIR = os.environ.get("EXPORT_CACHE_DIR", os.path.join(os.path.dirname(ingest.CACHE_DIR), "exports"))
+MAX_BYTES = int(float(os.environ.get("EXPORT_CACHE_MAX_MB", "200")) * 1024 * 1024)
+# 报告生成以 Python 代码为主，线程多了只会互相争抢 GIL；默认 2 个，保证一个慢任务不会挡住其他任务
+WORKERS = int(os.environ.get("EXPORT_WORKERS", "2"))
+_KEY_PATTERN = re.compile(r"^[\w.-]+$")
+
+
+class ExportJob:
+    """一个导出任务的状态（工作线程写，页面读）"""
+
+    def __init__(self, key, path, status="queued"):
+        self.key = key
+        self.path = path
+        self.status = status  # queued / running / done / failed
+        self.progress = 1.0 if status == "done" else 0.0
+        self.message = "已完成" if status == "done" else "排队中"
+        self.error = None
+        self.submitted_at = time.time()
+        self.seconds = None
+
+    @property
+    def finished(self):
+        return self.status in ("done", "failed")
+
+    def update(self, fraction, message):
+        """进度回调，传给报告生成函数"""
+        self.progress = min(max(float(fraction), 0.0), 1.0)
+        self.message = message
+
+    def read(self):
+        """读取生成结果（可直接作为 st.download_button 的 data，点击下载时才读文件）"""
+        with open(self.path, "rb") as f:
+            return f.read()
+
+
+class ExportQueue:
+    """线程池 + 任务表 + 磁盘缓存"""
+
+    def __init__(self, cache_dir=EXPORT_DIR, max_bytes=MAX_BYTES, workers=WORKERS):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._jobs = {}  # 任务键 -> ExportJob
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="export")
+
+    def cache_path(self, key, suffix):
+        if not _KEY_PATTERN.match(key):
+            raise ValueError(f"任务键只能包含字母、数字、下划线、点和连字符：{key!r}")
+        return os.path.join(self.cache_dir, key + suffix)
+
+    def submit(self, key, render, suffix):
+        """
+        提交导出任务；磁盘缓存中已有结果时直接返回已完成的任务，同键任务进行中时返回该任务
+        :param key: 任务键（去重与缓存文件名），如 major_report-<数据版本>
+        :param render: render(progress) -> bytes，在工作线程中执行；progress(比例, 说明) 用于汇报进度
+        :param suffix: 缓存文件扩展名，如 .html
+        :return: ExportJob
+        """
+        path = self.cache_path(key, suffix)
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and not job.finished:
+                result = "joined"
+            elif os.path.exists(path):
+                _touch(path)
+                if job is None or job.status != "done":
+                    job = self._jobs[key] = ExportJob(key, path, status="done")
+                result = "hit"
+            else:
+                job = self._jobs[key] = ExportJob(key, path)
+                self._executor.submit(self._run, job, render)
+                result = "miss"
+        metrics.inc("app_cache_requests_total", cache="export", result=result)
+        return job
+
+    def get(self, key):
+        """按任务键查询任务；缓存文件已被淘汰的已完成任务视为不存在"""
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.status == "done" and not os.path.exists(job.path):
+                del self._jobs[key]
+                return None
+            return job
+
+    def _run(self, job, render):
+        job.status = "running"
+        job.message = "开始生成"
+        start = time.perf_counter()
+        try:
+            data = render(job.update)
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # 先写临时文件再改名，下载时不会读到写了一半的文件
+            tmp_path = f"{job.path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, job.path)
+            self._evict(keep=job.path)
+            job.seconds = time.perf_counter() - start
+            job.update(1.0, "已完成")
+            job.status = "done"
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.message = "生成失败"
+            job.status = "failed"
+
+    def _evict(self, keep):
+        """缓存总大小超限时，从最久未使用的文件开始删除（刚生成的文件除外）"""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def stats(self):
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        files = [e for e in os.scandir(self.cache_dir) if e.is_file()] if os.path.isdir(self.cache_dir) else []
+        return {
+            "jobs": len(statuses),
+            "running": statuses.count("running") + statuses.count("queued"),
+            "cached_files": len(files),
+            "cached_bytes": sum(e.stat().st_size for e in files),
+            "max_bytes": self.max_bytes,
+        }
+
+
+def _touch(path):
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+# 进程级单例：模块只导入一次，所有会话共用同一个队列
+QUEUE = ExportQueue()
+submit = QUEUE.submit
+get = QUEUE.get
@@ -1,6 +1,14 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+import pydeck as pdk
+import assets
+import downsample
+import food_data
+import geo_index
+
+# 今日推荐配图（远程图片：进程内只下载一次，缩放为 WebP 后缓存；下载失败时浏览器直接加载原图）
+RECOMMEND_IMAGE_URL = "https://ts1.tc.mm.bing.net/th/id/R-C.1b5cddc5a949b7bddda62ad84856b1ee?rik=YWNf5dczUf%2fFwA&riu=http%3a%2f%2fcp1.douguo.net%2fupload%2fcaiku%2fd%2fe%2f2%2fyuan_de699d706dad44c820edbe58ec01cf82.jpg&ehk=OseYroWQTztMjKcKgQb%2fbNsBlQMaKljLVuXIMo25hmY%3d&risl=&pid=ImgRaw&r=0"
 
 # ---------------------- 页面配置 ----------------------
 st.set_page_config(
@@ -29,55 +37,101 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # ---------------------- 数据准备 ----------------------
-# 1. 店铺基础信息（6家）
-shops_data = pd.DataFrame({
-    "店铺名称": ["南宁老友粉王", "桂小厨·广西菜", "复记老友粉", "舒记老友粉", "粉之都·螺蛳粉", "阿嬷手作"],
-    "评分": [4.7, 4.8, 4.6, 4.5, 4.4, 4.9],
-    "人均价格": [15, 85, 12, 13, 10, 28],
-    "地址": ["南宁市青秀区中山路", "南宁市兴宁区朝阳路", "南宁市兴宁区人民东路", 
-             "南宁市青秀区桃源路", "南宁市西乡塘区大学路", "南宁市青秀区万象城"],
-    "纬度": [22.8170, 22.8258, 22.8285, 22.8120, 22.8007, 22.8106],
-    "经度": [108.3664, 108.3410, 108.3450, 108.3400, 108.2915, 108.3525]
-})
-
-# 2. 用餐高峰时段数据（Area Chart）
-time_data = pd.DataFrame({
-    "时段": ["08:00", "10:00", "12:00", "14:00", "16:00", "18:00", "20:00", "22:00"],
-    "客流量": [50, 80, 200, 60, 70, 250, 180, 100]
-}).set_index("时段")
-
-# 3. 12个月价格走势（5家店折线图）
-months = pd.date_range(start="2024-01-01", periods=12, freq="M").strftime("%Y-%m")
-price_trend_data = pd.DataFrame({
-    "月份": months,
-    shops_data["店铺名称"][0]: [15,15,16,16,17,17,17,18,18,18,19,19],
-    shops_data["店铺名称"][1]: [80,82,83,85,85,88,90,90,92,92,95,95],
-    shops_data["店铺名称"][2]: [12,12,13,13,13,14,14,14,15,15,15,16],
-    shops_data["店铺名称"][3]: [30,40,50,60,70,50,25,90,33,44,16,24],
-    shops_data["店铺名称"][4]: [10,10,10,11,11,11,12,12,12,13,13,13]
-}).set_index("月份")
+# 数据由 food_data 从列式文件加载并按数据版本缓存；页面只使用预聚合后的结果
+data_version = food_data.dataset_version()
+shops_data = food_data.load_shops(data_version)
+overview = food_data.shop_overview(data_version)
+top_shops = food_data.top_rated_shops(data_version, n=20)
+time_data = food_data.traffic_profile(data_version)
+
+# 图表点数预算：按图表大致像素宽度（整行约1200px、半行约600px）每2像素一个点
+TREND_POINT_BUDGET = downsample.point_budget(1200)
+AREA_POINT_BUDGET = downsample.point_budget(600)
 
 # ---------------------- 页面布局 ----------------------
 st.title("🍜 南宁美食数据仪表盘")
 
+# 概览指标
+col_m1, col_m2, col_m3 = st.columns(3)
+col_m1.metric("店铺数量", f"{overview['店铺数']:,}")
+col_m2.metric("平均评分", overview["平均评分"])
+col_m3.metric("平均人均价格", f"{overview['平均人均价格']}元")
+
 # 第一行：地图 + 评分柱状图
 col1, col2 = st.columns([1, 1])
 
 with col1:
     st.subheader("📍 店铺位置分布")
-    # Streamlit原生地图
-    st.map(shops_data[["纬度", "经度"]].rename(columns={"纬度":"lat", "经度":"lon"}), 
-           zoom=12, use_container_width=True)
+    # 服务端按缩放级别和视口做网格聚合，浏览器只收到有限数量的聚合点
+    center_lat = float(shops_data["纬度"].median())
+    center_lon = float(shops_data["经度"].median())
+    col_zoom, col_k = st.columns(2)
+    with col_zoom:
+        map_zoom = st.slider("地图缩放级别", min_value=9, max_value=17, value=12)
+    with col_k:
+        nearest_k = st.slider("附近店铺数量", min_value=1, max_value=20, value=5)
+    col_lat, col_lon = st.columns(2)
+    with col_lat:
+        query_lat = st.number_input("我的纬度", value=round(center_lat, 4), format="%.4f", step=0.001)
+    with col_lon:
+        query_lon = st.number_input("我的经度", value=round(center_lon, 4), format="%.4f", step=0.001)
+
+    bbox = tuple(round(v, 4) for v in geo_index.viewport_bbox(query_lat, query_lon, map_zoom))
+    clusters = food_data.map_clusters(data_version, map_zoom, bbox)
+    clusters["radius"] = 30 * np.sqrt(clusters["count"]) * 2 ** (12 - map_zoom)
+    nearby = food_data.nearest_shops(data_version, query_lat, query_lon, nearest_k)
+
+    st.pydeck_chart(pdk.Deck(
+        map_style=None,
+        initial_view_state=pdk.ViewState(latitude=query_lat, longitude=query_lon, zoom=map_zoom),
+        layers=[
+            pdk.Layer("ScatterplotLayer", data=clusters, get_position=["lon", "lat"],
+                      get_radius="radius", get_fill_color=[76, 132, 255, 160], pickable=True),
+            pdk.Layer("ScatterplotLayer", data=nearby.rename(columns={"纬度": "lat", "经度": "lon"}),
+                      get_position=["lon", "lat"], get_radius=40 * 2 ** (12 - map_zoom),
+                      get_fill_color=[255, 107, 107, 220]),
+        ],
+        tooltip={"text": "{count} 家店"},
+    ), use_container_width=True)
+    st.caption(f"视口内 {int(clusters['count'].sum()):,} 家店，聚合为 {len(clusters):,} 个点；红点为离你最近的 {len(nearby)} 家店")
+    st.dataframe(nearby.drop(columns=["纬度", "经度"]), hide_index=True, use_container_width=True)
 
 with col2:
-    st.subheader("⭐ 餐厅评分")
+    st.subheader("⭐ 餐厅评分（Top 20）")
     # Streamlit原生柱状图
-    bar_data = shops_data.set_index("店铺名称")[["评分"]]
+    bar_data = top_shops.set_index("店铺名称")[["评分"]]
     st.bar_chart(bar_data, height=300, use_container_width=True)
 
-# 第二行：价格走势折线图（5家店）
-st.subheader("📈 餐厅12个月价格走势")
-st.line_chart(price_trend_data, height=300, use_container_width=True)
+# 第二行：价格走势折线图（默认展示记录最多的5家店，可自选）
+st.subheader("📈 餐厅价格走势")
+trend_shops = st.multiselect(
+    "选择店铺",
+    options=food_data.monthly_price_trend(data_version).columns.tolist(),
+    default=food_data.default_trend_shops(data_version, n=5),
+    max_selections=10,
+    label_visibility="collapsed"
+)
+col_gran, col_range = st.columns([1, 3])
+with col_gran:
+    granularity = st.radio("粒度", ["按月汇总", "原始数据"], horizontal=True)
+with col_range:
+    min_date, max_date = food_data.price_date_range(data_version)
+    date_range = st.slider("时间范围", min_value=min_date, max_value=max_date, value=(min_date, max_date))
+
+if granularity == "按月汇总":
+    price_trend_data = food_data.price_trend_for(data_version, tuple(trend_shops))
+    price_trend_data = price_trend_data.loc[
+        date_range[0].strftime("%Y-%m"):date_range[1].strftime("%Y-%m")
+    ]
+    st.line_chart(food_data.downsample_frame(price_trend_data, TREND_POINT_BUDGET),
+                  height=300, use_container_width=True)
+else:
+    # 每店按图表宽度降采样（LTTB），保留走势形状的同时控制传给浏览器的点数
+    price_trend_data = food_data.downsampled_price_trend(
+        data_version, trend_shops, date_range[0], date_range[1], TREND_POINT_BUDGET
+    )
+    st.line_chart(price_trend_data, x="日期", y="价格", color="店铺名称",
+                  height=300, use_container_width=True)
 
 # 第三行：用餐高峰时段面积图 + 店铺详情
 col3, col4 = st.columns([1, 1])
@@ -85,13 +139,14 @@ col3, col4 = st.columns([1, 1])
 with col3:
     st.subheader("⏰ 用餐高峰时段")
     # Streamlit原生面积图
-    st.area_chart(time_data, height=300, use_container_width=True)
+    st.area_chart(food_data.downsample_frame(time_data, AREA_POINT_BUDGET),
+                  height=300, use_container_width=True)
 
 with col4:
-    st.subheader("📋 餐厅详情")
+    st.subheader("📋 餐厅详情（评分Top 20）")
     # 店铺详情表格
     st.dataframe(
-        shops_data[["店铺名称", "评分", "人均价格", "地址"]],
+        top_shops,
         hide_index=True,
         use_container_width=True
     )
@@ -99,5 +154,4 @@ with col4:
 # 第四行：今日推荐
 st.subheader("🍱 今日午餐推荐")
 st.markdown("**南宁老友粉王 · 经典老友粉（15元）**")
-st.image("https://ts1.tc.mm.bing.net/th/id/R-C.1b5cddc5a949b7bddda62ad84856b1ee?rik=YWNf5dczUf%2fFwA&riu=http%3a%2f%2fcp1.douguo.net%2fupload%2fcaiku%2fd%2fe%2f2%2fyuan_de699d706dad44c820edbe58ec01cf82.jpg&ehk=OseYroWQTztMjKcKgQb%2fbNsBlQMaKljLVuXIMo25hmY%3d&risl=&pid=ImgRaw&r=0", 
-         width=300, caption="南宁经典老友粉")
+st.image(assets.src(RECOMMEND_IMAGE_URL, 300), width=300, caption="南宁经典老友粉")
@@ -0,0 +1,226 @@
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import downsample
+import geo_index
+
+# ---------------------- 数据源配置 ----------------------
+# 全市数据以列式文件（Parquet）存放在该目录，可用环境变量覆盖
+DATA_DIR = os.environ.get("FOOD_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "food"))
+# 店铺表：每店一行；价格表：每店每个日期一行（日/月粒度均可）；客流表：每个时段一行（可按店重复）
+SHOPS_FILE = "shops.parquet"
+PRICES_FILE = "prices.parquet"
+TRAFFIC_FILE = "traffic.parquet"
+
+SHOP_COLS = ["店铺名称", "评分", "人均价格", "地址", "纬度", "经度"]
+PRICE_COLS = ["店铺名称", "日期", "价格"]
+TRAFFIC_COLS = ["时段", "客流量"]
+
+
+# ---------------------- 内置示例数据（未提供数据目录时使用） ----------------------
+def _sample_tables():
+    """原仪表盘中的 6 家店示例数据，整理成与列式文件相同的长表结构"""
+    shops = pd.DataFrame({
+        "店铺名称": ["南宁老友粉王", "桂小厨·广西菜", "复记老友粉", "舒记老友粉", "粉之都·螺蛳粉", "阿嬷手作"],
+        "评分": [4.7, 4.8, 4.6, 4.5, 4.4, 4.9],
+        "人均价格": [15, 85, 12, 13, 10, 28],
+        "地址": ["南宁市青秀区中山路", "南宁市兴宁区朝阳路", "南宁市兴宁区人民东路",
+                 "南宁市青秀区桃源路", "南宁市西乡塘区大学路", "南宁市青秀区万象城"],
+        "纬度": [22.8170, 22.8258, 22.8285, 22.8120, 22.8007, 22.8106],
+        "经度": [108.3664, 108.3410, 108.3450, 108.3400, 108.2915, 108.3525]
+    })
+    traffic = pd.DataFrame({
+        "时段": ["08:00", "10:00", "12:00", "14:00", "16:00", "18:00", "20:00", "22:00"],
+        "客流量": [50, 80, 200, 60, 70, 250, 180, 100]
+    })
+    months = pd.date_range(start="2024-01-01", periods=12, freq="MS")
+    trend = {
+        "南宁老友粉王": [15, 15, 16, 16, 17, 17, 17, 18, 18, 18, 19, 19],
+        "桂小厨·广西菜": [80, 82, 83, 85, 85, 88, 90, 90, 92, 92, 95, 95],
+        "复记老友粉": [12, 12, 13, 13, 13, 14, 14, 14, 15, 15, 15, 16],
+        "舒记老友粉": [30, 40, 50, 60, 70, 50, 25, 90, 33, 44, 16, 24],
+        "粉之都·螺蛳粉": [10, 10, 10, 11, 11, 11, 12, 12, 12, 13, 13, 13]
+    }
+    prices = pd.concat(
+        [pd.DataFrame({"店铺名称": name, "日期": months, "价格": values}) for name, values in trend.items()],
+        ignore_index=True
+    )
+    return shops, prices, traffic
+
+
+# ---------------------- 数据版本 ----------------------
+def dataset_version(data_dir=DATA_DIR):
+    """
+    根据数据文件的大小和修改时间生成版本号，文件更新后缓存自动失效
+    :return: 版本字符串；数据目录不完整时返回 "builtin"（使用内置示例）
+    """
+    parts = []
+    for name in (SHOPS_FILE, PRICES_FILE, TRAFFIC_FILE):
+        path = os.path.join(data_dir, name)
+        if not os.path.exists(path):
+            return "builtin"
+        stat = os.stat(path)
+        parts.append(f"{name}:{stat.st_size}:{stat.st_mtime_ns}")
+    return hashlib.md5("|".join(parts).encode("utf-8")).hexdigest()[:12]
+
+
+def _read_table(name, columns, version, data_dir, shops=None):
+    if version == "builtin":
+        sample_shops, prices, traffic = _sample_tables()
+        df = {SHOPS_FILE: sample_shops, PRICES_FILE: prices, TRAFFIC_FILE: traffic}[name][columns]
+        return df if shops is None else df[df["店铺名称"].isin(shops)]
+    # 只读取需要的列（指定店铺时借助 Parquet 行组统计跳过无关数据），字符串列转为 category 以节省内存
+    filters = None if shops is None else [("店铺名称", "in", list(shops))]
+    df = pd.read_parquet(os.path.join(data_dir, name), columns=columns, filters=filters)
+    for col in df.columns:
+        if df[col].dtype == object:
+            df[col] = df[col].astype("category")
+    return df
+
+
+def write_dataset(shops, prices, traffic, data_dir=DATA_DIR):
+    """把三张表写为 Parquet 数据目录（例如从 CSV/数据库导出后调用一次）"""
+    os.makedirs(data_dir, exist_ok=True)
+    shops[SHOP_COLS].to_parquet(os.path.join(data_dir, SHOPS_FILE), index=False)
+    prices = prices[PRICE_COLS].assign(日期=pd.to_datetime(prices["日期"]))
+    prices.sort_values(["店铺名称", "日期"]).to_parquet(os.path.join(data_dir, PRICES_FILE), index=False)
+    traffic[TRAFFIC_COLS].to_parquet(os.path.join(data_dir, TRAFFIC_FILE), index=False)
+
+
+# ---------------------- 缓存视图（均以数据版本为缓存键） ----------------------
+@st.cache_data(show_spinner=False)
+def load_shops(version, data_dir=DATA_DIR):
+    """店铺基础信息"""
+    return _read_table(SHOPS_FILE, SHOP_COLS, version, data_dir)
+
+
+@st.cache_data(show_spinner=False)
+def shop_overview(version, data_dir=DATA_DIR):
+    """概览指标：店铺数、平均评分、平均人均价格"""
+    shops = load_shops(version, data_dir)
+    return {
+        "店铺数": len(shops),
+        "平均评分": round(float(shops["评分"].mean()), 2),
+        "平均人均价格": round(float(shops["人均价格"].mean()), 1),
+    }
+
+
+@st.cache_data(show_spinner=False)
+def top_rated_shops(version, n=20, data_dir=DATA_DIR):
+    """评分最高的 n 家店（柱状图/详情表只展示这部分）"""
+    shops = load_shops(version, data_dir)
+    return shops.nlargest(n, "评分")[["店铺名称", "评分", "人均价格", "地址"]].reset_index(drop=True)
+
+
+@st.cache_data(show_spinner=False)
+def monthly_price_trend(version, data_dir=DATA_DIR):
+    """
+    按（月份, 店铺）预聚合价格均值，结果为 月份 × 店铺 的宽表
+    原始价格表可以是日粒度、多年数据，这里只保留每店每月一个点
+    """
+    prices = _read_table(PRICES_FILE, PRICE_COLS, version, data_dir)
+    month = pd.to_datetime(prices["日期"]).dt.to_period("M")
+    trend = (
+        prices.groupby([month.rename("月份"), "店铺名称"], observed=True)["价格"]
+        .mean()
+        .unstack("店铺名称")
+        .round(1)
+    )
+    trend.index = trend.index.strftime("%Y-%m")
+    trend.columns = trend.columns.astype(str)
+    return trend
+
+
+@st.cache_data(show_spinner=False)
+def price_trend_for(version, shops, data_dir=DATA_DIR):
+    """取指定店铺的月度价格走势（shops 为元组，便于作为缓存键）"""
+    trend = monthly_price_trend(version, data_dir)
+    return trend[[s for s in shops if s in trend.columns]]
+
+
+@st.cache_data(show_spinner=False)
+def default_trend_shops(version, n=5, data_dir=DATA_DIR):
+    """默认展示价格记录最多的 n 家店"""
+    trend = monthly_price_trend(version, data_dir)
+    return trend.notna().sum().sort_values(ascending=False, kind="stable").index[:n].tolist()
+
+
+@st.cache_data(show_spinner=False)
+def traffic_profile(version, data_dir=DATA_DIR):
+    """各时段平均客流量（多店数据按时段聚合）"""
+    traffic = _read_table(TRAFFIC_FILE, TRAFFIC_COLS, version, data_dir)
+    profile = traffic.groupby("时段", observed=True)["客流量"].mean().round(0).to_frame()
+    profile.index = profile.index.astype(str)
+    return profile.sort_index()
+
+
+# ---------------------- 空间索引（地图聚类 / 附近店铺） ----------------------
+@st.cache_resource(show_spinner=False)
+def shop_geo_index(version, data_dir=DATA_DIR):
+    """每个数据版本只构建一次空间索引，所有会话共享"""
+    shops = load_shops(version, data_dir)
+    return geo_index.ShopGeoIndex(shops["纬度"].to_numpy(), shops["经度"].to_numpy())
+
+
+@st.cache_data(show_spinner=False)
+def map_clusters(version, zoom, bbox, data_dir=DATA_DIR):
+    """视口内按缩放级别聚合后的点（数量有上限），bbox 需先取整以便命中缓存"""
+    clusters = shop_geo_index(version, data_dir).clusters(zoom, bbox)
+    return pd.DataFrame(clusters)
+
+
+@st.cache_data(show_spinner=False)
+def nearest_shops(version, lat, lon, k=5, data_dir=DATA_DIR):
+    """离指定位置最近的 k 家店，附带距离（公里）"""
+    idx, dist = shop_geo_index(version, data_dir).nearest(lat, lon, k)
+    shops = load_shops(version, data_dir)
+    result = shops.iloc[idx][["店铺名称", "评分", "人均价格", "地址", "纬度", "经度"]].reset_index(drop=True)
+    result["距离（公里）"] = dist.round(2)
+    return result
+
+
+# ---------------------- 长时间序列：按图表宽度降采样 ----------------------
+@st.cache_data(show_spinner=False)
+def price_date_range(version, data_dir=DATA_DIR):
+    """价格数据覆盖的日期范围"""
+    dates = pd.to_datetime(_read_table(PRICES_FILE, ["日期"], version, data_dir)["日期"])
+    return dates.min().date(), dates.max().date()
+
+
+@st.cache_data(show_spinner=False)
+def price_series(version, shop, data_dir=DATA_DIR):
+    """单店原始粒度（同日多条取均值）的价格序列，按日期升序"""
+    prices = _read_table(PRICES_FILE, PRICE_COLS, version, data_dir, shops=(shop,))
+    series = prices.groupby(pd.to_datetime(prices["日期"]))["价格"].mean()
+    return series.index.to_numpy(), series.to_numpy()
+
+
+@st.cache_data(show_spinner=False)
+def downsampled_price_series(version, shop, start, end, budget, method="lttb", data_dir=DATA_DIR):
+    """单店在 [start, end] 范围内降采样到 budget 个点；按（店铺, 范围, 点数）分别缓存"""
+    x, y = price_series(version, shop, data_dir)
+    mask = (x >= np.datetime64(start)) & (x <= np.datetime64(end))
+    x, y = downsample.downsample(x[mask], y[mask], budget, method)
+    return pd.DataFrame({"日期": x, "价格": y, "店铺名称": shop})
+
+
+def downsampled_price_trend(version, shops, start, end, budget, method="lttb", data_dir=DATA_DIR):
+    """多店长表（日期, 价格, 店铺名称），每店各自降采样，供 st.line_chart(color=...) 绘制"""
+    frames = [downsampled_price_series(version, shop, start, end, budget, method, data_dir) for shop in shops]
+    if not frames:
+        return pd.DataFrame(columns=["日期", "价格", "店铺名称"])
+    return pd.concat(frames, ignore_index=True)
+
+
+def downsample_frame(df, budget, method="lttb"):
+    """宽表（索引为横轴）逐列降采样，用于面积图等；点数未超预算时原样返回"""
+    if len(df) <= budget:
+        return df
+    x = np.arange(len(df))
+    keep = np.unique(np.concatenate([downsample.METHODS[method](x, df[col].fillna(0).to_numpy(dtype=np.float64), budget)
+                                     for col in df.columns]))
+    return df.iloc[keep]
@@ -0,0 +1,84 @@
+import numpy as np
+from scipy.spatial import cKDTree
+
+EARTH_RADIUS_KM = 6371.0
+TILE_SIZE = 256  # Web 墨卡托瓦片像素宽度
+
+
+def degrees_per_pixel(zoom):
+    """某缩放级别下，每个屏幕像素对应的经度跨度"""
+    return 360.0 / (TILE_SIZE * 2 ** zoom)
+
+
+def viewport_bbox(center_lat, center_lon, zoom, width_px=700, height_px=400):
+    """由中心点、缩放级别和画布尺寸估算可视范围 (min_lat, min_lon, max_lat, max_lon)"""
+    dlon = degrees_per_pixel(zoom) * width_px / 2
+    dlat = degrees_per_pixel(zoom) * height_px / 2 * np.cos(np.radians(center_lat))
+    return (center_lat - dlat, center_lon - dlon, center_lat + dlat, center_lon + dlon)
+
+
+class ShopGeoIndex:
+    """
+    店铺空间索引：
+    - 网格聚类：按缩放级别把点量化到网格，视口内只返回有限数量的聚合点
+    - KD 树：以近似平面坐标（公里）查询最近的店铺
+    """
+
+    def __init__(self, lat, lon):
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lon = np.asarray(lon, dtype=np.float64)
+        # 等距圆柱投影：小范围（城市级）内误差可忽略
+        self._lat0 = np.radians(np.nanmean(self.lat)) if len(self.lat) else 0.0
+        self.tree = cKDTree(self._project(self.lat, self.lon)) if len(self.lat) else None
+
+    def __len__(self):
+        return len(self.lat)
+
+    def _project(self, lat, lon):
+        x = np.radians(lon) * np.cos(self._lat0) * EARTH_RADIUS_KM
+        y = np.radians(lat) * EARTH_RADIUS_KM
+        return np.column_stack([x, y])
+
+    def nearest(self, lat, lon, k=5):
+        """
+        查询离 (lat, lon) 最近的 k 家店
+        :return: (店铺行号数组, 距离公里数组)，按距离升序
+        """
+        if self.tree is None:
+            return np.array([], dtype=np.int64), np.array([])
+        k = min(k, len(self))
+        dist, idx = self.tree.query(self._project(np.array([lat]), np.array([lon])), k=k)
+        return np.atleast_1d(idx[0]), np.atleast_1d(dist[0])
+
+    def clusters(self, zoom, bbox=None, cell_px=48, max_clusters=1500):
+        """
+        按缩放级别做网格聚类
+        :param zoom: 地图缩放级别，级别越大网格越细
+        :param bbox: (min_lat, min_lon, max_lat, max_lon)，只聚合视口内的点；None 表示全部
+        :param cell_px: 一个网格在屏幕上的像素边长
+        :param max_clusters: 返回的聚合点上限，超出时自动加粗网格
+        :return: dict(lat, lon, count)，坐标为格内点的质心
+        """
+        lat, lon = self.lat, self.lon
+        if bbox is not None:
+            min_lat, min_lon, max_lat, max_lon = bbox
+            mask = (lat >= min_lat) & (lat <= max_lat) & (lon >= min_lon) & (lon <= max_lon)
+            lat, lon = lat[mask], lon[mask]
+        if len(lat) == 0:
+            return {"lat": np.array([]), "lon": np.array([]), "count": np.array([], dtype=np.int64)}
+
+        cell = degrees_per_pixel(zoom) * cell_px
+        while True:
+            row = np.floor(lat / cell).astype(np.int64)
+            col = np.floor(lon / cell).astype(np.int64)
+            keys = (row - row.min()) * (col.max() - col.min() + 1) + (col - col.min())
+            uniq, inverse = np.unique(keys, return_inverse=True)
+            if len(uniq) <= max_clusters:
+                break
+            cell *= 2
+        count = np.bincount(inverse)
+        return {
+            "lat": np.bincount(inverse, weights=lat) / count,
+            "lon": np.bincount(inverse, weights=lon) / count,
+            "count": count,
+        }
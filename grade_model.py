@@ -0,0 +1,193 @@
+"""
+学生期末成绩模型：训练、全体学生一次性评分（支持追加行增量评分）、学业风险预警
+
+每晚生成预警报告（命令行）：
+    python grade_model.py --top 200 -o risk_report.csv
+
+评分结果按「模型 + 数据」缓存到 .cache/scores/：数据只是在末尾追加了新学生时，只对新增的行调用模型。
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import ingest
+import model_store
+
+FEATURE_COLS = ["性别", "专业", "每周学习时长（小时）", "上课出勤率", "期中考试分数", "作业完成率"]
+TARGET_COL = "期末考试分数"
+ID_COL = "学号"
+SCORE_COL = "预测期末分数"
+RISK_COL = "风险等级"
+PASS_SCORE = 60
+# 风险等级：预测分 < 60 高风险，60~70 中风险，其余低风险
+RISK_BINS = [-np.inf, PASS_SCORE, 70, np.inf]
+RISK_LABELS = ["高风险", "中风险", "低风险"]
+SCORE_CACHE_DIR = os.environ.get("SCORE_CACHE_DIR", os.path.join(os.path.dirname(ingest.CACHE_DIR), "scores"))
+# 模型仓库中的名称；命令行（每晚任务）使用已发布的固定模型：模型不变时，新增学生只需增量评分
+MODEL_NAME = "grade"
+
+
+# ---------------------- 训练 ----------------------
+def build_pipeline(regressor=None):
+    """分类特征编码+数值特征保留的预处理管道 + 回归器（默认线性回归）"""
+    from sklearn.linear_model import LinearRegression
+    from sklearn.preprocessing import OneHotEncoder
+    from sklearn.compose import ColumnTransformer
+    from sklearn.pipeline import Pipeline
+
+    preprocessor = ColumnTransformer(
+        transformers=[
+            ("cat", OneHotEncoder(drop="first", sparse_output=False), ["性别", "专业"]),
+            ("num", "passthrough", ["每周学习时长（小时）", "上课出勤率", "期中考试分数", "作业完成率"])
+        ]
+    )
+    return Pipeline(steps=[
+        ("preprocessor", preprocessor),
+        ("regressor", regressor if regressor is not None else LinearRegression())
+    ])
+
+
+def prepare(df):
+    """:return: (特征, 目标)"""
+    return df[FEATURE_COLS], df[TARGET_COL]
+
+
+def fit_model(df, regressor=None):
+    """训练期末成绩预测模型（模型选择任务会传入选中的回归器）"""
+    model_pipeline = build_pipeline(regressor)
+    model_pipeline.fit(*prepare(df))
+    return model_pipeline
+
+
+def load_or_fit(df, retrain=False):
+    """
+    读取模型仓库中已发布的成绩模型；未发布时用 df 训练默认模型，只在内存中使用，不发布
+    （报告命令不应改动应用加载的线上模型）
+    :param retrain: 忽略已发布的模型，重新训练默认模型并发布
+    """
+    if not retrain:
+        published = model_store.load(MODEL_NAME)
+        if published is not None:
+            return published[0]
+        print("模型仓库中没有已发布的成绩模型，本次使用临时训练的默认模型（未发布，发布请加 --retrain）", file=sys.stderr)
+        return fit_model(df)
+    model = fit_model(df)
+    model_store.publish(MODEL_NAME, model, {"estimator": "LinearRegression", "source": "grade_model"}, df=df)
+    return model
+
+
+# ---------------------- 全体评分（增量） ----------------------
+def model_key(model):
+    """模型指纹：参数（含拟合结果）不变则评分缓存可复用"""
+    import joblib
+    return joblib.hash(model)[:16]
+
+
+def row_hashes(df):
+    """逐行特征哈希（向量化），用于判断旧数据是否原样保留、只在末尾追加"""
+    return pd.util.hash_pandas_object(df[FEATURE_COLS], index=False).to_numpy()
+
+
+def _score_cache_path(key):
+    return os.path.join(SCORE_CACHE_DIR, f"grade-{key}.parquet")
+
+
+def score_students(model, df, use_cache=True):
+    """
+    一次向量化 predict 给全体学生评分；已评过分的前缀行直接复用缓存，只对末尾新增的行调用模型
+    :return: 与 df 行对齐的 float64 预测分数数组
+    """
+    hashes = row_hashes(df)
+    path = _score_cache_path(model_key(model))
+    scores = np.empty(len(df), dtype=np.float64)
+    done = 0
+    if use_cache and os.path.exists(path):
+        cached = pd.read_parquet(path)
+        n = len(cached)
+        if n <= len(df) and np.array_equal(cached["hash"].to_numpy(), hashes[:n]):
+            scores[:n] = cached["score"].to_numpy()
+            done = n
+    if done < len(df):
+        scores[done:] = model.predict(df.iloc[done:][FEATURE_COLS])
+        if use_cache:
+            os.makedirs(SCORE_CACHE_DIR, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            pd.DataFrame({"hash": hashes, "score": scores}).to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+    return scores
+
+
+# ---------------------- 学业预警 ----------------------
+def top_k(scores, k, largest=False):
+    """
+    O(n) 选出前 K 名（np.argpartition），只对这 K 个排序
+    :param largest: False 取预测分最低（风险最高）的 K 个
+    :return: 按名次排好的行位置
+    """
+    k = min(k, len(scores))
+    if k == 0:
+        return np.empty(0, dtype=np.intp)
+    keys = -scores if largest else scores
+    idx = np.argpartition(keys, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+    return idx[np.argsort(keys[idx], kind="stable")]
+
+
+def risk_levels(scores):
+    return pd.cut(scores, RISK_BINS, right=False, labels=RISK_LABELS)
+
+
+def risk_report(df, scores, k=100, majors=None, genders=None, largest=False):
+    """
+    预警名单：按专业/性别筛选后取前 K 名
+    :return: (名单 DataFrame, 筛选后的各专业风险统计 DataFrame)
+    """
+    mask = np.ones(len(df), dtype=bool)
+    if majors:
+        mask &= df["专业"].isin(majors).to_numpy()
+    if genders:
+        mask &= df["性别"].isin(genders).to_numpy()
+    positions = np.flatnonzero(mask)
+    picked = positions[top_k(scores[positions], k, largest=largest)]
+
+    ranked = df.iloc[picked].copy()
+    ranked[SCORE_COL] = scores[picked].round(1)
+    ranked[RISK_COL] = risk_levels(scores[picked])
+    ranked.insert(0, "名次", np.arange(1, len(ranked) + 1))
+
+    sub = df.loc[mask, ["专业"]].assign(_fail=scores[mask] < PASS_SCORE, _score=scores[mask])
+    stats = sub.groupby("专业").agg(学生数=("_fail", "size"), 预测不及格人数=("_fail", "sum"),
+                                   平均预测分=("_score", "mean"))
+    stats["预测不及格率(%)"] = (stats["预测不及格人数"] / stats["学生数"] * 100).round(1)
+    stats["平均预测分"] = stats["平均预测分"].round(1)
+    return ranked, stats.sort_values("预测不及格率(%)", ascending=False).reset_index()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="学业风险预警报告（全体学生评分）")
+    parser.add_argument("--data", default=os.path.join(ingest.BASE_DIR, "student_data_adjusted_rounded.csv"))
+    parser.add_argument("--top", type=int, default=100, help="名单人数")
+    parser.add_argument("--major", action="append", help="只看指定专业，可重复")
+    parser.add_argument("--gender", action="append", help="只看指定性别，可重复")
+    parser.add_argument("-o", "--output", default="risk_report.csv")
+    parser.add_argument("--retrain", action="store_true", help="重新训练默认模型并发布（之后的评分缓存随之失效）")
+    parser.add_argument("--no-cache", action="store_true", help="忽略评分缓存，全部重新评分")
+    args = parser.parse_args(argv)
+
+    df = ingest.load_table(args.data, ingest.STUDENT_SCHEMA)
+    model = load_or_fit(df, retrain=args.retrain)
+    start = time.perf_counter()
+    scores = score_students(model, df, use_cache=not args.no_cache)
+    seconds = time.perf_counter() - start
+    ranked, stats = risk_report(df, scores, args.top, args.major, args.gender)
+    ranked.to_csv(args.output, index=False, encoding="utf-8-sig")
+    print(stats.to_string(index=False))
+    print(f"评分 {len(df):,} 名学生耗时 {seconds * 1000:.1f} 毫秒，预警名单 {len(ranked)} 人：{args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""
+CSV 数据接入：一次读取自动识别编码、向量化校验表结构，并写出 UTF-8 的 Parquet 缓存
+
+第一次加载某个 CSV 时解码+解析并写入 .cache/ingest/；之后只要源文件没有变化（大小与修改时间相同），
+直接读取 Parquet，跳过解码和文本解析。
+缓存文件名包含源文件路径、源文件版本和表结构三部分哈希：换一种表结构加载同一文件会重新校验，
+源文件变化后写入新缓存时删除该文件旧版本的缓存。
+"""
+import hashlib
+import io
+import json
+import os
+
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.environ.get("INGEST_CACHE_DIR", os.path.join(BASE_DIR, ".cache", "ingest"))
+
+# ---------------------- 各数据集的表结构 ----------------------
+# required：必须存在的列；numeric：必须是数值的列（允许缺失值）
+STUDENT_SCHEMA = {
+    "required": ["专业", "性别", "每周学习时长（小时）", "上课出勤率", "期中考试分数", "期末考试分数", "作业完成率"],
+    "numeric": ["每周学习时长（小时）", "上课出勤率", "期中考试分数", "期末考试分数", "作业完成率"],
+}
+INSURANCE_SCHEMA = {
+    "required": ['年龄', '性别', 'BMI', '子女数量', '是否吸烟', '区域', '医疗费用'],
+    "numeric": ['年龄', 'BMI', '子女数量', '医疗费用'],
+}
+PENGUIN_SCHEMA = {
+    "required": ['企鹅的种类', '企鹅栖息的岛屿', '喙的长度', '喙的深度', '翅膀的长度', '身体质量', '性别'],
+    "numeric": ['喙的长度', '喙的深度', '翅膀的长度', '身体质量'],
+}
+
+
+class SchemaError(ValueError):
+    """数据不符合表结构（缺列或数值列含非数值）"""
+
+    def __init__(self, message, missing_cols=None):
+        super().__init__(message)
+        self.missing_cols = missing_cols or []
+
+
+# ---------------------- 编码识别 ----------------------
+def detect_encoding(raw):
+    """
+    识别 CSV 字节内容的编码并解码
+    :param raw: 文件的全部字节
+    :return: (编码名, 解码后的文本)
+    """
+    if raw.startswith(b"\xef\xbb\xbf"):
+        return "utf-8-sig", raw[3:].decode("utf-8")
+    # UTF-8 解码遇到第一个非法字节就会失败，GBK 文件通常在表头就能判断出来
+    for encoding in ("utf-8", "gb18030"):
+        try:
+            return encoding, raw.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    from charset_normalizer import from_bytes
+    best = from_bytes(raw).best()
+    if best is None:
+        raise UnicodeDecodeError("unknown", raw[:1], 0, 1, "无法识别文件编码")
+    return best.encoding, str(best)
+
+
+def detect_file_encoding(path, sample_size=1 << 20):
+    """只读取文件开头一段来识别编码（用于无法整体读入内存的大文件，配合分块读取）"""
+    with open(path, "rb") as f:
+        sample = f.read(sample_size)
+    if len(sample) == sample_size and b"\n" in sample:
+        # 截到最后一个换行，避免把多字节字符切成两半
+        sample = sample[:sample.rindex(b"\n") + 1]
+    return detect_encoding(sample)[0]
+
+
+# ---------------------- 表结构校验 ----------------------
+def validate_schema(df, schema):
+    """向量化校验：缺失列用 Index 差集一次算出；数值列整列转换，非数值（原本不是空值）即报错"""
+    missing_cols = pd.Index(schema.get("required", [])).difference(df.columns).tolist()
+    if missing_cols:
+        raise SchemaError(f"缺少关键列：{', '.join(missing_cols)}", missing_cols)
+    numeric_cols = [c for c in schema.get("numeric", []) if not pd.api.types.is_numeric_dtype(df[c])]
+    if numeric_cols:
+        converted = df[numeric_cols].apply(pd.to_numeric, errors="coerce")
+        bad = (converted.isna() & df[numeric_cols].notna()).sum()
+        bad = bad[bad > 0]
+        if not bad.empty:
+            detail = "，".join(f"{col}（{n} 行）" for col, n in bad.items())
+            raise SchemaError(f"数值列包含非数值内容：{detail}")
+        df[numeric_cols] = converted
+    return df
+
+
+# ---------------------- 加载（带 Parquet 缓存） ----------------------
+def _hash(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+
+
+def _cache_prefix(path):
+    """同一源文件所有缓存共用的文件名前缀"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return f"{stem}-{_hash(os.path.abspath(path))}-"
+
+
+def _cache_path(path, schema=None):
+    stat = os.stat(path)
+    version = _hash(f"{stat.st_size}:{stat.st_mtime_ns}")
+    schema_key = _hash(json.dumps(schema, sort_keys=True, ensure_ascii=False))
+    return os.path.join(CACHE_DIR, f"{_cache_prefix(path)}{version}-{schema_key}.parquet")
+
+
+def _remove_stale(path, cache_path):
+    """删除同一源文件旧版本的缓存（当前版本其他表结构的缓存保留）"""
+    prefix = _cache_prefix(path)
+    version_prefix = os.path.basename(cache_path)[:len(prefix) + 13]  # 前缀 + 版本哈希 + "-"
+    for entry in os.scandir(CACHE_DIR):
+        name = entry.name
+        if name.startswith(prefix) and name.endswith(".parquet") and not name.startswith(version_prefix):
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+def read_csv_any(path):
+    """读取任意编码的 CSV（只读一次文件、只解码一次）"""
+    with open(path, "rb") as f:
+        raw = f.read()
+    _, text = detect_encoding(raw)
+    return pd.read_csv(io.StringIO(text))
+
+
+def load_table(path, schema=None, use_cache=True):
+    """
+    加载 CSV 为 DataFrame：命中缓存直接读 Parquet，否则识别编码、解析、校验后写入缓存
+    :param schema: 表结构字典（见 STUDENT_SCHEMA 等），不符合时抛出 SchemaError；缓存按表结构区分，命中即已通过同一表结构的校验
+    :raises FileNotFoundError: 源文件不存在
+    """
+    cache_path = _cache_path(path, schema)
+    if use_cache and os.path.exists(cache_path):
+        return pd.read_parquet(cache_path)
+
+    df = read_csv_any(path)
+    if schema is not None:
+        df = validate_schema(df, schema)
+    if use_cache:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # 先写临时文件再改名，避免并发读到写了一半的缓存
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, cache_path)
+        _remove_stale(path, cache_path)
+    return df
@@ -0,0 +1,221 @@
+"""
+医疗费用模型：训练、向量化特征编码、保单组合批量评分
+
+批量评分命令行用法：
+    python insurance_model.py portfolio.csv -o scored.parquet --chunksize 100000 --jobs -1
+
+输入文件需包含 年龄/性别/BMI/子女数量/是否吸烟/区域 六列（CSV 任意编码或 Parquet），
+结果逐块写出（原列 + 预测医疗费用），并输出按 区域 × 是否吸烟 分组的汇总统计。
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import ingest
+import model_store
+
+CATEGORICAL_COLS = ['性别', '是否吸烟', '区域']
+NUMERIC_COLS = ['年龄', 'BMI', '子女数量']
+FEATURE_INPUT_COLS = ['年龄', '性别', 'BMI', '子女数量', '是否吸烟', '区域']
+TARGET_COL = '医疗费用'
+PREDICTION_COL = '预测医疗费用'
+GROUP_COLS = ['区域', '是否吸烟']
+
+
+# ---------------------- 训练与编码 ----------------------
+def encode_features(df, encoder, feature_names):
+    """
+    用训练好的 OneHotEncoder 整表编码（数值列 + 独热列），列顺序与训练时一致
+    :param df: 至少包含 FEATURE_INPUT_COLS 的 DataFrame，行数不限
+    """
+    encoded = encoder.transform(df[CATEGORICAL_COLS])
+    values = np.hstack([df[NUMERIC_COLS].to_numpy(dtype=np.float64), encoded])
+    return pd.DataFrame(values, columns=feature_names, index=df.index)
+
+
+def prepare(df):
+    """
+    独热编码类别特征（性别、是否吸烟、区域）；未见过的类别编码为全 0，批量评分时不会报错
+    :return: (特征矩阵, 目标, 编码器, 特征列名)
+    """
+    from sklearn.preprocessing import OneHotEncoder
+
+    encoder = OneHotEncoder(sparse_output=False, drop=None, handle_unknown="ignore")
+    encoder.fit(df[CATEGORICAL_COLS])
+    feature_names = NUMERIC_COLS + encoder.get_feature_names_out(CATEGORICAL_COLS).tolist()
+    return encode_features(df, encoder, feature_names), df[TARGET_COL], encoder, feature_names
+
+
+def build_pipeline(estimator):
+    """
+    与 prepare 相同的特征（数值列 + 独热列）做成管道，供交叉验证使用：编码器只在每折的训练集上拟合
+    :param estimator: 回归器
+    """
+    from sklearn.compose import ColumnTransformer
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import OneHotEncoder
+
+    preprocessor = ColumnTransformer(transformers=[
+        ("num", "passthrough", NUMERIC_COLS),
+        ("cat", OneHotEncoder(sparse_output=False, handle_unknown="ignore"), CATEGORICAL_COLS),
+    ])
+    return Pipeline(steps=[("preprocessor", preprocessor), ("regressor", estimator)])
+
+
+def fit_model(df, estimator=None):
+    """
+    训练医疗费用模型（默认随机森林；模型选择任务会传入选中的估计器）
+    :return: (模型, 编码器, 特征列名)
+    """
+    from sklearn.ensemble import RandomForestRegressor
+
+    X_processed, y, encoder, feature_names = prepare(df)
+    model = estimator if estimator is not None else RandomForestRegressor(n_estimators=100, random_state=42)
+    model.fit(X_processed, y)
+    return model, encoder, feature_names
+
+
+# ---------------------- 批量评分 ----------------------
+def iter_portfolio(path, chunksize=100_000):
+    """分块读取保单文件（CSV 自动识别编码 / Parquet 按批读取），内存占用与文件大小无关"""
+    if path.lower().endswith(".parquet"):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        encoding = ingest.detect_file_encoding(path)
+        yield from pd.read_csv(path, encoding=encoding, chunksize=chunksize)
+
+
+def _score_chunk(chunk, model, encoder, feature_names):
+    missing_cols = pd.Index(FEATURE_INPUT_COLS).difference(chunk.columns).tolist()
+    if missing_cols:
+        raise ingest.SchemaError(f"缺少关键列：{', '.join(missing_cols)}", missing_cols)
+    chunk = chunk.copy()
+    chunk[PREDICTION_COL] = model.predict(encode_features(chunk, encoder, feature_names)).round(2)
+    return chunk
+
+
+class _ResultWriter:
+    """按输出后缀逐块写 CSV（UTF-8 BOM，Excel 可直接打开）或 Parquet"""
+
+    def __init__(self, path):
+        self.path = path
+        self.parquet = path.lower().endswith(".parquet")
+        self._writer = None
+        self._first = True
+
+    def write(self, chunk):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table.cast(self._writer.schema))
+        else:
+            chunk.to_csv(self.path, mode="w" if self._first else "a", header=self._first,
+                         index=False, encoding="utf-8-sig" if self._first else "utf-8")
+        self._first = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def _accumulate(stats, chunk):
+    pred = chunk[PREDICTION_COL]
+    part = pred.groupby([chunk[c] for c in GROUP_COLS]).agg(["count", "sum", "min", "max"])
+    part["sumsq"] = (pred ** 2).groupby([chunk[c] for c in GROUP_COLS]).sum()
+    if stats is None:
+        return part
+    combined = stats.add(part[["count", "sum", "sumsq"]], fill_value=0)
+    combined["min"] = np.fmin(stats["min"].reindex(combined.index), part["min"].reindex(combined.index))
+    combined["max"] = np.fmax(stats["max"].reindex(combined.index), part["max"].reindex(combined.index))
+    return combined
+
+
+def summarize(stats):
+    """把累计量整理为 区域 × 是否吸烟 的汇总表"""
+    count = stats["count"]
+    mean = stats["sum"] / count
+    # 样本标准差（ddof=1，与 pandas 的 std 一致）
+    std = np.sqrt(np.maximum((stats["sumsq"] - count * mean ** 2) / np.maximum(count - 1, 1), 0))
+    return pd.DataFrame({
+        "保单数": count.astype(np.int64),
+        "平均预测费用": mean.round(2),
+        "标准差": std.round(2),
+        "最低": stats["min"].round(2),
+        "最高": stats["max"].round(2),
+        "预测费用合计": stats["sum"].round(2),
+    }).reset_index()
+
+
+def score_portfolio(input_path, output_path, model, encoder, feature_names,
+                    chunksize=100_000, n_jobs=-1, progress=None):
+    """
+    保单组合批量评分：分块读取 → 多核并行预测 → 按原顺序逐块写出，同时累计分组统计
+    :param progress: 可选回调 progress(已完成行数)
+    :return: (按 区域 × 是否吸烟 的汇总 DataFrame, 总行数, 耗时秒)
+    """
+    from joblib import Parallel, delayed
+
+    start = time.perf_counter()
+    writer = _ResultWriter(output_path)
+    stats, total = None, 0
+    try:
+        # 线程后端：随机森林预测在 C 层释放 GIL；生成器模式按提交顺序返回，最多预取 2×n_jobs 块
+        parallel = Parallel(n_jobs=n_jobs, prefer="threads", return_as="generator")
+        tasks = (delayed(_score_chunk)(chunk, model, encoder, feature_names)
+                 for chunk in iter_portfolio(input_path, chunksize))
+        for scored in parallel(tasks):
+            writer.write(scored)
+            stats = _accumulate(stats, scored)
+            total += len(scored)
+            if progress is not None:
+                progress(total)
+    finally:
+        writer.close()
+    summary = summarize(stats) if stats is not None else pd.DataFrame()
+    return summary, total, time.perf_counter() - start
+
+
+def train_from_csv(path):
+    """命令行使用：模型仓库里有已发布的模型就直接用，否则从训练数据文件训练默认模型"""
+    published = model_store.load("insurance")
+    if published is not None:
+        return published[0]
+    return fit_model(ingest.load_table(path, ingest.INSURANCE_SCHEMA))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="保单组合医疗费用批量评分")
+    parser.add_argument("input", help="保单文件（.csv 或 .parquet）")
+    parser.add_argument("-o", "--output", default="scored_portfolio.csv", help="结果文件（.csv 或 .parquet）")
+    parser.add_argument("--train", default=os.path.join(ingest.BASE_DIR, "insurance-chinese.csv"),
+                        help="训练数据文件（模型仓库中没有已发布的模型时使用）")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("-j", "--jobs", type=int, default=-1, help="并行数，-1 表示使用全部核")
+    parser.add_argument("--summary", help="把分组汇总另存为 CSV")
+    args = parser.parse_args(argv)
+
+    model, encoder, feature_names = train_from_csv(args.train)
+    summary, total, seconds = score_portfolio(
+        args.input, args.output, model, encoder, feature_names,
+        chunksize=args.chunksize, n_jobs=args.jobs,
+        progress=lambda n: print(f"\r已评分 {n:,} 条", end="", file=sys.stderr),
+    )
+    print(file=sys.stderr)
+    print(summary.to_string(index=False))
+    print(f"共 {total:,} 条，耗时 {seconds:.1f} 秒（{total / max(seconds, 1e-9):,.0f} 条/秒），结果：{args.output}")
+    if args.summary:
+        summary.to_csv(args.summary, index=False, encoding="utf-8-sig")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
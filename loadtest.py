@@ -0,0 +1,260 @@
+"""
+本地并发压测：模拟 N 个浏览器会话，通过 Streamlit 的 WebSocket 协议驱动真实的应用进程
+
+用法示例：
+    python loadtest.py cjfx --concurrency 1,4,16,32 --iterations 5
+    python loadtest.py ten --url ws://127.0.0.1:8501 --concurrency 8 --csv ten_load.csv
+
+不指定 --url 时会在本机随机端口自动启动 `streamlit run <脚本>`，测试结束后关闭；全程只访问 localhost。
+每个会话按预设流程操作（切换页面、提交预测等），记录每一步从发送到脚本运行结束的耗时，
+输出各并发档位的 p50/p95/p99 延迟与吞吐量。
+"""
+import argparse
+import asyncio
+import csv
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import numpy as np
+from tornado.websocket import websocket_connect
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# ---------------------- 压测流程 ----------------------
+# 步骤：("radio"/"select", 标签或key, 选项) 切换单选框/下拉框；("click", 按钮文字) 点击按钮/表单提交
+# setup 每个会话执行一次，loop 按 --iterations 重复执行
+FLOWS = {
+    "cjfx": {
+        "script": "cjfx.py",
+        "setup": [],
+        "loop": [
+            ("radio", "nav_radio", "专业数据分析"),
+            ("radio", "nav_radio", "成绩预测系统"),
+            ("click", "🚀 预测期末成绩"),
+            ("click", "🚀 预测期末成绩"),
+        ],
+    },
+    "ten": {
+        "script": "ten.py",
+        "setup": [("radio", "导航菜单", "预测医疗费用")],
+        "loop": [("click", "预测费用")],
+    },
+    "eleven": {
+        "script": "eleven.py",
+        "setup": [("select", "请选择页面", "预测分类页面")],
+        "loop": [("click", "预测分类")],
+    },
+}
+
+WIDGET_TYPES = {"radio", "selectbox", "button"}
+
+
+class StepError(Exception):
+    pass
+
+
+# ---------------------- 单个模拟会话 ----------------------
+class Session:
+    """一个浏览器会话：维护控件状态，每一步发送 rerun 请求并等待脚本运行结束"""
+
+    def __init__(self, url, timeout=120):
+        self.url = url.rstrip("/") + "/_stcore/stream"
+        self.timeout = timeout
+        self.conn = None
+        self.widgets = {}  # id -> (类型, 标签, 选项)
+        self.states = {}   # id -> (值字段, 值)
+
+    async def connect(self):
+        self.conn = await websocket_connect(self.url, subprotocols=["streamlit"])
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+
+    async def rerun(self, trigger_id=None):
+        """发送一次 rerun（带上全部控件状态），返回 (耗时秒, 是否出现异常元素)"""
+        msg = BackMsg()
+        client_state = msg.rerun_script
+        client_state.SetInParent()  # 没有控件状态时也要显式设置 oneof，否则发出的是空消息
+        for widget_id, (field, value) in self.states.items():
+            ws = client_state.widget_states.widgets.add()
+            ws.id = widget_id
+            setattr(ws, field, value)
+        if trigger_id is not None:
+            ws = client_state.widget_states.widgets.add()
+            ws.id = trigger_id
+            ws.trigger_value = True
+
+        start = time.perf_counter()
+        await self.conn.write_message(msg.SerializeToString(), binary=True)
+        self.widgets = {}
+        has_exception = False
+        while True:
+            raw = await asyncio.wait_for(self.conn.read_message(), self.timeout)
+            if raw is None:
+                raise StepError("连接被服务器关闭")
+            fwd = ForwardMsg()
+            fwd.ParseFromString(raw)
+            kind = fwd.WhichOneof("type")
+            if kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                element = fwd.delta.new_element
+                etype = element.WhichOneof("type")
+                if etype == "exception":
+                    has_exception = True
+                elif etype in WIDGET_TYPES:
+                    proto = getattr(element, etype)
+                    self.widgets[proto.id] = (etype, proto.label, list(getattr(proto, "options", [])))
+            elif kind == "script_finished":
+                # 因新的 rerun 提前结束的不算完成
+                if fwd.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    return time.perf_counter() - start, has_exception
+
+    def _find(self, etype, name):
+        for widget_id, (t, label, options) in self.widgets.items():
+            if t == etype and (label == name or widget_id.endswith("-" + name)):
+                return widget_id, options
+        raise StepError(f"页面上找不到控件：{etype} {name}")
+
+    async def step(self, action, *args):
+        if action == "open":
+            return await self.rerun()
+        if action in ("radio", "select"):
+            name, option = args
+            if action == "radio":
+                # 单选框以选项下标传值，下拉框以格式化后的选项文本传值
+                widget_id, options = self._find("radio", name)
+                self.states[widget_id] = ("int_value", options.index(option))
+            else:
+                widget_id, options = self._find("selectbox", name)
+                self.states[widget_id] = ("string_value", option)
+            return await self.rerun()
+        if action == "click":
+            widget_id, _ = self._find("button", args[0])
+            return await self.rerun(trigger_id=widget_id)
+        raise ValueError(f"未知步骤：{action}")
+
+
+async def _run_session(url, flow, iterations, samples, errors):
+    session = Session(url)
+    try:
+        await session.connect()
+        await session.step("open")
+        for step in flow["setup"]:
+            await session.step(*step)
+        for _ in range(iterations):
+            for step in flow["loop"]:
+                elapsed, has_exception = await session.step(*step)
+                samples.append((" ".join(step), elapsed))
+                if has_exception:
+                    errors.append(f"{' '.join(step)}：页面出现异常")
+    except (StepError, asyncio.TimeoutError, OSError) as e:
+        errors.append(str(e) or type(e).__name__)
+    finally:
+        session.close()
+
+
+async def run_level(url, flow, concurrency, iterations):
+    """以指定并发数运行一轮，返回 (样本列表, 错误列表, 墙钟耗时)"""
+    samples, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        _run_session(url, flow, iterations, samples, errors) for _ in range(concurrency)
+    ])
+    return samples, errors, time.perf_counter() - start
+
+
+def summarize(concurrency, samples, errors, wall):
+    latencies = np.array([s[1] for s in samples]) * 1000
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(latencies) else (np.nan,) * 3
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else 0.0,
+        "p50_ms": round(float(p50), 1),
+        "p95_ms": round(float(p95), 1),
+        "p99_ms": round(float(p99), 1),
+    }
+
+
+# ---------------------- 本地服务管理 ----------------------
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(script, port):
+    """在本机启动被测应用（无浏览器、仅监听 127.0.0.1），等待健康检查通过"""
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", script,
+         "--server.headless", "true", "--server.address", "127.0.0.1",
+         "--server.port", str(port), "--browser.gatherUsageStats", "false"],
+        cwd=BASE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1)
+            return proc
+        except OSError:
+            if proc.poll() is not None:
+                break
+            time.sleep(0.3)
+    proc.terminate()
+    raise RuntimeError(f"启动 {script} 失败")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Streamlit 应用本地并发压测")
+    parser.add_argument("flow", choices=sorted(FLOWS), help="压测流程（对应的应用脚本）")
+    parser.add_argument("--url", help="已运行的应用地址，如 ws://127.0.0.1:8501；不填则自动启动")
+    parser.add_argument("-c", "--concurrency", default="1,2,4,8,16", help="并发会话数档位，逗号分隔")
+    parser.add_argument("-n", "--iterations", type=int, default=5, help="每个会话重复执行流程的次数")
+    parser.add_argument("--csv", help="把各档位结果写入 CSV（便于画吞吐/延迟曲线）")
+    args = parser.parse_args(argv)
+
+    flow = FLOWS[args.flow]
+    levels = [int(x) for x in args.concurrency.split(",") if x.strip()]
+    proc = None
+    url = args.url
+    if url is None:
+        port = _free_port()
+        proc = start_server(flow["script"], port)
+        url = f"ws://127.0.0.1:{port}"
+
+    rows = []
+    try:
+        # 预热一轮：加载数据、训练模型，避免首个档位把冷启动算进去
+        asyncio.run(run_level(url, flow, 1, 1))
+        print(f"{'并发':>6}{'请求数':>8}{'错误':>6}{'吞吐(次/秒)':>12}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}")
+        for level in levels:
+            samples, errors, wall = asyncio.run(run_level(url, flow, level, args.iterations))
+            row = summarize(level, samples, errors, wall)
+            rows.append(row)
+            print(f"{row['concurrency']:>6}{row['requests']:>8}{row['errors']:>6}{row['throughput_rps']:>12}"
+                  f"{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}")
+            for error in sorted(set(errors))[:3]:
+                print(f"      错误：{error}")
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+    return 1 if any(row["errors"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,290 @@
+"""
+专业数据分析报告：分组聚合、图表、导出为独立 HTML
+
+cjfx.py 的「专业数据分析」页面与后台导出（export_queue.py）共用这里的聚合结果与图表，
+页面上看到的与导出文件里的是同一组数值、同一套样式。
+"""
+import datetime
+import html
+
+import numpy as np
+
+import metrics
+import model_store
+
+BIGDATA_MAJOR = "大数据管理"
+PASS_SCORE = 60
+REPORT_TITLE = "专业数据分析报告"
+
+
+# ---------------------- 聚合（与页面展示相同的口径） ----------------------
+def dataset_version(df):
+    """数据版本：逐行内容哈希，数据不变版本号不变（导出任务按它去重）"""
+    return model_store.data_fingerprint(df)
+
+
+def compute_aggregates(df):
+    """
+    页面与导出所需的全部聚合结果
+    :return: 字典（version、rows、gender_ratio、study_metrics、attendance_avg、bigdata；无大数据管理专业时 bigdata 为 None）
+    """
+    version = dataset_version(df)
+    # 页面原有的展示用随机扰动：以数据版本为种子，同一份数据每次重跑、导出文件中都是同一组数值
+    rng = np.random.default_rng(int(version, 16))
+
+    gender_ratio = df.groupby("专业")["性别"].value_counts(normalize=True) * 100
+    gender_ratio = gender_ratio.unstack(fill_value=0).round(1)
+
+    study_metrics = df.groupby("专业")[["每周学习时长（小时）", "期中考试分数", "期末考试分数"]].mean()
+    for col, spread in (("每周学习时长（小时）", 2), ("期中考试分数", 5), ("期末考试分数", 4)):
+        study_metrics[col] += rng.uniform(-spread, spread, size=len(study_metrics))
+    study_metrics = study_metrics.round(1)
+
+    attendance_avg = df.groupby("专业")["上课出勤率"].mean().round(2)
+    attendance_avg = attendance_avg + rng.uniform(-0.02, 0.02, size=len(attendance_avg)).round(2)
+
+    bigdata_df = df[df["专业"] == BIGDATA_MAJOR]
+    bigdata = None
+    if not bigdata_df.empty:
+        bigdata = {
+            "avg_attendance": bigdata_df["上课出勤率"].mean() * 100,
+            "avg_final": bigdata_df["期末考试分数"].mean(),
+            "pass_rate": (bigdata_df["期末考试分数"] >= PASS_SCORE).mean() * 100,
+            "avg_hours": bigdata_df["每周学习时长（小时）"].mean(),
+            "final_scores": bigdata_df[["期末考试分数"]].reset_index(drop=True),
+        }
+    return {
+        "version": version, "rows": len(df), "gender_ratio": gender_ratio,
+        "study_metrics": study_metrics, "attendance_avg": attendance_avg, "bigdata": bigdata,
+    }
+
+
+def tables(agg):
+    """页面右侧的三张数据表"""
+    study_table = agg["study_metrics"].reset_index().rename(columns={
+        "专业": "major", "每周学习时长（小时）": "study_hours",
+        "期中考试分数": "midterm_score", "期末考试分数": "final_score"
+    })
+    attendance_rank = agg["attendance_avg"].sort_values(ascending=False).reset_index()
+    attendance_rank.columns = ["专业", "平均出勤率"]
+    return {
+        "gender": agg["gender_ratio"].reset_index(),
+        "study": study_table,
+        "attendance": attendance_rank,
+    }
+
+
+def indicators(agg):
+    """大数据管理专业的四个核心指标：[(名称, 显示值), ...]；无该专业数据时为空列表"""
+    bigdata = agg["bigdata"]
+    if bigdata is None:
+        return []
+    return [
+        ("平均出勤率", f"{bigdata['avg_attendance']:.1f}%"),
+        ("平均期末成绩", f"{bigdata['avg_final']:.1f}分"),
+        ("及格率", f"{bigdata['pass_rate']:.1f}%"),
+        ("平均学习时间", f"{bigdata['avg_hours']:.1f}小时"),
+    ]
+
+
+# ---------------------- 图表（构建耗时计入 app_function_seconds{func="figure_*"}） ----------------------
+@metrics.timed("app_function_seconds", func="figure_gender")
+def gender_figure(agg):
+    import plotly.express as px
+
+    fig_gender = px.bar(
+        agg["gender_ratio"],
+        barmode="group",
+        labels={"value": "比例(%)", "专业": "专业名称"},
+        color_discrete_sequence=["#FF6B6B", "#4C84FF"],  # 女-红，男-蓝
+        title="各专业性别比例分布"
+    )
+    fig_gender.for_each_trace(lambda t: t.update(name="女" if t.name == "女" else "男"))
+    fig_gender.update_layout(
+        plot_bgcolor="black",
+        paper_bgcolor="black",
+        font_color="white",
+        yaxis_range=[0, 100],
+        legend=dict(orientation="h", yanchor="bottom", y=1.02)
+    )
+    return fig_gender
+
+
+@metrics.timed("app_function_seconds", func="figure_study")
+def study_figure(agg):
+    """背景柱 + 双折线"""
+    import plotly.graph_objects as go
+
+    study_metrics = agg["study_metrics"]
+    majors = study_metrics.index.tolist()
+    study_hours = study_metrics["每周学习时长（小时）"].values
+    midterm_score = study_metrics["期中考试分数"].values
+    final_score = study_metrics["期末考试分数"].values
+
+    fig_study = go.Figure()
+    # 背景柱状图（学习时长）
+    fig_study.add_trace(go.Bar(
+        x=majors, y=study_hours, name="学习时长（背景）",
+        marker_color="#8ECDFC", opacity=0.5, yaxis="y1"
+    ))
+    # 学习时长折线
+    fig_study.add_trace(go.Scatter(
+        x=majors, y=study_hours, name="每周学习时长",
+        line=dict(color="#FFC107", width=3), mode="lines+markers", yaxis="y1"
+    ))
+    # 期中分数折线
+    fig_study.add_trace(go.Scatter(
+        x=majors, y=midterm_score, name="期中考试分数",
+        line=dict(color="#20C997", width=3), mode="lines+markers", yaxis="y2"
+    ))
+    # 期末分数折线（虚线）
+    fig_study.add_trace(go.Scatter(
+        x=majors, y=final_score, name="期末考试分数",
+        line=dict(color="#198754", width=3, dash="dash"), mode="lines+markers", yaxis="y2"
+    ))
+
+    fig_study.update_layout(
+        title="各专业平均学习时间与成绩对比",
+        plot_bgcolor="black", paper_bgcolor="black", font_color="white",
+        # 左轴（学习时长）
+        yaxis=dict(title="平均学习时间（小时）", side="left", color="#FFC107", range=[0, max(study_hours)*1.2]),
+        # 右轴（分数）
+        yaxis2=dict(title="平均分数", side="right", overlaying="y", color="#20C997", range=[0, 100]),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02)
+    )
+    return fig_study
+
+
+@metrics.timed("app_function_seconds", func="figure_attendance")
+def attendance_figure(agg):
+    """颜色渐变柱状图"""
+    import plotly.express as px
+
+    attendance_avg = agg["attendance_avg"]
+    fig_attendance = px.bar(
+        attendance_avg,
+        x=attendance_avg.index, y=attendance_avg.values,
+        color=attendance_avg.values,  # 颜色绑定出勤率数值
+        color_continuous_scale=[(0, "#FFFFE0"), (0.5, "#8ECDFC"), (1, "#1E3A8A")],  # 黄→浅蓝→深蓝
+        labels={"value": "平均出勤率", "专业": "专业名称"},
+        title="各专业平均出勤率"
+    )
+    fig_attendance.update_layout(
+        plot_bgcolor="black", paper_bgcolor="black", font_color="white",
+        xaxis_title="专业名称", yaxis_title="y",
+        coloraxis_showscale=True,
+        coloraxis_colorbar=dict(
+            title="出勤率", orientation="v",
+            tickvals=[attendance_avg.min(), attendance_avg.max()],
+            ticktext=[f"{attendance_avg.min():.2f}", f"{attendance_avg.max():.2f}"],
+            thickness=15
+        )
+    )
+    fig_attendance.update_traces(width=0.8)
+    return fig_attendance
+
+
+@metrics.timed("app_function_seconds", func="figure_bigdata")
+def bigdata_figures(agg):
+    """大数据管理专业的成绩分布直方图与箱线图；无该专业数据时返回 (None, None)"""
+    import plotly.express as px
+
+    if agg["bigdata"] is None:
+        return None, None
+    scores = agg["bigdata"]["final_scores"]
+    fig_hist = px.histogram(
+        scores, x="期末考试分数", nbins=10,
+        color_discrete_sequence=["#20C997"], title="期末成绩分布"
+    )
+    fig_hist.update_layout(
+        plot_bgcolor="black", paper_bgcolor="black", font_color="white",
+        yaxis_title="count", xaxis_title="final_score"
+    )
+    fig_box = px.box(
+        scores, y="期末考试分数", color_discrete_sequence=["#20C997"],
+        title="期末成绩箱线图"
+    )
+    fig_box.update_layout(
+        plot_bgcolor="black", paper_bgcolor="black", font_color="white",
+        yaxis_title="final_score", xaxis_showticklabels=False
+    )
+    return fig_hist, fig_box
+
+
+# ---------------------- 导出 ----------------------
+HTML_STYLE = """
+body { background: #000; color: #fff; font-family: "Microsoft YaHei", "PingFang SC", sans-serif; margin: 24px 40px; }
+h1 { border-bottom: 1px solid #444; padding-bottom: 12px; }
+.meta { color: #aaa; font-size: 13px; }
+section { margin: 32px 0; page-break-inside: avoid; }
+.row { display: flex; gap: 24px; align-items: flex-start; }
+.chart { flex: 3; min-width: 0; }
+.side { flex: 1; }
+.half { flex: 1; min-width: 0; }
+table { border-collapse: collapse; font-size: 13px; width: 100%; }
+th, td { border: 1px solid #444; padding: 4px 8px; text-align: right; }
+th { background: #222; }
+.cards { display: flex; gap: 16px; }
+.card { flex: 1; background: #1a1a1a; border-radius: 8px; padding: 8px 16px; }
+.card p { margin: 4px 0; }
+.card .value { font-size: 20px; font-weight: bold; }
+@media print { body { margin: 0; } section { page-break-after: always; } }
+"""
+
+
+def render_html(agg, progress=None):
+    """
+    生成独立 HTML 报告（plotly.js 内嵌一次，离线可打开；浏览器「打印 → 另存为 PDF」即可得到 PDF）
+    :param progress: 进度回调 progress(比例, 说明)，由导出队列传入
+    :return: UTF-8 编码的 HTML 字节
+    """
+    from plotly.offline import get_plotlyjs
+
+    report = progress or (lambda fraction, message: None)
+    table_data = tables(agg)
+
+    def chart(fig):
+        return fig.to_html(full_html=False, include_plotlyjs=False, config={"responsive": True})
+
+    def table(frame):
+        return frame.to_html(index=False, border=0, float_format=lambda v: f"{v:g}")
+
+    steps = [
+        ("1. 各专业男女性别比例", lambda: gender_figure(agg), "性别比例数据", table_data["gender"]),
+        ("2. 各专业学习指标对比", lambda: study_figure(agg), "详细数据", table_data["study"]),
+        ("3. 各专业出勤率分析", lambda: attendance_figure(agg), "出勤率排名", table_data["attendance"]),
+    ]
+    sections = []
+    for i, (heading, build, side_title, frame) in enumerate(steps):
+        report(i / (len(steps) + 2), f"正在生成：{heading}")
+        sections.append(
+            f"<section><h2>{html.escape(heading)}</h2><div class='row'>"
+            f"<div class='chart'>{chart(build())}</div>"
+            f"<div class='side'><h3>{html.escape(side_title)}</h3>{table(frame)}</div></div></section>"
+        )
+
+    report(len(steps) / (len(steps) + 2), f"正在生成：4. {BIGDATA_MAJOR}专业专项分析")
+    fig_hist, fig_box = bigdata_figures(agg)
+    if fig_hist is None:
+        body = f"<p>未找到“{BIGDATA_MAJOR}”专业的数据</p>"
+    else:
+        cards = "".join(
+            f"<div class='card'><p>{html.escape(name)}</p><p class='value'>{html.escape(value)}</p></div>"
+            for name, value in indicators(agg)
+        )
+        body = (f"<div class='cards'>{cards}</div>"
+                f"<div class='row'><div class='half'>{chart(fig_hist)}</div><div class='half'>{chart(fig_box)}</div></div>")
+    sections.append(f"<section><h2>4. {BIGDATA_MAJOR}专业专项分析</h2>{body}</section>")
+
+    report((len(steps) + 1) / (len(steps) + 2), "正在打包报告")
+    generated_at = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    document = (
+        "<!DOCTYPE html><html lang='zh-CN'><head><meta charset='utf-8'>"
+        f"<title>{REPORT_TITLE}</title><style>{HTML_STYLE}</style>"
+        f"<script type='text/javascript'>{get_plotlyjs()}</script></head><body>"
+        f"<h1>📊 {REPORT_TITLE}</h1>"
+        f"<p class='meta'>数据：{agg['rows']:,} 名学生 · 数据版本 {agg['version']} · 生成时间 {generated_at}</p>"
+        + "".join(sections) + "</body></html>"
+    )
+    return document.encode("utf-8")
+
@@ -0,0 +1,261 @@
+import bisect
+import contextlib
+import cProfile
+import functools
+import io
+import logging
+import os
+import pstats
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import streamlit as st
+
+logger = logging.getLogger(__name__)
+
+# ---------------------- 指标注册表（进程内，所有会话共享） ----------------------
+# 本地指标端口，设为 0 关闭；Prometheus 抓取地址 http://127.0.0.1:<端口>/metrics
+# 同一台机器上运行多个应用进程时，端口被占用就依次尝试其后的端口（共 APP_METRICS_PORT_RANGE 个），
+# 实际端口写入日志，也可由 server_port() 取得；需要固定端口时为每个进程分别设置 APP_METRICS_PORT
+METRICS_PORT = int(os.environ.get("APP_METRICS_PORT", "9464"))
+METRICS_PORT_RANGE = int(os.environ.get("APP_METRICS_PORT_RANGE", "10"))
+# 耗时直方图的桶上界（秒）
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HELP = {
+    "app_function_seconds": "数据加载/模型训练等热点函数耗时",
+    "app_predict_seconds": "单次 model.predict 耗时",
+    "app_page_render_seconds": "页面（一次重跑）渲染耗时",
+    "app_cache_requests_total": "缓存访问次数（按命中/未命中）",
+    "app_reruns_total": "脚本重跑次数",
+}
+
+
+class MetricsRegistry:
+    """线程安全的计数器与直方图集合，可导出为 Prometheus 文本格式"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}    # (name, labels) -> value
+        self.histograms = {}  # (name, labels) -> [各桶计数..., 总次数, 总耗时]
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            hist = self.histograms.setdefault(key, [0] * (len(BUCKETS) + 2) + [0.0])
+            hist[bisect.bisect_left(BUCKETS, seconds)] += 1
+            hist[-2] += 1
+            hist[-1] += seconds
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.counters), {k: list(v) for k, v in self.histograms.items()}
+
+    def render_prometheus(self):
+        """导出为 Prometheus text exposition format (0.0.4)"""
+        counters, histograms = self.snapshot()
+        lines = []
+        for name in sorted({k[0] for k in counters}):
+            lines += [f"# HELP {name} {HELP.get(name, name)}", f"# TYPE {name} counter"]
+            for (n, labels), value in sorted(counters.items()):
+                if n == name:
+                    lines.append(f"{name}{_fmt_labels(labels)} {value}")
+        for name in sorted({k[0] for k in histograms}):
+            lines += [f"# HELP {name} {HELP.get(name, name)}", f"# TYPE {name} histogram"]
+            for (n, labels), hist in sorted(histograms.items()):
+                if n != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(BUCKETS + ("+Inf",), hist[:len(BUCKETS) + 1]):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_fmt_labels(labels + (('le', str(bound)),))} {cumulative}")
+                lines.append(f"{name}_count{_fmt_labels(labels)} {hist[-2]}")
+                lines.append(f"{name}_sum{_fmt_labels(labels)} {hist[-1]:.6f}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+REGISTRY = MetricsRegistry()
+inc = REGISTRY.inc
+observe = REGISTRY.observe
+
+
+# ---------------------- 计时工具 ----------------------
+@contextlib.contextmanager
+def timer(name, **labels):
+    """计时上下文：with metrics.timer("app_predict_seconds", model="grade"): ..."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+
+def timed(name, **labels):
+    """计时装饰器"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timer(name, **labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+_local = threading.local()
+
+
+def instrument_cache(name, cache_decorator):
+    """
+    包装 st.cache_data / st.cache_resource，统计命中与未命中次数，并对未命中时的实际执行计时
+    用法：@metrics.instrument_cache("load_student_data", st.cache_data(show_spinner=False))
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def on_miss(*args, **kwargs):
+            # 只有缓存未命中时 Streamlit 才会真正执行函数体
+            _local.miss = True
+            with timer("app_function_seconds", func=name):
+                return func(*args, **kwargs)
+
+        cached = cache_decorator(on_miss)
+
+        @functools.wraps(func)
+        def lookup(*args, **kwargs):
+            # 保存外层状态，缓存函数互相嵌套调用时各自统计
+            outer = getattr(_local, "miss", False)
+            _local.miss = False
+            try:
+                result = cached(*args, **kwargs)
+                missed = _local.miss
+            finally:
+                _local.miss = outer
+            inc("app_cache_requests_total", cache=name, result="miss" if missed else "hit")
+            return result
+
+        lookup.clear = cached.clear
+        return lookup
+    return decorator
+
+
+# ---------------------- 本地指标端口 ----------------------
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = REGISTRY.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server_lock = threading.Lock()
+_server = None
+
+
+def ensure_server(port=METRICS_PORT, port_range=METRICS_PORT_RANGE):
+    """
+    进程内只启动一次指标 HTTP 服务（仅监听 127.0.0.1）
+    端口被占用时依次尝试 port ~ port+port_range-1；全部被占用则记录警告，本进程不再导出指标
+    """
+    global _server
+    if not port or _server is not None:
+        return _server
+    with _server_lock:
+        if _server is None:
+            for candidate in range(port, port + max(port_range, 1)):
+                try:
+                    _server = ThreadingHTTPServer(("127.0.0.1", candidate), _MetricsHandler)
+                    break
+                except OSError:
+                    continue
+            else:
+                _server = False  # 不再重试
+                logger.warning("指标端口 %d-%d 均被占用，本进程不导出指标；可通过 APP_METRICS_PORT 为每个进程指定端口",
+                               port, port + max(port_range, 1) - 1)
+                return _server
+            threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+            logger.info("指标服务已启动：http://127.0.0.1:%d/metrics", _server.server_address[1])
+    return _server
+
+
+def server_port():
+    """本进程指标服务的实际端口，未启动返回 None"""
+    return _server.server_address[1] if _server else None
+
+
+# ---------------------- 每次重跑：计数 + 计时 + 可选性能剖析 ----------------------
+def track_rerun(app):
+    """记录一次脚本重跑（全局计数 + 本会话计数），返回本会话的重跑次数"""
+    ensure_server()
+    inc("app_reruns_total", app=app)
+    key = f"_reruns_{app}"
+    st.session_state[key] = st.session_state.get(key, 0) + 1
+    return st.session_state[key]
+
+
+@contextlib.contextmanager
+def page_run(app, page="main"):
+    """
+    包裹一次页面渲染：重跑计数、渲染计时；URL 带 ?profile=1 时用 cProfile 剖析本次请求，
+    ?profile=pyinstrument 时改用 pyinstrument（需另行安装），结果显示在页面底部
+    """
+    track_rerun(app)
+    # 嵌套调用（多页面入口里再运行单页脚本）时只在最外层剖析
+    mode = None if getattr(_local, "profiling", False) else st.query_params.get("profile")
+    profiler = None
+    if mode == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+            profiler = Profiler()
+        except ImportError:
+            mode = "1"
+    if mode and profiler is None:
+        profiler = cProfile.Profile()
+    if profiler is not None:
+        _local.profiling = True
+        if mode == "pyinstrument":
+            profiler.start()
+        else:
+            profiler.enable()
+    try:
+        with timer("app_page_render_seconds", app=app, page=page):
+            yield
+    finally:
+        if profiler is not None:
+            _local.profiling = False
+            _show_profile(profiler, mode)
+
+
+def _show_profile(profiler, mode):
+    if mode == "pyinstrument":
+        profiler.stop()
+        report = profiler.output_text(unicode=True)
+    else:
+        profiler.disable()
+        buf = io.StringIO()
+        pstats.Stats(profiler, stream=buf).sort_stats("cumulative").print_stats(30)
+        report = buf.getvalue()
+    with st.expander("🔬 本次请求性能剖析", expanded=False):
+        st.code(report, language="text")
@@ -0,0 +1,233 @@
+"""
+离线模型选择：对成绩 / 医疗费用 / 企鹅三个模型的候选估计器做并行交叉验证，
+同时记录精度与单条推理延迟，按「精度够好的前提下延迟最低」选出模型并发布到模型仓库（model_store）
+
+用法：
+    python model_selection.py                       # 三个任务全部运行，5 折，使用全部 CPU 核
+    python model_selection.py insurance penguin --folds 3 --jobs 4 --tolerance 0.005
+    python model_selection.py grade --dry-run --report grade_cv.csv   # 只评估不发布
+
+选择规则：交叉验证得分（回归 R²，分类准确率）不低于最高分减去 --tolerance 的候选中，取单条推理延迟最低者。
+应用（cjfx / ten / eleven）下次重跑时会加载新发布的模型。
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import grade_model
+import ingest
+import insurance_model
+import model_store
+import penguin_model
+
+SINGLE_ROW_REPEATS = 30
+
+
+# ---------------------- 候选估计器 ----------------------
+def regression_candidates():
+    from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+    from sklearn.linear_model import LinearRegression, Ridge
+
+    return {
+        "LinearRegression": LinearRegression(),
+        "Ridge(alpha=1)": Ridge(alpha=1.0),
+        "Ridge(alpha=10)": Ridge(alpha=10.0),
+        "HistGradientBoosting": HistGradientBoostingRegressor(random_state=42),
+        "RandomForest(25)": RandomForestRegressor(n_estimators=25, random_state=42),
+        "RandomForest(100)": RandomForestRegressor(n_estimators=100, random_state=42),
+        "RandomForest(300)": RandomForestRegressor(n_estimators=300, random_state=42),
+    }
+
+
+def classification_candidates():
+    from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    # 分类任务用 L2（岭）正则的逻辑回归代替 Ridge：批量分类需要 predict_proba
+    return {
+        "LogisticRegression(L2)": make_pipeline(StandardScaler(), LogisticRegression(max_iter=2000)),
+        "HistGradientBoosting": HistGradientBoostingClassifier(random_state=42),
+        "RandomForest(25)": RandomForestClassifier(n_estimators=25, random_state=42),
+        "RandomForest(100)": RandomForestClassifier(n_estimators=100, random_state=42),
+        "RandomForest(300)": RandomForestClassifier(n_estimators=300, random_state=42),
+    }
+
+
+# ---------------------- 各任务：数据、交叉验证用的 X/y、发布用的训练函数 ----------------------
+def _grade_task():
+    df = ingest.load_table(os.path.join(ingest.BASE_DIR, "student_data_adjusted_rounded.csv"), ingest.STUDENT_SCHEMA)
+    X, y = grade_model.prepare(df)
+    return {
+        "df": df, "X": X, "y": y, "kind": "regression",
+        # 成绩模型的预处理在 Pipeline 里，交叉验证与发布都用完整管道
+        "wrap": grade_model.build_pipeline,
+        "fit": lambda est: grade_model.fit_model(df, est),
+        "baseline": "LinearRegression",
+    }
+
+
+def _insurance_task():
+    df = ingest.load_table(os.path.join(ingest.BASE_DIR, "insurance-chinese.csv"), ingest.INSURANCE_SCHEMA)
+    return {
+        "df": df, "X": df[insurance_model.FEATURE_INPUT_COLS], "y": df[insurance_model.TARGET_COL],
+        "kind": "regression",
+        # 交叉验证用原始列 + 管道，独热编码在每折训练集上拟合；发布时仍按 prepare 在全部数据上训练
+        "wrap": insurance_model.build_pipeline,
+        "fit": lambda est: insurance_model.fit_model(df, est),
+        "baseline": "RandomForest(100)",
+    }
+
+
+def _penguin_task():
+    df = ingest.load_table(os.path.join(ingest.BASE_DIR, "penguins-chinese.csv"), ingest.PENGUIN_SCHEMA)
+    X = df.drop(columns=penguin_model.LABEL_COL)
+    numeric_cols = X.columns.difference(penguin_model.CAT_FEATURES, sort=False)
+    return {
+        "df": df, "X": X, "y": df[penguin_model.LABEL_COL], "kind": "classification",
+        # 中位数填充和独热编码在每折训练集上拟合，测试折的统计量不会泄漏进训练
+        "wrap": lambda est: penguin_model.build_pipeline(est, numeric_cols),
+        "fit": lambda est: penguin_model.fit_model(df, est),
+        "baseline": "RandomForest(100)",
+    }
+
+
+TASKS = {
+    "grade": _grade_task,
+    "insurance": _insurance_task,
+    "penguin": _penguin_task,
+}
+
+
+# ---------------------- 交叉验证（joblib 并行） ----------------------
+def _evaluate_fold(name, estimator, X, y, train_idx, test_idx, kind, keep=False):
+    """
+    在一折上训练并评估（在工作进程内执行）；单条推理延迟不在这里测，工作进程满载时测出的延迟不可信
+    :param keep: 是否返回训练好的估计器（每个候选只保留第一折的，交给主进程测单条延迟）
+    :return: (候选名, 得分, 批量推理每行微秒, 训练秒, 估计器或 None)
+    """
+    from sklearn.metrics import accuracy_score, r2_score
+
+    start = time.perf_counter()
+    estimator.fit(X.iloc[train_idx], y.iloc[train_idx])
+    fit_seconds = time.perf_counter() - start
+
+    X_test = X.iloc[test_idx]
+    start = time.perf_counter()
+    pred = estimator.predict(X_test)
+    batch_us = (time.perf_counter() - start) / len(test_idx) * 1e6
+    score = accuracy_score(y.iloc[test_idx], pred) if kind == "classification" else r2_score(y.iloc[test_idx], pred)
+    return name, float(score), batch_us, fit_seconds, estimator if keep else None
+
+
+def _single_row_ms(estimator, row):
+    """单条推理延迟（毫秒）：应用里每次表单提交都是预测一行；先预热一次，取中位数排除偶发抖动"""
+    estimator.predict(row)
+    timings = []
+    for _ in range(SINGLE_ROW_REPEATS):
+        start = time.perf_counter()
+        estimator.predict(row)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings)) * 1000
+
+
+def cross_validate(task, candidates, folds=5, n_jobs=-1, verbose=0):
+    """
+    所有 (候选, 折) 组合一起交给 joblib 并行，每个任务单线程训练，避免与进程级并行互相抢核；
+    并行结束后在主进程里逐个测单条推理延迟（用各候选第一折训练好的估计器），测量时没有其他负载
+    :return: 排行榜 DataFrame（每个候选一行）
+    """
+    from joblib import Parallel, delayed
+    from sklearn.base import clone
+    from sklearn.model_selection import KFold, StratifiedKFold
+
+    X, y, kind, wrap = task["X"], task["y"], task["kind"], task["wrap"]
+    splitter = (StratifiedKFold if kind == "classification" else KFold)(n_splits=folds, shuffle=True, random_state=42)
+    splits = list(splitter.split(X, y))
+    jobs = (
+        delayed(_evaluate_fold)(name, clone(wrap(est) if wrap else est), X, y, train_idx, test_idx, kind, i == 0)
+        for name, est in candidates.items()
+        for i, (train_idx, test_idx) in enumerate(splits)
+    )
+    rows = Parallel(n_jobs=n_jobs, verbose=verbose)(jobs)
+
+    row = X.iloc[splits[0][1][:1]]
+    single_row_ms = {name: _single_row_ms(fitted, row) for name, _, _, _, fitted in rows if fitted is not None}
+    results = pd.DataFrame([r[:4] for r in rows], columns=["candidate", "score", "batch_us_per_row", "fit_seconds"])
+    board = results.groupby("candidate", sort=False).agg(
+        score=("score", "mean"), score_std=("score", "std"),
+        batch_us_per_row=("batch_us_per_row", "median"), fit_seconds=("fit_seconds", "mean"),
+    )
+    board.insert(3, "single_row_ms", board.index.map(single_row_ms))
+    return board.sort_values("score", ascending=False).reset_index()
+
+
+def select(board, tolerance=0.01):
+    """精度不低于最高分减 tolerance 的候选中，取单条推理延迟最低者；返回该行"""
+    eligible = board[board["score"] >= board["score"].max() - tolerance]
+    return eligible.sort_values(["single_row_ms", "score"], ascending=[True, False]).iloc[0]
+
+
+def run_task(name, folds=5, n_jobs=-1, tolerance=0.01, publish=True, verbose=0):
+    """对一个任务做交叉验证、选择，并（可选）在全部数据上重新训练后发布"""
+    task = TASKS[name]()
+    candidates = classification_candidates() if task["kind"] == "classification" else regression_candidates()
+    start = time.perf_counter()
+    board = cross_validate(task, candidates, folds, n_jobs, verbose)
+    cv_seconds = time.perf_counter() - start
+    chosen = select(board, tolerance)
+
+    meta = None
+    if publish:
+        payload = task["fit"](candidates[chosen["candidate"]])
+        meta = {
+            "estimator": chosen["candidate"],
+            "source": "model_selection",
+            "metric": "accuracy" if task["kind"] == "classification" else "r2",
+            "cv_folds": folds,
+            "cv_score": round(float(chosen["score"]), 4),
+            "single_row_ms": round(float(chosen["single_row_ms"]), 3),
+            "batch_us_per_row": round(float(chosen["batch_us_per_row"]), 2),
+            "baseline": task["baseline"],
+            "leaderboard": board.round(4).to_dict(orient="records"),
+        }
+        if name == "penguin":
+            # 企鹅模型在固定的 80% 训练集上训练，留出的 20% 用来报告准确率
+            meta["holdout_accuracy"] = round(penguin_model.holdout_accuracy(payload, task["df"]), 4)
+        meta = model_store.publish(name, payload, meta, df=task["df"])
+    return board, chosen, meta, cv_seconds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="并行交叉验证选择模型并发布到模型仓库")
+    parser.add_argument("tasks", nargs="*", choices=sorted(TASKS), help="要运行的任务，默认全部")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("-j", "--jobs", type=int, default=-1, help="并行进程数，-1 表示使用全部核")
+    parser.add_argument("--tolerance", type=float, default=0.01, help="可接受的得分差距（R² / 准确率）")
+    parser.add_argument("--dry-run", action="store_true", help="只评估，不发布")
+    parser.add_argument("--report", help="把各任务排行榜写入 CSV")
+    args = parser.parse_args(argv)
+
+    reports = []
+    for name in args.tasks or list(TASKS):
+        board, chosen, meta, seconds = run_task(name, args.folds, args.jobs, args.tolerance, not args.dry_run)
+        print(f"\n==== {name}（{args.folds} 折交叉验证，{seconds:.1f} 秒）====")
+        print(board.round(4).to_string(index=False))
+        status = f"已发布，版本 {meta['version']}" if meta else "未发布（--dry-run）"
+        print(f"选中：{chosen['candidate']}（得分 {chosen['score']:.4f}，单条 {chosen['single_row_ms']:.3f} 毫秒）{status}")
+        if meta and "holdout_accuracy" in meta:
+            print(f"留出集准确率：{meta['holdout_accuracy']:.4f}")
+        reports.append(board.assign(task=name, selected=board["candidate"] == chosen["candidate"]))
+
+    if args.report:
+        pd.concat(reports).to_csv(args.report, index=False, encoding="utf-8-sig")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+模型仓库：离线任务（model_selection.py / grade_model.py）发布模型，应用加载已发布的模型
+
+每个模型两个文件：<名称>.pkl（模型本体，pickle）与 <名称>.json（元数据：版本、估计器、交叉验证成绩、推理延迟等）。
+版本号取模型文件内容的哈希；应用把版本号作为训练缓存的参数，发布新模型后下一次重跑即自动换用。
+"""
+import datetime
+import hashlib
+import json
+import os
+import pickle
+
+import pandas as pd
+
+import ingest
+
+STORE_DIR = os.environ.get("MODEL_STORE_DIR", os.path.join(os.path.dirname(ingest.CACHE_DIR), "models"))
+
+
+def _paths(name, store_dir=None):
+    base = os.path.join(store_dir or STORE_DIR, name)
+    return base + ".pkl", base + ".json"
+
+
+def _atomic_write(path, data):
+    # 先写临时文件再改名，应用进程不会读到写了一半的模型
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def data_fingerprint(df):
+    """训练数据指纹（逐行哈希后整体再哈希），记录模型是在哪份数据上训练的"""
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return hashlib.sha1(row_hashes.tobytes()).hexdigest()[:16]
+
+
+def publish(name, payload, meta=None, df=None, store_dir=None):
+    """
+    发布模型（覆盖同名旧模型）
+    :param payload: 应用直接使用的对象（如 Pipeline，或 (模型, 编码器, 特征名) 元组）
+    :param df: 训练数据，提供时记录数据指纹与行数
+    :return: 写入的元数据
+    """
+    pkl_path, json_path = _paths(name, store_dir)
+    os.makedirs(os.path.dirname(pkl_path), exist_ok=True)
+    data = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+    meta = dict(meta or {})
+    meta.update(
+        name=name,
+        version=hashlib.sha1(data).hexdigest()[:12],
+        published_at=datetime.datetime.now().isoformat(timespec="seconds"),
+    )
+    if df is not None:
+        meta.update(data_rows=len(df), data_fingerprint=data_fingerprint(df))
+    # 先写模型再写元数据：元数据里的版本号出现时，对应的模型文件一定已经就位
+    _atomic_write(pkl_path, data)
+    _atomic_write(json_path, json.dumps(meta, ensure_ascii=False, indent=2, default=str).encode("utf-8"))
+    return meta
+
+
+def read_meta(name, store_dir=None):
+    """读取元数据，未发布返回 None（只读一个小 JSON，可在每次重跑时调用）"""
+    _, json_path = _paths(name, store_dir)
+    try:
+        with open(json_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def version(name, store_dir=None):
+    """已发布模型的版本号，未发布返回 None"""
+    meta = read_meta(name, store_dir)
+    return meta["version"] if meta else None
+
+
+def load(name, store_dir=None):
+    """
+    加载已发布的模型
+    :return: (payload, 元数据)；未发布或文件损坏返回 None
+    """
+    pkl_path, _ = _paths(name, store_dir)
+    meta = read_meta(name, store_dir)
+    if meta is None:
+        return None
+    try:
+        with open(pkl_path, "rb") as f:
+            return pickle.load(f), meta
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
@@ -0,0 +1,194 @@
+"""
+企鹅物种分类模型：训练、向量化特征编码、野外调查文件批量分类（输出各物种概率）
+
+命令行用法：
+    python penguin_model.py survey.csv -o classified.csv --chunksize 50000
+
+输入文件需包含 企鹅栖息的岛屿/性别/喙的长度/喙的深度/翅膀的长度/身体质量 六列（任意编码的 CSV 或 Parquet），
+训练数据中的其他数值列（如 观测年份）可选，缺失时按训练集中位数填充。
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import ingest
+import model_store
+
+LABEL_COL = '企鹅的种类'
+CAT_FEATURES = ['企鹅栖息的岛屿', '性别']
+MEASURE_COLS = ['喙的长度', '喙的深度', '翅膀的长度', '身体质量']
+REQUIRED_INPUT_COLS = CAT_FEATURES + MEASURE_COLS
+PREDICTION_COL = '预测种类'
+PROBA_PREFIX = '概率_'
+
+
+# ---------------------- 训练与编码 ----------------------
+def clean_features(df, fill_values):
+    """
+    缺失值处理（数值列用训练集中位数填充，性别用UNKNOWN填充），返回新表
+    输入里整列缺失的数值特征（如表单不提供的 观测年份）同样取中位数；补 0 会让线性类模型的输出严重偏离
+    """
+    df = df.copy()
+    for col in fill_values.index.difference(df.columns):
+        df[col] = fill_values[col]
+    fill_cols = fill_values.index.tolist()
+    df[fill_cols] = df[fill_cols].fillna(fill_values[fill_cols])
+    df['性别'] = df['性别'].fillna('UNKNOWN')
+    return df
+
+
+def encode_features(df, encoder, feature_names):
+    """
+    整表编码：数值列原样保留，分类列用训练好的编码器一次性转换，按训练时的列顺序排列
+    输入应先经过 clean_features，此时数值列已经齐全，reindex 只负责排列顺序
+    """
+    encoded = pd.DataFrame(encoder.transform(df[CAT_FEATURES]),
+                           columns=encoder.get_feature_names_out(CAT_FEATURES), index=df.index)
+    numeric = df.drop(columns=CAT_FEATURES + [LABEL_COL], errors='ignore')
+    return pd.concat([numeric, encoded], axis=1).reindex(columns=feature_names, fill_value=0)
+
+
+def prepare(df):
+    """
+    缺失值填充 + 分类特征独热编码（中文列名：岛屿、性别）
+    :return: (特征矩阵, 标签, 编码器, 特征名, 数值列填充值)
+    """
+    from sklearn.preprocessing import OneHotEncoder
+
+    numeric_cols = df.columns.difference(CAT_FEATURES + [LABEL_COL], sort=False)
+    fill_values = df[numeric_cols].median()
+    df = clean_features(df, fill_values)
+
+    # 特征和标签分离（标签列是“企鹅的种类”，而非英文species）
+    X = df.drop(LABEL_COL, axis=1)
+    y = df[LABEL_COL]
+    encoder = OneHotEncoder(sparse_output=False, drop='first')
+    encoder.fit(X[CAT_FEATURES])
+    feature_names = pd.Index(numeric_cols.tolist() + encoder.get_feature_names_out(CAT_FEATURES).tolist())
+    return encode_features(X, encoder, feature_names), y, encoder, feature_names, fill_values
+
+
+def build_pipeline(estimator, numeric_cols):
+    """
+    与 prepare 相同的预处理（数值列中位数填充、性别填 UNKNOWN、独热编码）做成管道，供交叉验证使用：
+    中位数和编码器只在每折的训练集上拟合
+    :param estimator: 分类器
+    :param numeric_cols: 数值特征列（prepare 中除分类列和标签外的全部列）
+    """
+    from sklearn.compose import ColumnTransformer
+    from sklearn.impute import SimpleImputer
+    from sklearn.pipeline import Pipeline, make_pipeline
+    from sklearn.preprocessing import OneHotEncoder
+
+    categorical = make_pipeline(
+        SimpleImputer(strategy="constant", fill_value="UNKNOWN"),
+        # 某一折的测试集里可能出现训练集没有的取值（如 UNKNOWN），编码为全 0
+        OneHotEncoder(sparse_output=False, drop="first", handle_unknown="ignore"),
+    )
+    preprocessor = ColumnTransformer(transformers=[
+        ("num", SimpleImputer(strategy="median"), list(numeric_cols)),
+        ("cat", categorical, CAT_FEATURES),
+    ])
+    return Pipeline(steps=[("preprocessor", preprocessor), ("classifier", estimator)])
+
+
+def split(X, y):
+    """固定的 80/20 训练/留出划分，训练与留出评估共用"""
+    from sklearn.model_selection import train_test_split
+    return train_test_split(X, y, train_size=0.8, random_state=42)
+
+
+def fit_model(df, estimator=None):
+    """
+    预处理并在 80% 训练集上训练分类模型（默认随机森林；模型选择任务会传入选中的估计器）
+    :return: (模型, 编码器, 特征名, 物种列表, 数值列填充值)
+    """
+    from sklearn.ensemble import RandomForestClassifier
+
+    X_processed, y, encoder, feature_names, fill_values = prepare(df)
+    X_train, X_test, y_train, y_test = split(X_processed, y)
+    model = estimator if estimator is not None else RandomForestClassifier(random_state=42)
+    model.fit(X_train, y_train)
+    return model, encoder, feature_names, y.unique(), fill_values
+
+
+def holdout_accuracy(bundle, df):
+    """在 fit_model 留出的 20% 数据上评估准确率"""
+    model, encoder, feature_names, _, fill_values = bundle
+    cleaned = clean_features(df, fill_values)
+    X_processed = encode_features(cleaned.drop(LABEL_COL, axis=1), encoder, feature_names)
+    _, X_test, _, y_test = split(X_processed, cleaned[LABEL_COL])
+    return float((model.predict(X_test) == y_test.to_numpy()).mean())
+
+
+# ---------------------- 批量分类 ----------------------
+def check_survey(df, encoder):
+    """校验调查数据：缺列、或出现训练集中没有的岛屿/性别取值时抛出 SchemaError"""
+    missing_cols = pd.Index(REQUIRED_INPUT_COLS).difference(df.columns).tolist()
+    if missing_cols:
+        raise ingest.SchemaError(f"缺少关键列：{', '.join(missing_cols)}", missing_cols)
+    for col, known in zip(CAT_FEATURES, encoder.categories_):
+        values = df[col].dropna().unique() if col == '性别' else df[col].unique()
+        unknown = pd.Index(values).difference(known)
+        if len(unknown):
+            raise ingest.SchemaError(f"{col} 包含训练集中没有的取值：{', '.join(map(str, unknown[:10]))}")
+    return ingest.validate_schema(df, {"numeric": MEASURE_COLS})
+
+
+def classify_frame(df, model, encoder, feature_names, fill_values, chunksize=50_000):
+    """
+    对整张表分块调用 predict_proba，返回原表 + 预测种类 + 各物种概率列
+    :param chunksize: 每次送入模型的行数，限制编码后特征矩阵的峰值内存
+    """
+    df = check_survey(df, encoder)
+    proba = np.empty((len(df), len(model.classes_)), dtype=np.float64)
+    for start in range(0, len(df), chunksize):
+        chunk = clean_features(df.iloc[start:start + chunksize], fill_values)
+        proba[start:start + chunksize] = model.predict_proba(encode_features(chunk, encoder, feature_names))
+
+    result = df.copy()
+    result[PREDICTION_COL] = model.classes_[proba.argmax(axis=1)]
+    for i, species in enumerate(model.classes_):
+        result[PROBA_PREFIX + species] = proba[:, i].round(4)
+    return result
+
+
+def read_survey(data, name):
+    """读取上传或磁盘上的调查文件（CSV 自动识别编码 / Parquet）"""
+    if name.lower().endswith(".parquet"):
+        return pd.read_parquet(io.BytesIO(data))
+    _, text = ingest.detect_encoding(data)
+    return pd.read_csv(io.StringIO(text))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="企鹅调查数据批量物种分类")
+    parser.add_argument("input", help="调查文件（.csv 或 .parquet）")
+    parser.add_argument("-o", "--output", default="classified_penguins.csv", help="结果 CSV 文件")
+    parser.add_argument("--train", default=os.path.join(ingest.BASE_DIR, "penguins-chinese.csv"),
+                        help="训练数据文件（模型仓库中没有已发布的模型时使用）")
+    parser.add_argument("--chunksize", type=int, default=50_000)
+    args = parser.parse_args(argv)
+
+    # 模型仓库里有已发布的模型就直接用，否则训练默认模型
+    published = model_store.load("penguin")
+    bundle = published[0] if published else fit_model(ingest.load_table(args.train, ingest.PENGUIN_SCHEMA))
+    model, encoder, feature_names, _, fill_values = bundle
+    with open(args.input, "rb") as f:
+        df = read_survey(f.read(), args.input)
+    start = time.perf_counter()
+    result = classify_frame(df, model, encoder, feature_names, fill_values, chunksize=args.chunksize)
+    seconds = time.perf_counter() - start
+    result.to_csv(args.output, index=False, encoding="utf-8-sig")
+    print(result[PREDICTION_COL].value_counts().to_string())
+    print(f"共 {len(result):,} 条，耗时 {seconds:.2f} 秒（{len(result) / max(seconds, 1e-9):,.0f} 条/秒），结果：{args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""
+预测结果缓存（进程内、所有会话共享）：表单输入高度离散（滑块步长、下拉框、整数输入），
+相同组合重复提交时直接返回上次的预测，不再调用模型
+
+- 键：模型名 + 模型版本 + 规范化后的特征（浮点数统一舍入，消除 0.1+0.2 这类误差）
+- 上限：cachetools.TTLCache，条目数超限按 LRU 淘汰，超过 TTL 过期
+- 失效：模型版本是键的一部分（每个模型对象一个版本号；重新训练或换用新发布的模型都会得到新对象），
+  某个模型出现新版本时，旧版本的条目立即清除
+- 指标：app_cache_requests_total{cache="prediction_<模型名>", result="hit|miss"}
+"""
+import itertools
+import os
+import threading
+import weakref
+
+import numpy as np
+from cachetools import TTLCache
+
+import metrics
+
+MAXSIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", "10000"))
+TTL_SECONDS = float(os.environ.get("PREDICTION_CACHE_TTL", "3600"))
+FLOAT_DIGITS = 6
+_MISSING = object()
+
+
+def normalize(features):
+    """特征字典 → 可哈希的元组（保持字段顺序；numpy 标量转 Python 类型，浮点数舍入）"""
+    items = []
+    for name, value in features.items():
+        if isinstance(value, np.generic):
+            value = value.item()
+        if isinstance(value, float):
+            value = round(value, FLOAT_DIGITS) + 0.0  # + 0.0 把 -0.0 归一为 0.0
+        items.append((name, value))
+    return tuple(items)
+
+
+class PredictionCache:
+    """线程安全的 LRU + TTL 预测缓存"""
+
+    def __init__(self, maxsize=MAXSIZE, ttl=TTL_SECONDS):
+        self._lock = threading.Lock()
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._versions = {}  # 模型名 -> 当前版本
+        self._model_tokens = weakref.WeakKeyDictionary()  # 模型对象 -> 版本号
+        self._counter = itertools.count(1)
+        self.hits = 0
+        self.misses = 0
+
+    def model_version(self, model):
+        """模型对象 → 本进程内的版本号（弱引用，模型对象被回收后自动释放）"""
+        with self._lock:
+            token = self._model_tokens.get(model)
+            if token is None:
+                token = f"local-{next(self._counter)}"
+                self._model_tokens[model] = token
+            return token
+
+    def _switch_version(self, name, version):
+        # 调用方已持有锁
+        if self._versions.get(name) != version:
+            self._versions[name] = version
+            for key in [k for k in self._cache.keys() if k[0] == name and k[1] != version]:
+                self._cache.pop(key, None)
+
+    def get_or_compute(self, name, model, features, compute):
+        """
+        :param name: 模型名（grade / insurance / penguin）
+        :param model: 模型对象，用于推导版本号
+        :param features: 特征字典（字段顺序固定）
+        :param compute: 未命中时调用的无参函数，返回预测结果
+        """
+        version = self.model_version(model)
+        key = (name, version, normalize(features))
+        with self._lock:
+            self._switch_version(name, version)
+            result = self._cache.get(key, _MISSING)
+            hit = result is not _MISSING
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        metrics.inc("app_cache_requests_total", cache=f"prediction_{name}", result="hit" if hit else "miss")
+        if hit:
+            return result
+        # 在锁外计算：模型预测较慢时不阻塞其他会话的命中查询
+        result = compute()
+        with self._lock:
+            if self._versions.get(name) == version:
+                self._cache[key] = result
+        return result
+
+    def clear(self, name=None):
+        with self._lock:
+            if name is None:
+                self._cache.clear()
+                self._versions.clear()
+            else:
+                for key in [k for k in self._cache.keys() if k[0] == name]:
+                    self._cache.pop(key, None)
+                self._versions.pop(name, None)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._cache), "maxsize": self._cache.maxsize, "ttl": self._cache.ttl,
+                "hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+# 进程级单例：模块只导入一次，所有会话、所有页面共用
+CACHE = PredictionCache()
+get_or_compute = CACHE.get_or_compute
+model_version = CACHE.model_version
@@ -0,0 +1,170 @@
+"""
+批量简历生成：从 CSV / JSON / JSON Lines 流式读取申请人记录，在进程池中渲染为 HTML/PDF/PNG
+
+用法示例：
+    python resume_batch.py applicants.csv -o out/ --format pdf --avatar-dir avatars/ --workers 8
+
+记录字段与 seven.py 表单一致（name, job, gender, edu, phone, ...），可选 avatar 列为头像文件名。
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import resume_core
+
+
+# ---------------------- 流式读取记录 ----------------------
+def _iter_json_array(fp, chunk_size=1 << 16):
+    """逐个解析 JSON 数组里的对象，不把整个文件读进内存"""
+    decoder = json.JSONDecoder()
+    buf = ""
+    started = False
+    eof = False
+    while True:
+        buf = buf.lstrip()
+        if not started:
+            if buf.startswith("["):
+                buf = buf[1:]
+                started = True
+                continue
+            if buf:
+                raise ValueError("JSON 文件顶层必须是数组")
+        else:
+            buf = buf.lstrip(",").lstrip()
+            if buf.startswith("]"):
+                return
+            if buf:
+                try:
+                    obj, end = decoder.raw_decode(buf)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                else:
+                    yield obj
+                    buf = buf[end:]
+                    continue
+        if eof:
+            if started or buf:
+                raise ValueError("JSON 数组不完整")
+            return
+        chunk = fp.read(chunk_size)
+        eof = not chunk
+        buf += chunk
+
+
+def iter_records(path):
+    """按文件后缀流式产出原始记录字典（.csv / .json / .jsonl）"""
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, encoding="utf-8-sig", newline="") as fp:
+        if ext == ".csv":
+            yield from csv.DictReader(fp)
+        elif ext == ".jsonl":
+            for line in fp:
+                if line.strip():
+                    yield json.loads(line)
+        elif ext == ".json":
+            yield from _iter_json_array(fp)
+        else:
+            raise ValueError(f"不支持的输入文件类型：{ext}（仅支持 .csv/.json/.jsonl）")
+
+
+# ---------------------- 单条渲染（在子进程中执行） ----------------------
+def _safe_filename(text):
+    return re.sub(r'[\\/:*?"<>|\s]+', "_", text).strip("_") or "resume"
+
+
+def render_job(job):
+    """
+    渲染并写出一份简历
+    :param job: (序号, 原始记录, 头像目录, 输出目录, 格式, 字体路径)
+    :return: (序号, 输出文件路径, 字节数)
+    """
+    idx, raw, avatar_dir, out_dir, fmt, font_path = job
+    record = resume_core.normalize_record(raw)
+    avatar = None
+    avatar_name = (raw.get("avatar") or "").strip()
+    if avatar_name:
+        avatar_path = os.path.join(avatar_dir or "", avatar_name)
+        if os.path.exists(avatar_path):
+            avatar = resume_core.load_avatar(avatar_path)
+    data = resume_core.render_to_bytes(record, avatar, fmt, font_path)
+    out_path = os.path.join(out_dir, f"{idx:07d}_{_safe_filename(record['name'])}.{fmt}")
+    with open(out_path, "wb") as f:
+        f.write(data)
+    return idx, out_path, len(data)
+
+
+# ---------------------- 批量调度 ----------------------
+def run_batch(records, out_dir, fmt="html", avatar_dir=None, font_path=None,
+              workers=None, report_every=500, log=print):
+    """
+    流式提交到进程池渲染；同时在途的任务数有上限，内存占用不随记录数增长
+    :return: 统计信息字典（总数、失败数、耗时、吞吐量、输出字节数）
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    max_pending = workers * 4
+    done = failed = total_bytes = 0
+    start = time.perf_counter()
+
+    def _collect(finished):
+        nonlocal done, failed, total_bytes
+        for fut in finished:
+            try:
+                _, _, size = fut.result()
+                total_bytes += size
+            except Exception as e:
+                failed += 1
+                log(f"渲染失败：{e}")
+            done += 1
+            if report_every and done % report_every == 0:
+                elapsed = time.perf_counter() - start
+                log(f"已完成 {done} 份，{done / elapsed:.1f} 份/秒")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for idx, raw in enumerate(records, 1):
+            pending.add(pool.submit(render_job, (idx, raw, avatar_dir, out_dir, fmt, font_path)))
+            if len(pending) >= max_pending:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                _collect(finished)
+        finished, _ = wait(pending)
+        _collect(finished)
+
+    elapsed = time.perf_counter() - start
+    return {
+        "total": done,
+        "failed": failed,
+        "seconds": round(elapsed, 3),
+        "per_second": round(done / elapsed, 1) if elapsed else 0.0,
+        "bytes": total_bytes,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="批量生成个人简历")
+    parser.add_argument("input", help="申请人记录文件（.csv / .json / .jsonl，UTF-8）")
+    parser.add_argument("-o", "--out-dir", default="resumes_out", help="输出目录")
+    parser.add_argument("-f", "--format", choices=["html", "pdf", "png"], default="html")
+    parser.add_argument("--avatar-dir", help="头像文件所在目录（记录中 avatar 列为文件名）")
+    parser.add_argument("--font", help="PNG/PDF 使用的中文字体文件路径")
+    parser.add_argument("-w", "--workers", type=int, help="进程数，默认等于 CPU 核数")
+    parser.add_argument("--report-every", type=int, default=500, help="每完成多少份输出一次进度")
+    args = parser.parse_args(argv)
+
+    stats = run_batch(
+        iter_records(args.input), args.out_dir, fmt=args.format, avatar_dir=args.avatar_dir,
+        font_path=args.font, workers=args.workers, report_every=args.report_every,
+    )
+    print(f"完成 {stats['total']} 份（失败 {stats['failed']}），耗时 {stats['seconds']} 秒，"
+          f"吞吐 {stats['per_second']} 份/秒，共 {stats['bytes'] / 1024 / 1024:.1f} MB")
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
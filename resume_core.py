@@ -0,0 +1,214 @@
+import base64
+import html
+import io
+import os
+
+from PIL import Image, ImageDraw, ImageFont
+
+# ---------------------- 简历字段定义（表单/批量共用） ----------------------
+# (字段名, 中文标签)，顺序即表单与导入文件的列顺序
+RESUME_FIELDS = [
+    ("name", "姓名"),
+    ("job", "职业"),
+    ("gender", "性别"),
+    ("edu", "学历"),
+    ("phone", "电话"),
+    ("email", "邮箱"),
+    ("birth", "出生日期"),
+    ("work_years", "工作经验(年)"),
+    ("salary", "期望薪资"),
+    ("contact_year", "期望联系时间"),
+    ("language", "语言能力"),
+    ("tags", "专业技能Tag(逗号分隔)"),
+    ("intro", "个人简介"),
+]
+FIELD_NAMES = [name for name, _ in RESUME_FIELDS]
+
+AVATAR_SIZE = (100, 120)
+EMPTY = "未填写"
+
+# 常见中文字体位置，PNG/PDF 渲染时按顺序尝试
+CJK_FONT_CANDIDATES = [
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",
+    "/System/Library/Fonts/PingFang.ttc",
+    "C:/Windows/Fonts/msyh.ttc",
+    "C:/Windows/Fonts/simhei.ttf",
+]
+
+
+# ---------------------- 字段处理 ----------------------
+def normalize_record(raw):
+    """把表单/CSV/JSON 中的一条记录整理成统一的字段字典（缺失字段补空串）"""
+    record = {}
+    for name in FIELD_NAMES:
+        value = raw.get(name)
+        record[name] = "" if value is None else str(value).strip()
+    record["gender"] = record["gender"] or "男"
+    return record
+
+
+def parse_tags(tags):
+    """解析逗号分隔的技能Tag（兼容中文逗号）"""
+    return [tag.strip() for tag in (tags or "").replace("，", ",").split(",") if tag.strip()]
+
+
+def _basic_section(r):
+    return "\n\n".join([
+        "### 基本信息",
+        f"**姓名**: {r['name'] or EMPTY}",
+        f"**性别**: {r['gender']} | **学历**: {r['edu'] or EMPTY}",
+        f"**职业**: {r['job'] or EMPTY} | **工作经验**: {r['work_years'] or '0'}年",
+        f"**期望薪资**: {r['salary'] or EMPTY} | **期望联系时间**: {r['contact_year'] or EMPTY}",
+        f"**电话**: {r['phone'] or EMPTY} | **邮箱**: {r['email'] or EMPTY}",
+        f"**出生日期**: {r['birth'] or EMPTY} | **语言能力**: {r['language'] or EMPTY}",
+        "---",
+    ])
+
+
+def _intro_section(r):
+    return "### 个人简介\n\n" + (r["intro"] or "暂无简介")
+
+
+def _skills_section(r):
+    tags_list = parse_tags(r["tags"])
+    return "### 专业技能\n\n" + (" | ".join(tags_list) if tags_list else "无")
+
+
+# 区块 -> 生成函数（按显示顺序）
+SECTIONS = {
+    "basic": _basic_section,
+    "intro": _intro_section,
+    "skills": _skills_section,
+}
+
+
+def build_sections(record):
+    """
+    生成简历各区块的 Markdown 文本
+    :param record: normalize_record 返回的字段字典
+    :return: {"basic": ..., "intro": ..., "skills": ...}，Streamlit 预览与 HTML 导出共用
+    """
+    return {name: build(record) for name, build in SECTIONS.items()}
+
+
+# ---------------------- 头像处理 ----------------------
+def load_avatar(source):
+    """读取头像（路径/上传文件/bytes），统一缩放为 100x120 的 RGB 图片；无头像返回 None"""
+    if not source:
+        return None
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    with Image.open(source) as img:
+        return img.convert("RGB").resize(AVATAR_SIZE)
+
+
+def _avatar_data_uri(avatar):
+    buf = io.BytesIO()
+    avatar.save(buf, format="PNG")
+    return "data:image/png;base64," + base64.b64encode(buf.getvalue()).decode("ascii")
+
+
+# ---------------------- 渲染：HTML ----------------------
+def render_html(record, avatar=None):
+    """把一条简历渲染为独立 HTML 页面（头像以 data URI 内嵌）"""
+    r = {k: html.escape(v) for k, v in record.items()}
+    tags_list = parse_tags(r["tags"])
+    avatar_html = (
+        f'<img src="{_avatar_data_uri(avatar)}" width="100" height="120">'
+        if avatar is not None else '<div class="no-avatar">暂无头像</div>'
+    )
+    rows = [
+        ("性别", r["gender"]), ("学历", r["edu"] or EMPTY),
+        ("职业", r["job"] or EMPTY), ("工作经验", f"{r['work_years'] or '0'}年"),
+        ("期望薪资", r["salary"] or EMPTY), ("期望联系时间", r["contact_year"] or EMPTY),
+        ("电话", r["phone"] or EMPTY), ("邮箱", r["email"] or EMPTY),
+        ("出生日期", r["birth"] or EMPTY), ("语言能力", r["language"] or EMPTY),
+    ]
+    rows_html = "".join(f"<tr><th>{k}</th><td>{v}</td></tr>" for k, v in rows)
+    intro_html = (r["intro"] or "暂无简介").replace("\n", "<br>")
+    tags_html = " | ".join(tags_list) if tags_list else "无"
+    return f"""<!DOCTYPE html>
+<html lang="zh-CN"><head><meta charset="utf-8"><title>{r['name'] or '简历'}</title>
+<style>
+body {{ font-family: "PingFang SC", "Microsoft YaHei", sans-serif; margin: 40px; color: #222; }}
+.head {{ display: flex; gap: 24px; align-items: center; }}
+.no-avatar {{ width: 100px; height: 120px; background: #eee; text-align: center; line-height: 120px; }}
+th {{ text-align: left; padding-right: 16px; color: #666; font-weight: normal; }}
+</style></head>
+<body>
+<div class="head">{avatar_html}<h1>{r['name'] or EMPTY}</h1></div>
+<h3>基本信息</h3><table>{rows_html}</table>
+<h3>个人简介</h3><p>{intro_html}</p>
+<h3>专业技能</h3><p>{tags_html}</p>
+</body></html>
+"""
+
+
+# ---------------------- 渲染：PNG / PDF ----------------------
+_font_cache = {}
+
+
+def _load_font(font_path, size):
+    key = (font_path, size)
+    if key not in _font_cache:
+        paths = [font_path] if font_path else [p for p in CJK_FONT_CANDIDATES if os.path.exists(p)]
+        font = None
+        for path in paths:
+            try:
+                font = ImageFont.truetype(path, size)
+                break
+            except OSError:
+                continue
+        # 找不到中文字体时退回默认字体（中文会显示为方块）
+        _font_cache[key] = font or ImageFont.load_default(size=size)
+    return _font_cache[key]
+
+
+def render_image(record, avatar=None, font_path=None):
+    """把一条简历绘制为 A4 比例的白底图片（用于导出 PNG/PDF）"""
+    width, height = 1240, 1754
+    page = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(page)
+    title_font = _load_font(font_path, 56)
+    head_font = _load_font(font_path, 36)
+    body_font = _load_font(font_path, 28)
+
+    if avatar is not None:
+        page.paste(avatar.resize((200, 240)), (80, 80))
+    else:
+        draw.rectangle([80, 80, 280, 320], fill="#eeeeee")
+        draw.text((120, 185), "暂无头像", font=body_font, fill="#888888")
+    draw.text((340, 160), record["name"] or EMPTY, font=title_font, fill="#222222")
+    draw.text((340, 240), record["job"] or EMPTY, font=head_font, fill="#666666")
+
+    y = 380
+    sections = build_sections(record)
+    for key in ("basic", "intro", "skills"):
+        for line in sections[key].split("\n"):
+            line = line.replace("**", "").strip()
+            if not line or line == "---":
+                continue
+            if line.startswith("### "):
+                y += 20
+                draw.text((80, y), line[4:], font=head_font, fill="#1E3A8A")
+                y += 56
+            else:
+                # 简介可能较长，按固定字符数折行
+                for start in range(0, len(line), 40):
+                    draw.text((80, y), line[start:start + 40], font=body_font, fill="#222222")
+                    y += 42
+            if y > height - 80:
+                return page
+    return page
+
+
+def render_to_bytes(record, avatar=None, fmt="html", font_path=None):
+    """按格式（html/png/pdf）渲染简历并返回字节内容"""
+    if fmt == "html":
+        return render_html(record, avatar).encode("utf-8")
+    if fmt not in ("png", "pdf"):
+        raise ValueError(f"不支持的导出格式：{fmt}")
+    buf = io.BytesIO()
+    render_image(record, avatar, font_path).save(buf, format=fmt.upper())
+    return buf.getvalue()
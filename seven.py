@@ -1,87 +1,112 @@
+import time
 import streamlit as st
-from PIL import Image
-import io
+import resume_core
 
 class ResumeGeneratorStreamlit:
     def __init__(self):
         st.set_page_config(page_title="个人简历生成器", layout="wide", page_icon="📄")
+        self._start = time.perf_counter()
+        self.perf = st.session_state.setdefault(
+            "_resume_perf", {"reruns": 0, "total_ms": 0.0, "last_ms": 0.0}
+        )
         self._setup_ui()
-    
+        self._show_perf()
+
     def _setup_ui(self):
         st.title("个人简历生成器")
-        
+
+        # 刷新方式：实时（每次输入都重跑）或表单（点击按钮才重跑一次）
+        live_mode = st.sidebar.radio(
+            "预览刷新方式", ["实时预览", "填写完成后刷新"], key="preview_mode"
+        ) == "实时预览"
+
         # 创建两列布局
         col1, col2 = st.columns([1, 1])
-        
+
         with col1:
             st.header("个人信息表单")
-            
-            # 创建表单
-            self.name = st.text_input("姓名", key="name")
-            self.job = st.text_input("职业", key="job")
-            
-            # 创建两列用于性别选择
-            col1_1, col1_2 = st.columns(2)
-            with col1_1:
-                self.gender = st.radio("性别", ["男", "女"], horizontal=True, key="gender")
-            
-            self.edu = st.text_input("学历", key="edu")
-            self.phone = st.text_input("电话", key="phone")
-            self.email = st.text_input("邮箱", key="email")
-            self.birth = st.text_input("出生日期", key="birth")
-            self.work_years = st.text_input("工作经验(年)", key="work_years")
-            self.salary = st.text_input("期望薪资", key="salary")
-            self.contact_year = st.text_input("期望联系时间", key="contact_year")
-            self.language = st.text_input("语言能力", key="language")
-            self.tags = st.text_input("专业技能Tag(逗号分隔)", key="tags")
-            self.intro = st.text_area("个人简介", height=150, key="intro")
-            
-            # 头像上传
-            self.avatar_file = st.file_uploader("上传头像", type=["png", "jpg", "jpeg"], key="avatar")
-            self.avatar_image = None
-            if self.avatar_file:
-                img = Image.open(self.avatar_file)
-                # 调整图片大小
-                img = img.resize((100, 120))
-                self.avatar_image = img
-        
+
+            if live_mode:
+                self._form_fields()
+            else:
+                with st.form("resume_form"):
+                    self._form_fields()
+                    st.form_submit_button("更新预览", type="primary")
+
         with col2:
             st.header("简历实时预览")
-            
+
             # 预览区域
             preview_container = st.container()
             with preview_container:
                 # 使用列布局展示头像和基本信息
                 col2_1, col2_2 = st.columns([1, 2])
-                
+
                 with col2_1:
                     if self.avatar_image:
                         st.image(self.avatar_image, width=100)
                     else:
                         st.info("暂无头像")
-                
+
                 with col2_2:
-                    # 解析Tag
-                    tags_list = [tag.strip() for tag in (self.tags or "").split(",") if tag.strip()]
-                    tag_str = " | ".join(tags_list) if tags_list else "无"
-                    
-                    # 显示预览信息
-                    st.markdown("### 基本信息")
-                    st.markdown(f"**姓名**: {self.name or '未填写'}")
-                    st.markdown(f"**性别**: {self.gender} | **学历**: {self.edu or '未填写'}")
-                    st.markdown(f"**职业**: {self.job or '未填写'} | **工作经验**: {self.work_years or '0'}年")
-                    st.markdown(f"**期望薪资**: {self.salary or '未填写'} | **期望联系时间**: {self.contact_year or '未填写'}")
-                    st.markdown(f"**电话**: {self.phone or '未填写'} | **邮箱**: {self.email or '未填写'}")
-                    st.markdown(f"**出生日期**: {self.birth or '未填写'} | **语言能力**: {self.language or '未填写'}")
-                    
-                    st.markdown("---")
-                    
-                    st.markdown("### 个人简介")
-                    st.markdown(self.intro or "暂无简介")
-                    
-                    st.markdown("### 专业技能")
-                    st.markdown(tag_str)
-                
+                    # 各区块文本由渲染核心生成（与批量导出共用）；生成只是字符串拼接，
+                    # 减少重跑靠「填写完成后刷新」的表单模式
+                    sections = resume_core.build_sections(self._record())
+                    st.markdown(sections["basic"])
+                    st.markdown(sections["intro"])
+                    st.markdown(sections["skills"])
+
+    def _form_fields(self):
+        # 创建表单
+        self.name = st.text_input("姓名", key="name")
+        self.job = st.text_input("职业", key="job")
+
+        # 创建两列用于性别选择
+        col1_1, col1_2 = st.columns(2)
+        with col1_1:
+            self.gender = st.radio("性别", ["男", "女"], horizontal=True, key="gender")
+
+        self.edu = st.text_input("学历", key="edu")
+        self.phone = st.text_input("电话", key="phone")
+        self.email = st.text_input("邮箱", key="email")
+        self.birth = st.text_input("出生日期", key="birth")
+        self.work_years = st.text_input("工作经验(年)", key="work_years")
+        self.salary = st.text_input("期望薪资", key="salary")
+        self.contact_year = st.text_input("期望联系时间", key="contact_year")
+        self.language = st.text_input("语言能力", key="language")
+        self.tags = st.text_input("专业技能Tag(逗号分隔)", key="tags")
+        self.intro = st.text_area("个人简介", height=150, key="intro")
+
+        # 头像上传
+        self.avatar_file = st.file_uploader("上传头像", type=["png", "jpg", "jpeg"], key="avatar")
+        self.avatar_image = self._cached_avatar()
+
+    def _cached_avatar(self):
+        """同一个上传文件只解码、缩放一次，后续重跑直接取会话里的结果"""
+        if not self.avatar_file:
+            return None
+        cached = st.session_state.get("_avatar_cache")
+        if cached is None or cached[0] != self.avatar_file.file_id:
+            cached = (self.avatar_file.file_id, resume_core.load_avatar(self.avatar_file))
+            st.session_state["_avatar_cache"] = cached
+        return cached[1]
+
+    def _record(self):
+        """把当前表单值整理为渲染核心使用的字段字典"""
+        return resume_core.normalize_record({name: getattr(self, name) for name in resume_core.FIELD_NAMES})
+
+    def _show_perf(self):
+        """侧边栏展示本会话的重跑次数与渲染耗时"""
+        elapsed_ms = (time.perf_counter() - self._start) * 1000
+        perf = self.perf
+        perf["reruns"] += 1
+        perf["last_ms"] = elapsed_ms
+        perf["total_ms"] += elapsed_ms
+        with st.sidebar.expander("⏱️ 性能统计", expanded=False):
+            st.write(f"重跑次数：{perf['reruns']}")
+            st.write(f"本次渲染耗时：{perf['last_ms']:.1f} ms")
+            st.write(f"平均渲染耗时：{perf['total_ms'] / perf['reruns']:.1f} ms")
+
 
 def main():
     app = ResumeGeneratorStreamlit()
@@ -0,0 +1,34 @@
+import os
+
+import streamlit as st
+
+import ingest
+import metrics
+
+# ---------------------- 共享数据缓存：多页面应用中所有页面共用同一份数据 ----------------------
+# st.cache_data 以「模块 + 函数」为键，放在公共模块里，各页面调用时命中的是同一份缓存；
+# 进程重启后由 ingest 的 Parquet 缓存兜底，不再重新解码、解析 CSV。
+# 数据不符合表结构时抛出 ingest.SchemaError，由各页面决定如何提示
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+STUDENT_CSV = os.path.join(BASE_DIR, "student_data_adjusted_rounded.csv")
+INSURANCE_CSV = os.path.join(BASE_DIR, "insurance-chinese.csv")
+PENGUIN_CSV = os.path.join(BASE_DIR, "penguins-chinese.csv")
+
+
+@metrics.instrument_cache("load_student_data", st.cache_data(show_spinner="正在加载学生数据..."))
+def load_student_data(path=STUDENT_CSV):
+    """学生成绩数据"""
+    return ingest.load_table(path, ingest.STUDENT_SCHEMA)
+
+
+@metrics.instrument_cache("load_insurance_data", st.cache_data(show_spinner="正在加载保险数据..."))
+def load_insurance_data(path=INSURANCE_CSV):
+    """医疗费用数据（原文件为 GBK 编码）"""
+    return ingest.load_table(path, ingest.INSURANCE_SCHEMA)
+
+
+@metrics.instrument_cache("load_penguin_data", st.cache_data(show_spinner="正在加载企鹅数据..."))
+def load_penguin_data(path=PENGUIN_CSV):
+    """企鹅数据（原文件为 GBK 编码）"""
+    return ingest.load_table(path, ingest.PENGUIN_SCHEMA)
@@ -0,0 +1,67 @@
+"""
+学号索引：排好序的 int64 数组 + 二分查找
+
+- 精确查找：np.searchsorted，O(log n)
+- 前缀查找（输入联想）：数字前缀 p 对应的学号是若干个连续区间 [p·10^k, (p+1)·10^k)，
+  每个区间两次二分即可定位，不扫描整张表
+"""
+import numpy as np
+
+INT64_MAX = int(np.iinfo(np.int64).max)
+
+
+class StudentIndex:
+    """对 DataFrame 的学号列建立索引，查找结果为 DataFrame 中的行位置（iloc）"""
+
+    def __init__(self, ids):
+        ids = np.asarray(ids, dtype=np.int64)
+        self.order = np.argsort(ids, kind="stable")
+        self.ids = ids[self.order]
+        # 数据中出现过的学号位数（通常只有一种），前缀查找按位数分别定位区间
+        positive = self.ids[self.ids > 0]
+        self.digit_counts = sorted({len(str(v)) for v in (positive.min(), positive.max())}) if len(positive) else []
+        if len(self.digit_counts) == 2:
+            self.digit_counts = list(range(self.digit_counts[0], self.digit_counts[1] + 1))
+
+    def __len__(self):
+        return len(self.ids)
+
+    @staticmethod
+    def parse(text):
+        """把输入框内容转为学号整数，非纯数字返回 None"""
+        text = str(text).strip()
+        return int(text) if text.isdigit() and len(text) <= 18 else None
+
+    def lookup(self, student_id):
+        """精确查找，返回行位置；不存在返回 None"""
+        key = self.parse(student_id)
+        if key is None:
+            return None
+        i = np.searchsorted(self.ids, key)
+        if i < len(self.ids) and self.ids[i] == key:
+            return int(self.order[i])
+        return None
+
+    def prefix_search(self, prefix, limit=20):
+        """
+        前缀查找（用于输入联想）
+        :return: 以 prefix 开头的学号（升序，最多 limit 个）
+        """
+        text = str(prefix).strip()
+        p = self.parse(text)
+        if p is None:
+            return []
+        matches = []
+        for digits in self.digit_counts:
+            k = digits - len(text)
+            if k < 0:
+                continue
+            lower, upper = p * 10 ** k, (p + 1) * 10 ** k
+            if lower > INT64_MAX:
+                continue
+            lo = np.searchsorted(self.ids, lower)
+            hi = len(self.ids) if upper > INT64_MAX else np.searchsorted(self.ids, upper)
+            matches.extend(self.ids[lo:min(hi, lo + limit - len(matches))].tolist())
+            if len(matches) >= limit:
+                break
+        return matches
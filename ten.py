@@ -1,50 +1,52 @@
 import streamlit as st
 import pandas as pd
 import os
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.preprocessing import OneHotEncoder
+import functools
+import shutil
+import tempfile
+import weakref
+import insurance_model
+import metrics
+import model_store
+import prediction_cache
+import shared_cache
+from ingest import SchemaError
 
 # ====================== 核心函数：训练模型 ======================
-def train_insurance_model(data_path):
+@metrics.instrument_cache("train_insurance_model", st.cache_resource(show_spinner="正在训练模型..."))
+def train_insurance_model(data_path, model_version=None):
     """
-    读取CSV数据并训练随机森林模型
+    读取CSV数据并训练随机森林模型；模型仓库里有已发布的模型（model_selection.py 选出）时直接使用
     :param data_path: CSV文件路径
-    :return: 训练好的模型 + 特征列名（用于预测时匹配格式）
+    :param model_version: 已发布模型的版本号（缓存键的一部分，发布新模型后自动换用）
+    :return: 训练好的模型 + 独热编码器 + 特征列名（用于预测时匹配格式）
+    :raises SchemaError: CSV 不符合要求（异常不会被缓存，修正文件后下次重跑即重新加载）
     """
-    # 1. 读取CSV数据（中文编码用gbk，若报错可换utf-8）
-    try:
-        df = pd.read_csv(data_path, encoding='gbk')
-    except:
-        df = pd.read_csv(data_path, encoding='utf-8')
-    
-    # 检查关键列是否存在（请根据你的CSV实际列名修改！）
-    # 请确认：你的CSV列名是以下这些，若不是，替换成实际列名
-    required_cols = ['年龄', '性别', 'BMI', '子女数量', '是否吸烟', '区域', '医疗费用']
-    missing_cols = [col for col in required_cols if col not in df.columns]
-    if missing_cols:
-        st.error(f"CSV文件缺少必要列：{missing_cols}，请检查列名！")
-        return None, None
-    
-    # 2. 数据预处理（独热编码类别特征）
-    X = df.drop('医疗费用', axis=1)  # 特征
-    y = df['医疗费用']               # 目标变量（预测的医疗费用）
+    # 1. 读取CSV数据（共享缓存，自动识别编码；关键列见 ingest.INSURANCE_SCHEMA，请根据CSV实际列名修改）
+    df = shared_cache.load_insurance_data(data_path)
     
-    # 对类别特征（性别、是否吸烟、区域）做独热编码
-    categorical_cols = ['性别', '是否吸烟', '区域']
-    encoder = OneHotEncoder(sparse_output=False, drop=None)
-    encoded_cats = encoder.fit_transform(X[categorical_cols])
-    encoded_df = pd.DataFrame(encoded_cats, columns=encoder.get_feature_names_out(categorical_cols))
+    # 2. 优先使用已发布的模型
+    published = model_store.load("insurance") if model_version else None
+    if published is not None:
+        return published[0]
     
-    # 合并数值特征（年龄、BMI、子女数量）和编码后的类别特征
-    numeric_cols = ['年龄', 'BMI', '子女数量']
-    X_processed = pd.concat([X[numeric_cols].reset_index(drop=True), 
-                             encoded_df.reset_index(drop=True)], axis=1)
-    
-    # 3. 训练随机森林模型
-    rfr_model = RandomForestRegressor(n_estimators=100, random_state=42)
-    rfr_model.fit(X_processed, y)
+    # 3. 独热编码类别特征 + 训练随机森林模型（见 insurance_model.fit_model，批量评分共用同一套编码）
+    return insurance_model.fit_model(df)
+
+def load_model():
+    """获取CSV文件路径（和脚本同目录）并取得缓存的模型；文件缺失或训练失败时返回 (None, None, None)"""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    csv_path = os.path.join(script_dir, 'insurance-chinese.csv')
     
-    return rfr_model, X_processed.columns.tolist()
+    # 检查CSV文件是否存在
+    if not os.path.exists(csv_path):
+        st.error(f"找不到数据源文件：{csv_path}，请确认文件在脚本同目录下！")
+        return None, None, None
+    try:
+        return train_insurance_model(csv_path, model_store.version("insurance"))
+    except SchemaError as e:
+        st.error(f"CSV文件不符合要求：{e}，请检查列名！")
+        return None, None, None
 
 # ====================== 页面函数：简介 ======================
 def introduce_page():
@@ -72,17 +74,8 @@ def predict_page():
     输入被保险人的以下信息，点击「预测费用」即可得到医疗费用预测结果。
     """)
     
-    # 1. 获取CSV文件路径（和脚本同目录）
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    csv_path = os.path.join(script_dir, 'insurance-chinese.csv')
-    
-    # 检查CSV文件是否存在
-    if not os.path.exists(csv_path):
-        st.error(f"找不到数据源文件：{csv_path}，请确认文件在脚本同目录下！")
-        return
-    
-    # 2. 训练模型（每次预测前自动训练，无需单独保存.pkl）
-    rfr_model, feature_names = train_insurance_model(csv_path)
+    # 1~2. 获取CSV文件路径并训练模型（首次训练后缓存，所有会话共用，无需单独保存.pkl）
+    rfr_model, encoder, feature_names = load_model()
     if rfr_model is None:
         return  # 若训练失败，直接返回
     
@@ -98,32 +91,99 @@ def predict_page():
     
     # 4. 提交后处理预测逻辑
     if submitted:
-        # 初始化独热编码后的特征值（和训练时格式一致）
-        feature_values = {
-            '年龄': age,
-            'BMI': bmi,
-            '子女数量': children,
-            '性别_女性': 1 if sex == '女性' else 0,
-            '性别_男性': 1 if sex == '男性' else 0,
-            '是否吸烟_否': 1 if smoke == '否' else 0,
-            '是否吸烟_是': 1 if smoke == '是' else 0,
-            '区域_东北部': 1 if region == '东北部' else 0,
-            '区域_东南部': 1 if region == '东南部' else 0,
-            '区域_西北部': 1 if region == '西北部' else 0,
-            '区域_西南部': 1 if region == '西南部' else 0
-        }
-        
-        # 按训练时的特征顺序组装数据（关键：顺序必须一致）
-        format_data = [feature_values[col] for col in feature_names]
+        features = {'年龄': age, '性别': sex, 'BMI': bmi, '子女数量': children, '是否吸烟': smoke, '区域': region}
         
-        # 转为DataFrame（匹配模型输入格式）
-        format_data_df = pd.DataFrame([format_data], columns=feature_names)
+        def run_predict():
+            # 用训练时的编码器编码（列顺序与训练时一致）
+            format_data_df = insurance_model.encode_features(pd.DataFrame([features]), encoder, feature_names)
+            with metrics.timer("app_predict_seconds", model="insurance"):
+                return float(rfr_model.predict(format_data_df)[0])
         
-        # 预测并输出结果
-        predict_result = rfr_model.predict(format_data_df)[0]
+        # 预测并输出结果（相同输入组合直接命中跨会话的预测缓存）
+        predict_result = prediction_cache.get_or_compute("insurance", rfr_model, features, run_predict)
         st.success(f'✅ 预测该客户的医疗费用为：{round(predict_result, 2)} 元')
         st.write("技术支持:email:: support@example.com")
 
+# ====================== 页面函数：批量保单评分 ======================
+class SessionFiles:
+    """本会话的评分结果目录：存放在会话状态里，会话结束（会话状态被回收）时自动删除"""
+
+    def __init__(self):
+        self.path = tempfile.mkdtemp(prefix="portfolio-")
+        weakref.finalize(self, shutil.rmtree, self.path, True)
+
+def session_files():
+    files = st.session_state.get("_portfolio_files")
+    if files is None:
+        files = st.session_state["_portfolio_files"] = SessionFiles()
+    return files
+
+def read_file(path):
+    """下载按钮点击时才读取结果文件"""
+    with open(path, "rb") as f:
+        return f.read()
+
+def batch_page():
+    st.markdown("""
+    ## 批量保单评分
+    上传保单文件（CSV 或 Parquet，需包含 年龄、性别、BMI、子女数量、是否吸烟、区域 六列），
+    分块并行预测整批医疗费用，并按 区域 × 是否吸烟 汇总。行数较多时可改用命令行：
+    `python insurance_model.py 保单.csv -o 结果.parquet`
+    """)
+    rfr_model, encoder, feature_names = load_model()
+    if rfr_model is None:
+        return
+    
+    uploaded = st.file_uploader("上传保单文件", type=["csv", "parquet"])
+    out_format = st.radio("结果格式", ["csv", "parquet"], horizontal=True)
+    if uploaded is None or not st.button("开始评分"):
+        result = st.session_state.get("_portfolio_result")
+        if result is not None and uploaded is not None and result["file_id"] == uploaded.file_id:
+            show_batch_result(result)
+        return
+    
+    # 上传内容先落盘，评分时按块读取；结果逐块写入本会话的结果目录，下载时才读文件，不在内存中保留整批数据
+    suffix = os.path.splitext(uploaded.name)[1].lower()
+    previous = st.session_state.pop("_portfolio_result", None)
+    if previous is not None and os.path.exists(previous["path"]):
+        os.remove(previous["path"])
+    output_path = os.path.join(session_files().path, f"scored-{uploaded.file_id}.{out_format}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        input_path = os.path.join(tmp_dir, "portfolio" + suffix)
+        with open(input_path, "wb") as f:
+            f.write(uploaded.getbuffer())
+        
+        bar = st.progress(0.0, text="正在评分...")
+        # 按文件大小粗略估算总行数，仅用于进度条
+        est_rows = max(uploaded.size // 40, 1)
+        try:
+            with metrics.timer("app_function_seconds", func="score_portfolio"):
+                summary, total, seconds = insurance_model.score_portfolio(
+                    input_path, output_path, rfr_model, encoder, feature_names,
+                    progress=lambda n: bar.progress(min(n / est_rows, 1.0), text=f"已评分 {n:,} 条"),
+                )
+        except (SchemaError, ValueError, UnicodeDecodeError) as e:
+            bar.empty()
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            st.error(f"保单文件无法评分：{e}")
+            return
+        bar.progress(1.0, text=f"完成：{total:,} 条")
+    
+    result = {
+        "file_id": uploaded.file_id, "summary": summary, "total": total, "seconds": seconds,
+        "path": output_path, "file_name": f"scored_{os.path.splitext(uploaded.name)[0]}.{out_format}",
+    }
+    st.session_state["_portfolio_result"] = result
+    show_batch_result(result)
+
+def show_batch_result(result):
+    total, seconds = result["total"], result["seconds"]
+    st.success(f"✅ 共评分 {total:,} 条保单，耗时 {seconds:.2f} 秒（{total / max(seconds, 1e-9):,.0f} 条/秒）")
+    st.dataframe(result["summary"], hide_index=True)
+    st.download_button("下载评分结果", functools.partial(read_file, result["path"]), file_name=result["file_name"],
+                       on_click="ignore")
+
 # ====================== 主程序 ======================
 # 设置页面配置
 st.set_page_config(
@@ -133,10 +193,13 @@ st.set_page_config(
 )
 
 # 侧边栏导航
-nav = st.sidebar.radio("导航菜单", ["简介", "预测医疗费用"])
+nav = st.sidebar.radio("导航菜单", ["简介", "预测医疗费用", "批量保单评分"])
 
 # 根据导航选择展示对应页面
-if nav == "简介":
-    introduce_page()
-else:
-    predict_page()
+with metrics.page_run("ten", page=nav):
+    if nav == "简介":
+        introduce_page()
+    elif nav == "批量保单评分":
+        batch_page()
+    else:
+        predict_page()